@@ -0,0 +1,164 @@
+"""
+Rule engine benchmark - matching cost as rules are added
+
+Compares the compiled RuleSet (one pass over each file for all rules)
+with evaluating every rule in its own loop over the lines, on a synthetic
+in-memory corpus so disk I/O does not hide the matching cost.
+
+The keyword search alone is also timed over every block of the corpus
+(a match stops early once its rules are decided, so with more rules more
+of each file is read). Half of the added rules share the "Check NN
+result:" prefix, which costs one search for all of them; the other half
+have distinct keywords, each adding a search. The search may grow
+linearly with the anchors (distinct keyword prefixes, see RuleSet) but
+no faster: if its time per anchor with the most rules is more than
+--max-growth times that with the fewest, the run exits with status 1.
+
+Usage:
+    python -m benchmarks.bench_rules [--files N] [--lines N] [--rules 1,2,4,...]
+                                     [--repeat N] [--max-growth 2.0]
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.rules import DEFAULT_RULES, PROGRAM_KEYWORD, RuleSet  # noqa: E402
+
+
+def make_corpus(files: int, lines: int, seed: int = 1) -> List[str]:
+    """Synthetic MP/FT logs: a header, a few keyword lines and a lot of noise"""
+    rng = random.Random(seed)
+    programs = ["Hapuka_ADL1_MP_V1.1.csv", "HokI_ADL1_MP_V2.0.csv", "Hapuka_ADL1_FT_V1.1.csv"]
+    corpus = []
+    for i in range(files):
+        body = [f"{PROGRAM_KEYWORD}{rng.choice(programs)}", f"PCBA SN No          : SN{i:06d}"]
+        body += [f"INFO Mon 09:09:{n % 60:02d}.914 [test_secure_provision.py:{n}] step {n} ok"
+                 for n in range(lines)]
+        # One mfg_data dump and a few check results somewhere in the log
+        body.insert(rng.randrange(2, len(body)),
+                    f"\t>>> mfg_data: {rng.choice(['0xFFFFFFFF', '0x0A050000', '0x0A050000'])}")
+        for _ in range(4):
+            body.insert(rng.randrange(2, len(body)),
+                        f"\t>>> Check {rng.randrange(64):02d} result: {rng.choice(['PASS', 'FAIL'])}")
+        corpus.append("\n".join(body) + "\n")
+    return corpus
+
+
+def make_rules(count: int, seed: int = 1) -> list:
+    """
+    An invalid-only default rule plus count - 1 rules, alternately on the
+    check lines and on distinct keywords absent from the corpus
+    """
+    rng = random.Random(seed)
+    default = DEFAULT_RULES[0]
+    # naive_match() has no notion of valid matches, so only invalid logs match
+    rules = [{
+        "name": "invalid_mfg",
+        "program": default["program"],
+        "require": default["invalid"],
+        "extract": default["extract"][:1],
+    }]
+    for i in range(count - 1):
+        if i % 2:
+            word = "".join(rng.choice(string.ascii_lowercase) for _ in range(8))
+            keyword = f"{word} reading:"
+        else:
+            keyword = f"Check {i // 2:02d} result:"
+        rules.append({
+            "name": f"rule_{i:02d}_fail",
+            "program": r"^[^_]*_ADL1_MP",
+            "require": [{"keyword": keyword, "contains": "FAIL"}],
+            "extract": [{"field": "serial_number", "keyword": "PCBA SN No          :", "default": "N/A"}],
+        })
+    return rules
+
+
+def chunks(text: str, size: int = 64 * 1024):
+    """Split a log into blocks of whole lines like DataModel does"""
+    start = 0
+    while start < len(text):
+        end = text.rfind("\n", start, start + size) + 1 or len(text)
+        yield text[start:end]
+        start = end
+
+
+def search_seconds(ruleset: RuleSet, blocks: List[str], repeat: int) -> float:
+    """Best time to find every keyword in every block, nothing settled"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for block in blocks:
+            ruleset._hits(block, 0, len(block), lambda action: True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def naive_match(ruleset: RuleSet, text: str):
+    """Evaluate each rule with its own loop over the lines"""
+    lines = text.splitlines()
+    for rule in ruleset.rules:
+        program = next((line for line in lines if PROGRAM_KEYWORD in line), None)
+        if program is None or not rule.accepts_program(program.split(":")[-1].strip()):
+            continue
+        if not all(any(c.keyword in line and c.test(line) for line in lines) for c in rule.require):
+            continue
+        return rule.name
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--rules", default="1,2,4,8,16,32,64")
+    parser.add_argument("--repeat", type=int, default=3, help="keyword search runs, the best is kept")
+    parser.add_argument("--max-growth", type=float, default=2.0,
+                        help="allowed search time per anchor with the most rules over the fewest")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.files, args.lines)
+    blocks = [block for text in corpus for block in chunks(text)]
+    megabytes = sum(len(text) for text in corpus) / (1024 * 1024)
+    print(f"corpus: {args.files} files, {megabytes:.1f} MB")
+    print(f"{'rules':>5} {'keywords':>8} {'anchors':>7} {'matcher':>7} {'search s':>8} "
+          f"{'compiled s':>10} {'MB/s':>7} {'per-rule loops s':>16}")
+
+    searches = {}
+    for count in (int(value) for value in args.rules.split(",")):
+        ruleset = RuleSet(make_rules(count))
+        anchors = len(ruleset._anchors)
+        matcher = "find" if anchors <= ruleset.FIND_LIMIT else "regex"
+        search = search_seconds(ruleset, blocks, args.repeat)
+        searches[count] = (search, anchors)
+
+        started = time.perf_counter()
+        for text in corpus:
+            ruleset.match(chunks(text))
+        compiled = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for text in corpus:
+            naive_match(ruleset, text)
+        naive = time.perf_counter() - started
+
+        print(f"{count:>5} {len(ruleset.keywords):>8} {anchors:>7} {matcher:>7} {search:>8.3f} "
+              f"{compiled:>10.3f} {megabytes / compiled:>7.0f} {naive:>16.3f}")
+
+    fewest, most = min(searches), max(searches)
+    growth = (searches[most][0] / searches[most][1]) / (searches[fewest][0] / searches[fewest][1])
+    print(f"\nsearch time per anchor, {most} rules over {fewest}: {growth:.2f}x (max {args.max_growth:.2f}x)")
+    if growth > args.max_growth:
+        print("REGRESSION: keyword search cost grows faster than the number of anchors")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Scan benchmark - Discovery, parsing, scan, export and table timings on synthetic corpora
+
+Generates a synthetic log corpus (see benchmarks.log_generator) at each
+size and times the stages of a scan on it:
+    discovery   listing the folder (model.discovery.iter_files)
+    parse       DataModel._scan_file on a sample of the files, one process
+    scan        DataModel.process_folder end to end, checked against the
+                results the generator expects
+    export_csv  write_csv / write_jsonl of the results to a temporary file
+    export_jsonl
+    table       streaming the results into ResultTableModel in batches like
+                the GUI, then reading the cells of the first screen (skipped
+                when PySide6 is missing)
+Each stage reports throughput and the peak memory it allocated, traced with
+tracemalloc in a second, untimed run (only the main process is traced, so
+use --workers 1 to include the parsing memory of the scan).
+
+Results are compared with a baseline JSON saved by an earlier run with
+--save-baseline: a stage slower, or using more memory, than its baseline by
+more than the tolerance is a regression, and the run exits with status 1.
+Baselines are only comparable on the same machine and settings.
+
+Usage:
+    python -m benchmarks.bench_scan [--sizes 1000,10000,100000] [--workers N]
+                                    [--stages scan,export_csv,...] [--repeat N]
+                                    [--corpus-dir DIR] [--no-memory]
+                                    [--baseline FILE] [--save-baseline]
+                                    [--tolerance 0.25] [--memory-tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.log_generator import Corpus, CorpusSpec, load_or_generate  # noqa: E402
+from model.data_model import DataModel  # noqa: E402
+from model.discovery import iter_files  # noqa: E402
+from model.export import export_file  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline_scan.json"
+
+# Files parsed by the parse stage (spread evenly over the corpus)
+PARSE_SAMPLE = 2000
+
+# Rows per batch streamed into the table, as MainPresenter receives them
+TABLE_BATCH = 500
+# Rows of the first screen of the table read by the table stage
+TABLE_SCREEN = 40
+
+# Time differences below this are noise whatever the tolerance
+MIN_SECONDS = 0.005
+# Memory differences below this are noise whatever the tolerance
+MIN_BYTES = 1024 * 1024
+
+STAGES = ("discovery", "parse", "scan", "export_csv", "export_jsonl", "table")
+
+# Qt application created for the table stage
+_app = None
+
+
+class BenchmarkError(Exception):
+    """A stage produced wrong results"""
+
+
+def _discovery(corpus: Corpus, context: dict) -> Tuple[int, int]:
+    files = sum(1 for _ in iter_files(corpus.folder))
+    if files != corpus.files:
+        raise BenchmarkError(f"discovery found {files:,} files, expected {corpus.files:,}")
+    return files, corpus.bytes
+
+
+def _parse(corpus: Corpus, context: dict) -> Tuple[int, int]:
+    files = context.get("sample")
+    if files is None:
+        files = sorted(iter_files(corpus.folder))
+        files = context["sample"] = files[::max(1, len(files) // PARSE_SAMPLE)]
+        # Read once so the stage times parsing rather than a cold disk cache
+        for path in files:
+            path.read_bytes()
+    model = DataModel(workers=1)
+    size = 0
+    for path in files:
+        _, error, _ = model._scan_file(path)
+        if error:
+            raise BenchmarkError(error)
+        size += path.stat().st_size
+    return len(files), size
+
+
+def _scan(corpus: Corpus, context: dict) -> Tuple[int, int]:
+    model = DataModel(workers=context["workers"])
+    results = model.process_folder(str(corpus.folder), error_callback=context["errors"].append)
+    view = results.view()
+    invalid = view.count_invalid()
+    if (len(results), invalid) != (corpus.results, corpus.invalid):
+        raise BenchmarkError(f"scan found {len(results):,} results ({invalid:,} invalid), expected "
+                             f"{corpus.results:,} ({corpus.invalid:,} invalid)")
+    context["results"] = view
+    return model.processed_files, model.processed_bytes
+
+
+def _export(fmt: str) -> Callable[[Corpus, dict], Tuple[int, int]]:
+    def run(corpus: Corpus, context: dict) -> Tuple[int, int]:
+        results = context["results"]
+        path = os.path.join(context["temp"], f"export.{fmt}")
+        export_file(path, results, fmt)
+        return len(results), os.path.getsize(path)
+    return run
+
+
+def _table(corpus: Corpus, context: dict) -> Tuple[int, int]:
+    from PySide6.QtCore import Qt
+    from views.result_table_model import ResultTableModel
+
+    results = context["results"]
+    table = ResultTableModel()
+    for start in range(0, len(results), TABLE_BATCH):
+        table.append_results(results.store.view(start, min(start + TABLE_BATCH, len(results))))
+    table.set_results(results)
+    for row in range(min(TABLE_SCREEN, table.rowCount())):
+        for column in range(table.columnCount()):
+            index = table.index(row, column)
+            table.data(index, Qt.DisplayRole)
+            table.data(index, Qt.ForegroundRole)
+    return len(results), 0
+
+
+RUNNERS: Dict[str, Callable[[Corpus, dict], Tuple[int, int]]] = {
+    "discovery": _discovery,
+    "parse": _parse,
+    "scan": _scan,
+    "export_csv": _export("csv"),
+    "export_jsonl": _export("jsonl"),
+    "table": _table,
+}
+
+
+def table_available() -> bool:
+    """Whether PySide6 can be imported for the table stage"""
+    global _app
+    try:
+        from PySide6.QtCore import QCoreApplication
+        # Imported here so the first table run does not time the import
+        import views.result_table_model  # noqa: F401
+    except ImportError:
+        return False
+    # ResultTableModel needs an application object for its colors
+    if QCoreApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtGui import QGuiApplication
+        _app = QGuiApplication([])
+    return True
+
+
+def run_stage(stage: str, corpus: Corpus, context: dict, repeat: int, memory: bool) -> dict:
+    """Time a stage (best of repeat runs) and trace its peak memory"""
+    runner = RUNNERS[stage]
+    seconds = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items, size = runner(corpus, context)
+        elapsed = time.perf_counter() - started
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    result = {
+        "items": items,
+        "bytes": size,
+        "seconds": round(seconds, 6),
+        "items_per_s": round(items / seconds, 1) if seconds else 0.0,
+        "mb_per_s": round(size / (1024 * 1024) / seconds, 2) if seconds and size else 0.0,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            runner(corpus, context)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def compare(result: dict, baseline: Optional[dict], tolerance: float,
+            memory_tolerance: float) -> Tuple[str, bool]:
+    """Change against the baseline as text, and whether it is a regression"""
+    if not baseline:
+        return "", False
+    notes = []
+    regressed = False
+    old = baseline.get("seconds")
+    if old:
+        change = result["seconds"] / old - 1
+        notes.append(f"time {change:+.0%}")
+        if change > tolerance and result["seconds"] - old > MIN_SECONDS:
+            regressed = True
+    old = baseline.get("peak_bytes")
+    if old and "peak_bytes" in result:
+        change = result["peak_bytes"] / old - 1
+        notes.append(f"mem {change:+.0%}")
+        if change > memory_tolerance and result["peak_bytes"] - old > MIN_BYTES:
+            regressed = True
+    return ", ".join(notes) + (" REGRESSION" if regressed else ""), regressed
+
+
+def environment(args) -> dict:
+    """Settings a baseline is only comparable with"""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        "repeat": args.repeat,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="corpus sizes in files (default: 1000,10000,100000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="scan processes of the scan stage (default: CPU cores)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage, best kept")
+    parser.add_argument("--corpus-dir", default=None,
+                        help="keep corpora in this folder and reuse them across runs "
+                             "(default: a temporary folder)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to the baseline file instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25,
+                        help="allowed peak memory growth against the baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    # Exports and the table read the results of the scan
+    if any(stage.startswith("export") or stage == "table" for stage in stages) and "scan" not in stages:
+        stages.insert(0, "scan")
+    stages.sort(key=STAGES.index)
+    if "table" in stages and not table_available():
+        print("PySide6 not installed: skipping the table stage")
+        stages.remove("table")
+
+    baseline = {}
+    if not args.save_baseline:
+        try:
+            stored = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        else:
+            if stored.get("environment") != environment(args):
+                print(f"Warning: baseline recorded with different settings: {stored.get('environment')}")
+            baseline = stored.get("results", {})
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory(prefix="surfing_bench_") as temp:
+        for files in (int(value) for value in args.sizes.split(",")):
+            folder = os.path.join(args.corpus_dir or temp, f"corpus_{files}")
+            started = time.perf_counter()
+            corpus = load_or_generate(folder, CorpusSpec(files=files))
+            print(f"\ncorpus: {corpus.files:,} files, {corpus.bytes / (1024 * 1024):,.1f} MB, "
+                  f"{corpus.results:,} results ({corpus.invalid:,} invalid), {corpus.huge} huge "
+                  f"[ready in {time.perf_counter() - started:.1f} s]")
+            print(f"{'stage':<13} {'items':>9} {'seconds':>9} {'items/s':>11} {'MB/s':>8} "
+                  f"{'peak MB':>8}  vs baseline")
+
+            context = {"workers": args.workers, "errors": [], "temp": temp}
+            for stage in stages:
+                key = f"{stage}@{files}"
+                try:
+                    result = run_stage(stage, corpus, context, args.repeat, not args.no_memory)
+                except BenchmarkError as e:
+                    print(f"{stage:<13} FAILED: {e}")
+                    regressions.append(key)
+                    if stage == "scan":
+                        break
+                    continue
+                results[key] = result
+                note, regressed = compare(result, baseline.get(key), args.tolerance,
+                                          args.memory_tolerance)
+                if regressed:
+                    regressions.append(key)
+                peak = f"{result['peak_bytes'] / (1024 * 1024):8.1f}" if "peak_bytes" in result else f"{'-':>8}"
+                rate = f"{result['mb_per_s']:8.1f}" if result["mb_per_s"] else f"{'-':>8}"
+                print(f"{stage:<13} {result['items']:>9,} {result['seconds']:>9.3f} "
+                      f"{result['items_per_s']:>11,.0f} {rate} {peak}  {note}")
+            for error in context["errors"][:5]:
+                print(f"  read error: {error}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps({"environment": environment(args), "results": results},
+                                                  indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
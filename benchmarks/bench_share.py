@@ -0,0 +1,107 @@
+"""
+Network share benchmark - Scan time on a slow file system, with and without read-ahead
+
+Generates a synthetic log corpus (see benchmarks.log_generator) and scans it
+through benchmarks.slow_fs, which adds a network round trip to every stat,
+open and read, as on an SMB or NFS share:
+    serial      one file after the other in the scan thread (io_concurrency 0)
+    ahead N     files read ahead on N threads (see model.prefetch)
+Every run uses one scan process (the injected latency only applies to the
+benchmark process) and must find the same results as the serial scan. The
+run exits with status 1 when results differ, or when the best read-ahead
+run is less than --min-speedup times faster than the serial scan.
+
+Usage:
+    python -m benchmarks.bench_share [--files 300] [--latency 0.005]
+                                     [--bandwidth MB_PER_S]
+                                     [--concurrency 4,16,64] [--mode text|mmap]
+                                     [--corpus-dir DIR] [--min-speedup 2.0]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.log_generator import CorpusSpec, load_or_generate  # noqa: E402
+from benchmarks.slow_fs import SlowFilesystem  # noqa: E402
+from model.data_model import DataModel  # noqa: E402
+
+
+def run_scan(folder: str, concurrency: int, mode: str, latency: float,
+             bandwidth: float) -> Tuple[float, List[tuple], DataModel, SlowFilesystem]:
+    """Scan folder on a slow file system; returns (seconds, results, model, file system)"""
+    model = DataModel(workers=1, scan_mode=mode, io_concurrency=concurrency)
+    errors = []
+    with SlowFilesystem(folder, latency=latency, bandwidth=bandwidth) as fs:
+        started = time.perf_counter()
+        results = model.process_folder(folder, error_callback=errors.append)
+        seconds = time.perf_counter() - started
+    if errors:
+        raise RuntimeError(f"{len(errors)} read errors, first: {errors[0]}")
+    # The check time differs between runs
+    return seconds, [row[:3] for row in results], model, fs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=300, help="logs in the corpus (default: 300)")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="seconds added to every stat, open and read (default: 0.005)")
+    parser.add_argument("--bandwidth", type=float, default=None, metavar="MB_PER_S",
+                        help="transfer rate limit of reads (default: unlimited)")
+    parser.add_argument("--concurrency", default="4,16,64",
+                        help="read-ahead thread counts to time (default: 4,16,64)")
+    parser.add_argument("--mode", choices=DataModel.SCAN_MODES, default="text",
+                        help="file matching mode (default: text)")
+    parser.add_argument("--corpus-dir", default=None,
+                        help="keep the corpus in this folder and reuse it across runs "
+                             "(default: a temporary folder)")
+    parser.add_argument("--min-speedup", type=float, default=2.0,
+                        help="speedup the best read-ahead run must reach (default: 2.0)")
+    args = parser.parse_args()
+    bandwidth = args.bandwidth * 1024 * 1024 if args.bandwidth else None
+    levels = [int(value) for value in args.concurrency.split(",") if value.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="surfing_share_") as temp:
+        corpus = load_or_generate(os.path.join(args.corpus_dir or temp, f"share_{args.files}"),
+                                  CorpusSpec(files=args.files, huge_ratio=0))
+        folder = str(corpus.folder)
+        print(f"corpus: {corpus.files:,} files, {corpus.bytes / (1024 * 1024):,.1f} MB, "
+              f"{corpus.results:,} results; latency {args.latency * 1000:g} ms per call"
+              + (f", {args.bandwidth:g} MB/s" if args.bandwidth else ""))
+        print(f"{'run':<10} {'seconds':>8} {'files/s':>8} {'calls':>7} {'waited s':>9} {'speedup':>8}")
+
+        serial, expected, _, fs = run_scan(folder, 0, args.mode, args.latency, bandwidth)
+        if len(expected) != corpus.results:
+            print(f"FAILED: serial scan found {len(expected):,} results, expected {corpus.results:,}")
+            return 1
+        print(f"{'serial':<10} {serial:>8.2f} {corpus.files / serial:>8,.0f} {fs.calls:>7,} "
+              f"{'-':>9} {'1.0x':>8}")
+
+        best = 0.0
+        failed = False
+        for level in levels:
+            seconds, results, model, fs = run_scan(folder, level, args.mode, args.latency, bandwidth)
+            if results != expected:
+                print(f"{f'ahead {level}':<10} FAILED: results differ from the serial scan")
+                failed = True
+                continue
+            speedup = serial / seconds
+            best = max(best, speedup)
+            print(f"{f'ahead {level}':<10} {seconds:>8.2f} {corpus.files / seconds:>8,.0f} {fs.calls:>7,} "
+                  f"{model.metrics.wall['prefetch_wait']:>9.2f} {f'{speedup:.1f}x':>8}")
+
+    print(f"\nBest speedup: {best:.1f}x (minimum {args.min_speedup:g}x)")
+    if best < args.min_speedup:
+        print("Minimum speedup missed")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
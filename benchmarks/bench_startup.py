@@ -0,0 +1,228 @@
+"""
+Startup benchmark - Import time and time to first paint of the application
+
+Starts the application in fresh processes, the way main.py does, and times
+each phase up to the first paint of the main window:
+    interpreter  process start until this script runs (Python startup)
+    imports      importing main (PySide6, the views, model and presenter)
+    app          creating the QApplication with its font and stylesheet
+    window       building the model, main window and presenter, and show()
+    paint        show() until the first paint of the window has finished
+    total        process start until the first paint (time to first paint)
+Each phase reports the median of the runs, the fastest run and the first
+run, which is the closest to a cold start (the OS file cache is only truly
+cold after a reboot). The run exits with status 1 when the median time to
+first paint misses the target, or when a phase is slower than its baseline
+(saved with --save-baseline) by more than the tolerance. --imports N lists
+the slowest modules imported by main, from python -X importtime.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--target 1.0] [--imports N]
+                                       [--baseline FILE] [--save-baseline]
+                                       [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline_startup.json"
+
+PHASES = ("interpreter", "imports", "app", "window", "paint", "total")
+
+# Longest wait for the first paint of a run
+PAINT_TIMEOUT_MS = 30000
+
+# Time differences below this are noise whatever the tolerance
+MIN_SECONDS = 0.01
+
+
+def _child(spawned: float):
+    """Start the application like main.py and print the phase times as JSON"""
+    started = time.time()
+    clock = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    import main
+    from PySide6.QtCore import QEvent, QObject, QTimer
+
+    times = {"interpreter": started - spawned}
+    times["imports"] = time.perf_counter() - clock
+    clock = time.perf_counter()
+    app = main.create_app([sys.argv[0]])
+    times["app"] = time.perf_counter() - clock
+    clock = time.perf_counter()
+    view, presenter = main.create_window()
+    times["window"] = time.perf_counter() - clock
+    shown = time.perf_counter()
+
+    def painted():
+        times["paint"] = time.perf_counter() - shown
+        times["total"] = time.time() - spawned
+        app.quit()
+
+    class PaintProbe(QObject):
+        """Calls painted() once the first paint of the window has finished"""
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and "paint" not in times:
+                times["paint"] = None
+                # Runs after the rest of the paint pass and the flush
+                QTimer.singleShot(0, painted)
+            return False
+
+    probe = PaintProbe()
+    view.installEventFilter(probe)
+    QTimer.singleShot(PAINT_TIMEOUT_MS, app.quit)
+    app.exec()
+    print(json.dumps(times))
+
+
+def _child_env() -> dict:
+    """Environment of the application runs (offscreen Qt without a display)"""
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not (env.get("DISPLAY") or env.get("WAYLAND_DISPLAY")):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def run_once(env: dict) -> Dict[str, float]:
+    """Phase times of one application start"""
+    spawned = time.time()
+    process = subprocess.run([sys.executable, __file__, "--child", repr(spawned)], cwd=ROOT, env=env,
+                             capture_output=True, text=True)
+    try:
+        times = json.loads(process.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        raise RuntimeError(f"application run failed (exit status {process.returncode}):\n"
+                           f"{process.stderr.strip()}")
+    if times.get("paint") is None:
+        raise RuntimeError(f"the window was not painted within {PAINT_TIMEOUT_MS / 1000:.0f} s")
+    return times
+
+
+def import_profile(env: dict) -> List[Tuple[str, float, float]]:
+    """(module, self seconds, cumulative seconds) of each module main imports directly"""
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, env=env,
+                             capture_output=True, text=True)
+    modules = []
+    direct = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue  # header line
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            direct.append((name.strip(), int(own) / 1e6, int(cumulative) / 1e6))
+        elif depth == 0:
+            if name.strip() == "main":
+                modules = direct
+            direct = []
+    return sorted(modules, key=lambda module: -module[2])
+
+
+def compare(seconds: float, baseline: Optional[float], tolerance: float) -> Tuple[str, bool]:
+    """Change against the baseline as text, and whether it is a regression"""
+    if not baseline:
+        return "", False
+    change = seconds / baseline - 1
+    regressed = change > tolerance and seconds - baseline > MIN_SECONDS
+    return f"{change:+.0%}" + (" REGRESSION" if regressed else ""), regressed
+
+
+def environment(env: dict) -> dict:
+    """Settings a baseline is only comparable with"""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+        "qt_platform": env.get("QT_QPA_PLATFORM", "default"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="application starts timed (default: 5)")
+    parser.add_argument("--target", type=float, default=1.0,
+                        help="time to first paint the median run must stay under, in seconds (default: 1.0)")
+    parser.add_argument("--imports", type=int, default=0, metavar="N",
+                        help="list the N slowest modules imported by main")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to the baseline file instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--child", type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        _child(args.child)
+        return 0
+
+    env = _child_env()
+    baseline = {}
+    if not args.save_baseline:
+        try:
+            stored = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        else:
+            if stored.get("environment") != environment(env):
+                print(f"Warning: baseline recorded with different settings: {stored.get('environment')}")
+            baseline = stored.get("results", {})
+
+    runs = []
+    for _ in range(max(1, args.runs)):
+        try:
+            runs.append(run_once(env))
+        except RuntimeError as e:
+            print(f"FAILED: {e}")
+            return 1
+
+    print(f"{len(runs)} runs (Qt platform: {env.get('QT_QPA_PLATFORM', 'default')})")
+    print(f"{'phase':<12} {'median s':>9} {'min s':>9} {'first s':>9}  vs baseline")
+    results = {}
+    regressions = []
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        results[phase] = {"seconds": round(statistics.median(values), 6)}
+        note, regressed = compare(results[phase]["seconds"], baseline.get(phase, {}).get("seconds"),
+                                  args.tolerance)
+        if regressed:
+            regressions.append(phase)
+        print(f"{phase:<12} {results[phase]['seconds']:>9.3f} {min(values):>9.3f} {values[0]:>9.3f}  {note}")
+
+    if args.imports:
+        print(f"\nslowest imports of main{'':<21} {'self s':>8} {'total s':>8}")
+        for name, own, cumulative in import_profile(env)[:args.imports]:
+            print(f"  {name:<42} {own:>8.3f} {cumulative:>8.3f}")
+
+    total = results["total"]["seconds"]
+    print(f"\nTime to first paint: {total:.3f} s (target {args.target:.3f} s)")
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps({"environment": environment(env), "results": results},
+                                                  indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    failed = False
+    if total > args.target:
+        print("Target missed")
+        failed = True
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
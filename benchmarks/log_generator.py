@@ -0,0 +1,222 @@
+"""
+Synthetic log generator - Realistic ADL1/HokI test log corpora for benchmarks
+
+Writes a folder of test logs shaped like the station logs DataModel scans:
+a header with the Test Program and PCBA SN lines, a body of provisioning
+steps with the trim value and mfg_data lines somewhere inside, and a
+log-normal spread of file sizes with a few huge logs. MP and non-MP
+programs, valid and 0xFFFFFFFF mfg_data, missing SN lines, logs without
+mfg_data and CRLF line endings are mixed at configurable ratios. The
+corpus is deterministic for a given spec, and corpus.json next to the
+logs records the spec and the results a scan must find.
+
+Usage:
+    python -m benchmarks.log_generator <folder> [--files N] [--mean-kb KB]
+                                       [--huge-ratio R] [--seed N]
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# Logs are written to <folder>/logs, the manifest to <folder>/corpus.json
+LOGS_FOLDER = "logs"
+MANIFEST = "corpus.json"
+
+MP_PROGRAMS = ["Hapuka_ADL1_MP_V1.1.csv", "HokI_ADL1_MP_V2.0.csv", "HokI_ADL1_MP_V2.1.csv"]
+OTHER_PROGRAMS = ["Hapuka_ADL1_FT_V1.1.csv", "HokI_ADL1_FCT_V2.0.csv", "Hapuka_ADL1_RF_V1.0.csv"]
+
+# Provisioning steps repeated to fill the body of a log
+BODY_LINES = [
+    "INFO {day} {clock} [test_secure_provision.py:{line} ] step {step}: read otp bank {bank} -> 0x{value:08X}",
+    "INFO {day} {clock} [test_secure_provision.py:{line} ] get trim_mfg data: }}--> tm trim_mfg",
+    "DEBUG {day} {clock} [uart.py:{line} ] >>> rx {bank} bytes: {value:08x}{step:04x}",
+    "INFO {day} {clock} [test_rf.py:{line} ] channel {bank} rssi -{step} dBm limit -85 PASS",
+    "INFO {day} {clock} [power.py:{line} ] vbat {bank}.{step:03d} V limit 3.300-4.350 PASS",
+    "\t>>> Check {bank:02d} result: PASS",
+]
+
+# Body text shared by all logs, sliced at random line boundaries
+FILLER_SIZE = 1024 * 1024
+
+
+class CorpusSpec(NamedTuple):
+    """Parameters of a synthetic corpus"""
+    files: int = 1000
+    # Average size of a log (log-normal spread, capped at max_ratio times)
+    mean_kb: float = 8.0
+    size_sigma: float = 0.8
+    max_ratio: float = 20.0
+    # Share of MP logs; the rest run programs the default rule rejects
+    mp_ratio: float = 0.7
+    # Share of logs with mfg_data (a result when MP), and of those, invalid
+    mfg_ratio: float = 0.9
+    invalid_ratio: float = 0.3
+    missing_sn_ratio: float = 0.05
+    crlf_ratio: float = 0.2
+    # Huge logs, with mfg_data near the end
+    huge_ratio: float = 0.001
+    huge_mb: float = 16.0
+    seed: int = 1
+
+
+class Corpus(NamedTuple):
+    """A generated corpus and the results a scan of it must find"""
+    folder: Path
+    spec: CorpusSpec
+    files: int
+    bytes: int
+    results: int
+    invalid: int
+    missing_sn: int
+    huge: int
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    """Body text of whole lines, at least size characters long"""
+    lines = []
+    length = 0
+    step = 0
+    while length < size:
+        step += 1
+        line = rng.choice(BODY_LINES).format(
+            day=rng.choice(["Mon", "Tue", "Wed", "Thu", "Fri"]),
+            clock=f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}."
+                  f"{rng.randrange(1000):03d}",
+            line=rng.randrange(50, 1500), step=step % 1000, bank=rng.randrange(16),
+            value=rng.getrandbits(32))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def _body(rng: random.Random, filler: str, size: int) -> str:
+    """size characters (rounded to whole lines) of filler from a random line"""
+    parts = []
+    while size > 0:
+        start = filler.find("\n", rng.randrange(len(filler) // 2)) + 1
+        end = filler.find("\n", start + min(size, len(filler) - start - 1)) + 1 or len(filler)
+        parts.append(filler[start:end])
+        size -= end - start
+    return "".join(parts)
+
+
+def generate(folder: str, spec: CorpusSpec = CorpusSpec()) -> Corpus:
+    """Write a corpus into folder (emptying its logs folder first)"""
+    root = Path(folder)
+    logs = root / LOGS_FOLDER
+    logs.mkdir(parents=True, exist_ok=True)
+    for old in logs.iterdir():
+        old.unlink()
+
+    rng = random.Random(spec.seed)
+    filler = _filler(rng, FILLER_SIZE)
+    mean = spec.mean_kb * 1024
+    # Log-normal with the requested mean: E[X] = exp(mu + sigma^2 / 2)
+    mu = math.log(mean) - spec.size_sigma ** 2 / 2
+    total_bytes = results = invalid = missing_sn = huge = 0
+
+    for i in range(spec.files):
+        is_mp = rng.random() < spec.mp_ratio
+        program = rng.choice(MP_PROGRAMS if is_mp else OTHER_PROGRAMS)
+        has_mfg = rng.random() < spec.mfg_ratio
+        is_invalid = has_mfg and rng.random() < spec.invalid_ratio
+        has_sn = rng.random() >= spec.missing_sn_ratio
+        is_huge = rng.random() < spec.huge_ratio
+        if is_huge:
+            size = int(spec.huge_mb * 1024 * 1024)
+        else:
+            size = int(min(rng.lognormvariate(mu, spec.size_sigma), mean * spec.max_ratio))
+
+        serial = f"ADL1{rng.randrange(10 ** 8):08d}"
+        header = [
+            "=" * 60,
+            f"Test Station        : ADL1-ST{rng.randrange(1, 25):02d}",
+            f"Test Program        :{program}",
+        ]
+        if has_sn:
+            header.append(f"PCBA SN No          : {serial}")
+        header += [
+            f"Operator            : OP{rng.randrange(1000):03d}",
+            f"Start Time          : 2024-05-{rng.randrange(1, 29):02d} "
+            f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+            "=" * 60,
+        ]
+        head = "\n".join(header) + "\n"
+        body = _body(rng, filler, max(0, size - len(head)))
+        if has_mfg:
+            mfg = ("\t>>> <info> [{:08d}] current trim value: \n"
+                   "\t>>> mfg_data: {}\n").format(rng.randrange(10 ** 5),
+                                                  "0xFFFFFFFF" if is_invalid else "0x0A050000")
+            # Huge logs dump mfg_data at the end, so no early exit helps
+            at = len(body) - 1 if is_huge else rng.randrange(len(body) or 1)
+            at = body.find("\n", at) + 1 or len(body)
+            body = body[:at] + mfg + body[at:]
+        text = head + body
+        if rng.random() < spec.crlf_ratio:
+            text = text.replace("\n", "\r\n")
+
+        family = program.rsplit("_", 1)[0]
+        data = text.encode("utf-8")
+        (logs / f"{family}_{serial}_{i:06d}.log").write_bytes(data)
+        total_bytes += len(data)
+        huge += is_huge
+        if is_mp and has_mfg:
+            results += 1
+            invalid += is_invalid
+            missing_sn += not has_sn
+
+    corpus = Corpus(logs, spec, spec.files, total_bytes, results, invalid, missing_sn, huge)
+    manifest = {field: getattr(corpus, field) for field in Corpus._fields if field not in ("folder", "spec")}
+    manifest["spec"] = spec._asdict()
+    (root / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return corpus
+
+
+def load(folder: str, spec: Optional[CorpusSpec] = None) -> Optional[Corpus]:
+    """A corpus generated earlier in folder (with spec, when given), or None"""
+    root = Path(folder)
+    try:
+        manifest = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+        stored = CorpusSpec(**manifest.pop("spec"))
+    except (OSError, ValueError, TypeError):
+        return None
+    if spec is not None and stored != spec:
+        return None
+    return Corpus(root / LOGS_FOLDER, stored, **manifest)
+
+
+def load_or_generate(folder: str, spec: CorpusSpec = CorpusSpec()) -> Corpus:
+    """Reuse the corpus in folder if it was generated with spec, else generate it"""
+    return load(folder, spec) or generate(folder, spec)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder")
+    defaults = CorpusSpec()
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--mean-kb", type=float, default=defaults.mean_kb)
+    parser.add_argument("--mp-ratio", type=float, default=defaults.mp_ratio)
+    parser.add_argument("--invalid-ratio", type=float, default=defaults.invalid_ratio)
+    parser.add_argument("--missing-sn-ratio", type=float, default=defaults.missing_sn_ratio)
+    parser.add_argument("--huge-ratio", type=float, default=defaults.huge_ratio)
+    parser.add_argument("--huge-mb", type=float, default=defaults.huge_mb)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    spec = defaults._replace(files=args.files, mean_kb=args.mean_kb, mp_ratio=args.mp_ratio,
+                             invalid_ratio=args.invalid_ratio, missing_sn_ratio=args.missing_sn_ratio,
+                             huge_ratio=args.huge_ratio, huge_mb=args.huge_mb, seed=args.seed)
+    corpus = generate(args.folder, spec)
+    print(f"{corpus.files:,} files, {corpus.bytes / (1024 * 1024):,.1f} MB in {corpus.folder}: "
+          f"{corpus.results:,} MP logs with mfg_data ({corpus.invalid:,} invalid, "
+          f"{corpus.missing_sn:,} without SN), {corpus.huge} huge")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
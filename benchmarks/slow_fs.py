@@ -0,0 +1,110 @@
+"""
+Slow file system - Local stand-in for a network share, with injected latency
+
+Inside a SlowFilesystem block, every os.stat(), os.scandir() and open() of a
+path under the root, and every read() of a file opened there, first sleeps
+for a round trip, plus the transfer time of the bytes read at the given
+bandwidth. Sleeping releases the GIL like a blocking network call does, so
+concurrent reads overlap as they would on an SMB or NFS share. Only the
+current process is affected: time scans with workers=1.
+
+    with SlowFilesystem(folder, latency=0.005):
+        model.process_folder(folder)
+"""
+import builtins
+import os
+import threading
+import time
+from typing import Optional
+
+
+class _SlowFile:
+    """File object whose reads wait for the latency of the file system"""
+
+    def __init__(self, file, fs: "SlowFilesystem"):
+        self._file = file
+        self._fs = fs
+
+    def read(self, size: int = -1):
+        data = self._file.read(size)
+        self._fs.wait(len(data))
+        return data
+
+    def readinto(self, buffer):
+        count = self._file.readinto(buffer)
+        self._fs.wait(count or 0)
+        return count
+
+    def __iter__(self):
+        for line in self._file:
+            self._fs.wait(len(line))
+            yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class SlowFilesystem:
+    """
+    Context manager adding latency (seconds per call) and a bandwidth limit
+    (bytes per second, None for unlimited) to file operations under root
+    calls counts the delayed operations, delay their total sleep.
+    """
+
+    def __init__(self, root: str, latency: float = 0.005, bandwidth: Optional[float] = None):
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.calls = 0
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        self._saved = None
+
+    def wait(self, size: int = 0):
+        """Sleep for one round trip and the transfer of size bytes"""
+        seconds = self.latency
+        if self.bandwidth:
+            seconds += size / self.bandwidth
+        with self._lock:
+            self.calls += 1
+            self.delay += seconds
+        time.sleep(seconds)
+
+    def _inside(self, path) -> bool:
+        if isinstance(path, int):
+            return False  # file descriptor
+        path = os.path.abspath(os.fsdecode(path))
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def __enter__(self):
+        self._saved = (builtins.open, os.stat, os.scandir)
+        real_open, real_stat, real_scandir = self._saved
+
+        def slow_open(file, *args, **kwargs):
+            if not self._inside(file):
+                return real_open(file, *args, **kwargs)
+            self.wait()
+            return _SlowFile(real_open(file, *args, **kwargs), self)
+
+        def slow_stat(path, *args, **kwargs):
+            if self._inside(path):
+                self.wait()
+            return real_stat(path, *args, **kwargs)
+
+        def slow_scandir(path="."):
+            if self._inside(path):
+                self.wait()
+            return real_scandir(path)
+
+        builtins.open, os.stat, os.scandir = slow_open, slow_stat, slow_scandir
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open, os.stat, os.scandir = self._saved
+        self._saved = None
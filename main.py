@@ -1,17 +1,21 @@
 import sys
 import signal
+import multiprocessing
 
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QFont
 
 from views.main_window import MainWindow
+from views.style import APP_STYLESHEET
 from model.data_model import DataModel
+from model.scan_index import ScanIndex
+from model.history import ResultHistory
+from model.metrics import ScanMetrics
 from presenter.main_presenter import MainPresenter
 
-def main():
-    """Main application entry point"""
-    signal.signal(signal.SIGINT, signal.SIG_DFL)
-    app = QApplication(sys.argv)
+def create_app(argv: list) -> QApplication:
+    """Create the application with its properties, font and stylesheet"""
+    app = QApplication(argv)
     
     # Set application properties
     app.setApplicationName("Surfing")
@@ -22,14 +26,29 @@ def main():
     font = QFont("Segoe UI", 10)
     app.setFont(font)
     
-    # Create MVC components
-    model = DataModel()
+    # One stylesheet for every widget, parsed once
+    app.setStyleSheet(APP_STYLESHEET)
+    return app
+
+def create_window():
+    """Create the MVC components and show the main window"""
+    model = DataModel(index=ScanIndex())
     view = MainWindow()
-    presenter = MainPresenter(view, model)
+    presenter = MainPresenter(view, model, history=ResultHistory(),
+                              metrics_path=ScanMetrics.default_path())
     
     # Show window
     view.show()
+    return view, presenter
+
+def main():
+    """Main application entry point"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    app = create_app(sys.argv)
+    view, presenter = create_window()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Required for the scan process pool in PyInstaller builds
+    multiprocessing.freeze_support()
     main()
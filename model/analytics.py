@@ -0,0 +1,206 @@
+"""
+Analytics - Vectorized grouped aggregates over a ResultStore (NumPy)
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+import time
+
+import numpy as np
+
+from .result_store import ResultStore
+
+
+# Fields of the built-in rule used for grouping
+PROGRAM_FIELD = "program"
+TRIM_FIELD = "trim_value"
+
+MISSING = "(none)"
+
+# Base of the numbers in numeric fields: the trim value is logged as eight
+# hex digits (e.g. [00001447]); other fields are read as decimal
+NUMBER_BASES = {TRIM_FIELD: 16}
+
+# Time zone offsets are whole multiples of 15 minutes, so all timestamps of
+# one UTC quarter hour share their local hour and day
+QUARTER_HOUR = 900
+
+
+class GroupStat(NamedTuple):
+    """Aggregate of one group of results"""
+    key: str
+    total: int
+    invalid: int
+
+    @property
+    def valid(self) -> int:
+        return self.total - self.invalid
+
+    @property
+    def invalid_rate(self) -> float:
+        return self.invalid / self.total if self.total else 0.0
+
+
+def product_family(program: str) -> str:
+    """Product family of a test program name, e.g. Hapuka_ADL1_MP_V1.1.csv -> Hapuka"""
+    return program.split("_", 1)[0]
+
+
+def parse_number(value: Optional[str], base: int = 10) -> float:
+    """Numeric value of an extracted field in a base, NaN if not a number"""
+    if value is None:
+        return float("nan")
+    try:
+        return float(int(value, base))
+    except ValueError:
+        return float("nan")
+
+
+class ResultAnalytics:
+    """
+    Grouped aggregates over a snapshot of a ResultStore
+    The columns are copied into NumPy arrays once; every aggregate is then
+    a bincount over integer group codes, so grouping cost grows with the
+    number of rows in C and with the number of distinct values in Python.
+    Snapshots are cheap enough to rebuild after every scan or watch rescan.
+    Time groups use the log's own time (its modification time, i.e. when
+    the test ran), or the check time of rows without one.
+    rows: ascending store rows to aggregate (e.g. those kept by a retest
+    policy), default all
+    """
+
+    def __init__(self, store: ResultStore, rows: Optional[Sequence[int]] = None):
+        end = len(store) if rows is None else (rows[-1] + 1 if len(rows) else 0)
+        self.flags = np.frombuffer(store.flag_column(end), dtype=np.uint8)
+        log_times = np.frombuffer(store.log_time_column(end), dtype=np.int64)
+        self.timestamps = np.where(log_times > 0, log_times,
+                                   np.frombuffer(store.timestamp_column(end), dtype=np.int64))
+        self.fields = {}
+        for name in store.field_names():
+            codes, values = store.field_column(name, end)
+            self.fields[name] = (np.frombuffer(codes, dtype=np.uint32), values)
+        if rows is not None and not (isinstance(rows, range) and rows == range(end)):
+            selected = np.fromiter(rows, dtype=np.intp, count=len(rows))
+            self.flags = self.flags[selected]
+            self.timestamps = self.timestamps[selected]
+            self.fields = {name: (codes[selected], values) for name, (codes, values) in self.fields.items()}
+        self.rows = len(self.flags)
+
+    @property
+    def total(self) -> int:
+        return self.rows
+
+    @property
+    def invalid(self) -> int:
+        return int(np.count_nonzero(self.flags))
+
+    def _group(self, codes: np.ndarray, keys: Sequence[str]) -> List[GroupStat]:
+        """Count rows and invalid rows per code; keys[code] names the group"""
+        totals = np.bincount(codes, minlength=len(keys))
+        invalid = np.bincount(codes, weights=self.flags, minlength=len(keys))
+        stats = [GroupStat(keys[code], int(totals[code]), int(invalid[code]))
+                 for code in np.flatnonzero(totals)]
+        stats.sort(key=lambda stat: (-stat.invalid, -stat.total, stat.key))
+        return stats
+
+    def _group_values(self, name: str, key: Callable[[str], str] = str) -> List[GroupStat]:
+        """Group by a field, optionally mapping its values to coarser keys"""
+        if name not in self.fields:
+            return self._group(np.zeros(self.rows, dtype=np.intp), [MISSING])
+        codes, values = self.fields[name]
+        # Map the distinct values (not the rows) to their group key
+        labels = [MISSING if value is None else key(value) for value in values]
+        keys, remap = np.unique(np.array(labels, dtype=object), return_inverse=True)
+        return self._group(remap.reshape(-1)[codes], list(keys))
+
+    def by_field(self, name: str) -> List[GroupStat]:
+        """Totals and invalid counts per value of an extracted field"""
+        return self._group_values(name)
+
+    def by_program(self) -> List[GroupStat]:
+        """Totals and invalid counts per test program"""
+        return self._group_values(PROGRAM_FIELD)
+
+    def by_family(self) -> List[GroupStat]:
+        """Totals and invalid counts per product family (program prefix)"""
+        return self._group_values(PROGRAM_FIELD, product_family)
+
+    def by_time(self, time_format: str = "%Y-%m-%d") -> List[GroupStat]:
+        """
+        Totals and invalid counts per period of the log time
+        time_format: strftime format naming the period, e.g. "%Y-%m-%d %H:00"
+        for hours (no finer than hours); rows are grouped by the formatted
+        local time
+        """
+        if not self.rows:
+            return []
+        # Format each distinct quarter hour once instead of every row
+        quarters, inverse = np.unique(self.timestamps // QUARTER_HOUR, return_inverse=True)
+        labels = [time.strftime(time_format, time.localtime(int(quarter) * QUARTER_HOUR))
+                  for quarter in quarters]
+        keys, remap = np.unique(np.array(labels, dtype=object), return_inverse=True)
+        stats = self._group(remap.reshape(-1)[inverse.reshape(-1)], list(keys))
+        stats.sort(key=lambda stat: stat.key)
+        return stats
+
+    def by_day(self) -> List[GroupStat]:
+        return self.by_time("%Y-%m-%d")
+
+    def by_hour(self) -> List[GroupStat]:
+        return self.by_time("%Y-%m-%d %H:00")
+
+    def numeric(self, name: str = TRIM_FIELD) -> np.ndarray:
+        """
+        Per-row numeric value of a field, in its NUMBER_BASES base (NaN where
+        missing or not a number)
+        """
+        if name not in self.fields:
+            return np.full(self.rows, np.nan)
+        codes, values = self.fields[name]
+        base = NUMBER_BASES.get(name, 10)
+        return np.array([parse_number(value, base) for value in values])[codes]
+
+    def distribution(self, name: str = TRIM_FIELD, bins: int = 10) -> dict:
+        """
+        Distribution of a numeric field such as the trim value
+        Returns: {"count", "min", "max", "mean", "median", "p5", "p95",
+        "bins": [(low, high, total, invalid)]}; count is 0 when no row has
+        a numeric value
+        """
+        values = self.numeric(name)
+        present = ~np.isnan(values)
+        numbers = values[present]
+        if not numbers.size:
+            return {"count": 0, "bins": []}
+
+        p5, median, p95 = np.percentile(numbers, [5, 50, 95])
+        totals, edges = np.histogram(numbers, bins=bins)
+        invalid, _ = np.histogram(numbers, bins=edges, weights=self.flags[present])
+        return {
+            "count": int(numbers.size),
+            "min": float(numbers.min()),
+            "max": float(numbers.max()),
+            "mean": float(numbers.mean()),
+            "median": float(median),
+            "p5": float(p5),
+            "p95": float(p95),
+            "bins": [(float(edges[i]), float(edges[i + 1]), int(totals[i]), int(invalid[i]))
+                     for i in range(len(totals))],
+        }
+
+    def summary(self) -> Dict[str, object]:
+        """
+        All aggregates at once
+        Returns: {"total", "invalid", "by_program", "by_family", "by_day",
+        "by_hour", "fields": {other field: [GroupStat]}, "trim": distribution}
+        """
+        others = {name: self.by_field(name) for name in self.fields
+                  if name not in (PROGRAM_FIELD, TRIM_FIELD)}
+        return {
+            "total": self.total,
+            "invalid": self.invalid,
+            "by_program": self.by_program(),
+            "by_family": self.by_family(),
+            "by_day": self.by_day(),
+            "by_hour": self.by_hour(),
+            "fields": others,
+            "trim": self.distribution(TRIM_FIELD),
+        }
@@ -0,0 +1,123 @@
+"""
+Archive - Read log bundles (zip, tar, gzip) in place without extracting
+"""
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, NamedTuple, Tuple
+import gzip
+import os
+import tarfile
+import time
+import zipfile
+
+
+# Separator between the bundle and the member in reported file names
+MEMBER_SEPARATOR = "!"
+
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+GZIP_SUFFIXES = (".gz",)
+
+
+class ArchiveMember(NamedTuple):
+    """A single member of a zip bundle, scanned like a file"""
+    archive: Path
+    member: str
+
+    @property
+    def name(self) -> str:
+        """Reported file name, e.g. bundle.zip!member.log"""
+        return f"{self.archive.name}{MEMBER_SEPARATOR}{self.member}"
+
+    def __str__(self) -> str:
+        return f"{self.archive}{MEMBER_SEPARATOR}{self.member}"
+
+
+def archive_kind(file_name: str) -> str:
+    """Returns: "zip", "tar", "gzip" or "" for plain files"""
+    name = file_name.lower()
+    if name.endswith(ZIP_SUFFIXES):
+        return "zip"
+    if name.endswith(TAR_SUFFIXES):
+        return "tar"
+    if name.endswith(GZIP_SUFFIXES):
+        return "gzip"
+    return ""
+
+
+def member_name(archive: Path, member: str) -> str:
+    """Reported file name of a member of a streamed (tar/gzip) bundle"""
+    return f"{archive.name}{MEMBER_SEPARATOR}{member}"
+
+
+def list_zip_members(path: Path) -> List[Tuple[str, int]]:
+    """
+    List the files of a zip bundle from its central directory
+    Returns: [(member name, uncompressed size)]
+    """
+    with zipfile.ZipFile(path) as bundle:
+        return [(info.filename, info.file_size) for info in bundle.infolist() if not info.is_dir()]
+
+
+def zip_mtime(info: zipfile.ZipInfo) -> int:
+    """Modification time of a zip member (stored as local time) as a Unix timestamp"""
+    return int(time.mktime(info.date_time + (0, 0, -1)))
+
+
+class ZipReader:
+    """Keeps the last opened zip bundle so consecutive members share it"""
+
+    def __init__(self):
+        self._path = None
+        self._bundle = None
+
+    def open(self, member: ArchiveMember) -> BinaryIO:
+        """Open a zip member as a binary stream"""
+        if self._path != member.archive:
+            self.close()
+            self._bundle = zipfile.ZipFile(member.archive)
+            self._path = member.archive
+        return self._bundle.open(member.member)
+
+    def mtime(self, member: ArchiveMember) -> int:
+        """Modification time of a member of the bundle opened last"""
+        return zip_mtime(self._bundle.getinfo(member.member))
+
+    def close(self):
+        """Close the cached bundle"""
+        if self._bundle is not None:
+            self._bundle.close()
+        self._bundle = None
+        self._path = None
+
+
+def iter_stream_members(path: Path) -> Iterator[Tuple[str, BinaryIO, int]]:
+    """
+    Yield (member name, binary stream, modification time) for every file of
+    a bundle
+    The bundle is read sequentially once; each stream is only valid until
+    the next member is requested.
+    """
+    kind = archive_kind(path.name)
+    if kind == "gzip":
+        with gzip.open(path, "rb") as stream:
+            yield path.name[:-len(".gz")], stream, int(os.stat(path).st_mtime)
+        return
+
+    if kind == "zip":
+        with zipfile.ZipFile(path) as bundle:
+            for info in bundle.infolist():
+                if not info.is_dir():
+                    with bundle.open(info) as stream:
+                        yield info.filename, stream, zip_mtime(info)
+        return
+
+    # Members are visited in archive order, so a compressed tar is only
+    # ever decompressed forwards, once
+    with tarfile.open(path, "r:*") as bundle:
+        for info in bundle:
+            if not info.isfile():
+                continue
+            stream = bundle.extractfile(info)
+            if stream is not None:
+                with stream:
+                    yield info.name, stream, int(info.mtime)
@@ -2,103 +2,989 @@
 Data Model - Handles business logic and data processing
 """
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Iterator, Iterable, Callable, Dict, NamedTuple
+from collections import deque
 from datetime import datetime
+from itertools import islice, chain
+import codecs
+import hashlib
+import io
+import mmap
+import os
 import re
+import sqlite3
+import threading
+import time
+
+from .archive import ArchiveMember, ZipReader, archive_kind, iter_stream_members, list_zip_members, member_name
+from .discovery import FileDiscovery, _matches
+from .metrics import ScanMetrics
+from .prefetch import Prefetcher, concurrency_for
+from .result_store import ResultStore, ResultView
+from .serial_index import POLICIES, SerialIndex
+from .rules import RuleSet
+
+
+# Marks a file that has no usable scan index entry and must be read
+_MISS = object()
+
+# Model copy used inside scan pool worker processes (set by _init_worker)
+_worker_model = None
+
+# Decoder of log files: UTF-8, ignoring invalid bytes
+_utf8_decoder = codecs.getincrementaldecoder("utf-8")
+
+
+class ScanCancelled(Exception):
+    """Raised inside a file scan when the scan has been cancelled"""
+
+
+class _Loaded(NamedTuple):
+    """A file read ahead by a prefetch thread (see DataModel._prefetch)"""
+    # Whole file, or None when the header probe rejected it
+    data: Optional[bytes]
+    # Bytes the header probe saved by rejecting the file, or None
+    avoided: Optional[int]
+    # Modification time of the log (Unix seconds)
+    log_time: int
+
+
+def _init_worker(model, cancel_event):
+    """Initialize a scan pool worker process with a copy of the model"""
+    global _worker_model
+    model._cancel_event = cancel_event
+    model._zip_reader = ZipReader()
+    _worker_model = model
+
+
+def _log_time(key: Optional[tuple]) -> Optional[int]:
+    """Modification time (Unix seconds) of a planned (path, size, mtime_ns) key, if stat'ed"""
+    return key[2] // 1_000_000_000 if key is not None else None
+
+
+def _scan_batch(items: list) -> Tuple[list, ScanMetrics]:
+    """
+    Process a batch of (file or zip member, planned log time) inside a scan
+    pool worker
+    Returns: (result of each item, metrics of the batch)
+    """
+    metrics = _worker_model.metrics = ScanMetrics()
+    started_cpu = time.process_time()
+    try:
+        results = [_worker_model._scan_file(item, log_time=log_time) for item, log_time in items]
+    finally:
+        _worker_model._zip_reader.close()
+    metrics.cpu["workers"] = time.process_time() - started_cpu
+    return results, metrics
 
 
 class DataModel:
     """Model for processing log files and extracting data"""
     
-    def __init__(self):
-        self.mfg_keyword = "mfg_data:"
-        self.invalid_mfg = "0xFFFFFFFF"
-        self.sn_keyword = "PCBA SN No          :"
-        self.test_program_keyword = "Test Program        :"
+    # "text" decodes each file line by line, "mmap" searches raw bytes
+    SCAN_MODES = ("text", "mmap")
+    # Bump when the matching logic or the result tuple changes so scan index
+    # entries are dropped
+    RULES_VERSION = 3
+    # Bytes of lines read between cancellation checks inside a file
+    READ_CHUNK = 64 * 1024
+    # Bytes of a memory map matched at a time in mmap mode
+    MMAP_BLOCK = 1024 * 1024
+    # Default size of the header block probed for the Test Program line
+    PROBE_SIZE = 16 * 1024
+    # Largest file read ahead whole by the prefetch threads; larger files
+    # are streamed by the scan thread
+    PREFETCH_LIMIT = 2 * 1024 * 1024
+    
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 32,
+                 scan_mode: str = "text", index=None, recursive: bool = False,
+                 include: Tuple[str, ...] = ("*.*",), exclude: Tuple[str, ...] = (),
+                 probe_size: int = PROBE_SIZE, rules: Optional[RuleSet] = None,
+                 retest_policy: str = "all", io_concurrency: Optional[int] = None,
+                 io_limits: Optional[Dict[str, int]] = None):
+        # Matching rules, compiled into one combined matcher (see model.rules)
+        self.rules = rules or RuleSet()
         self.total_files = 0
         self.processed_files = 0
-        self.found_items = []
+        self.processed_bytes = 0
+        self.scan_started = 0.0
+        # total_files keeps growing until discovery of the folder is done
+        self.discovery_done = False
+        self.found_items = ResultStore()
+        # Serial number index of found_items, and how retests of the same
+        # serial number are resolved in results, statistics and analytics
+        self.serial_index = SerialIndex(self.found_items)
+        # Folder of the last process_folder(); results are keyed to their
+        # file by its path relative to it (see source_of())
+        self.folder = None
+        if retest_policy not in POLICIES:
+            raise ValueError(f"Unknown retest policy: {retest_policy}")
+        self.retest_policy = retest_policy
+        # Sort orders and search text of found_items, built on first use
+        self._search = None
+        # Scan engine: number of worker processes (default = CPU cores)
+        # and the maximum number of files sent to a worker per task
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        if scan_mode not in self.SCAN_MODES:
+            raise ValueError(f"Unknown scan mode: {scan_mode}")
+        self.scan_mode = scan_mode
+        # Text mode first reads only this many header bytes to reject
+        # non-MP logs (0 disables the probe); rejected files and the bytes
+        # they did not have to read are counted per scan
+        self.probe_size = max(0, probe_size)
+        self.probe_rejected = 0
+        self.bytes_avoided = 0
+        # Read-ahead for folders where every file operation waits on the
+        # network (see model.prefetch): files are stat'ed, probed and read on
+        # this many threads while the scan thread matches the ones already
+        # read, in place of the process pool. None uses REMOTE_CONCURRENCY on
+        # network shares and 0 (off) elsewhere; io_limits sets it per share
+        # or folder, as {path prefix: concurrent reads}
+        self.io_concurrency = io_concurrency
+        self.io_limits = dict(io_limits or {})
+        # Optional persistent ScanIndex reused across scans; left out of the
+        # rest of a run (the folder scan and its rescans) once it fails
+        self.index = index
+        self._index_failed_in_run = False
+        # File discovery: recurse into subfolders, glob patterns on file names
+        self.recursive = recursive
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        # Cancellation token and pause gate (set = running) of the current scan
+        self.cancelled = False
+        self._cancel_event = threading.Event()
+        self._run_event = threading.Event()
+        self._run_event.set()
+        self._pool_cancel_event = None
+        # Zip bundle shared by consecutive members, and the number of zip
+        # members counted in total_files on top of the discovered files
+        self._zip_reader = ZipReader()
+        self._archive_extra = 0
+        # Stage timings and counters of the last process_folder() or
+        # process_files() run (see get_metrics())
+        self.metrics = ScanMetrics()
+        
+    def __getstate__(self):
+        """Pickle only the scan configuration when copying to pool workers"""
+        state = self.__dict__.copy()
+        state["found_items"] = ResultStore()
+        state["serial_index"] = None
+        state["_search"] = None
+        state["index"] = None
+        state["_cancel_event"] = None
+        state["_run_event"] = None
+        state["_pool_cancel_event"] = None
+        state["_zip_reader"] = None
+        state["metrics"] = None
+        return state
+    
+    def cancel(self):
+        """Cancel the running scan; process_folder returns partial results"""
+        self._cancel_event.set()
+        # Read once: the scan thread clears it when the pool shuts down
+        pool_cancel_event = self._pool_cancel_event
+        if pool_cancel_event is not None:
+            pool_cancel_event.set()
+        # Wake a paused scan so it can stop
+        self._run_event.set()
+        
+    def pause(self):
+        """Pause the running scan before its next file"""
+        self._run_event.clear()
         
-    def process_folder(self, folder_path: str) -> List[Tuple[str, str, bool, str]]:
+    def resume(self):
+        """Resume a paused scan"""
+        self._run_event.set()
+        
+    def is_paused(self) -> bool:
+        """Whether the scan is paused"""
+        return not self._run_event.is_set()
+        
+    def process_folder(self, folder_path: str, force_rescan: bool = False,
+                       progress_callback: Optional[Callable[[], None]] = None,
+                       result_callback: Optional[Callable[[tuple], None]] = None,
+                       error_callback: Optional[Callable[[str], None]] = None) -> ResultStore:
         """
-        Process all files in a folder
-        Returns: List of (filename, serial_number, is_invalid, check_time)
+        Process all files in a folder (and its subfolders if recursive)
+        Files are discovered in a background thread and parsed as soon as
+        they are found; total_files grows until discovery_done. Zip, tar and
+        gzip bundles are scanned in place like folders, reporting members as
+        bundle.zip!member.log; zip members are scanned like separate files.
+        Files are fanned out over a process pool when workers > 1; results
+        are always returned in file order. On Windows, plain scripts calling
+        this must be guarded by `if __name__ == "__main__":`.
+        With a scan index, unchanged files reuse their stored outcome unless
+        force_rescan is set. Folders with an io_concurrency_for() above 0
+        (network shares) are read ahead on threads instead, see
+        _iter_prefetched().
+        progress_callback is called after every file; it should be cheap and
+        read get_progress()/get_throughput() itself when it wants to report.
+        result_callback is called with each result as soon as it is found.
+        error_callback receives per-file read errors (printed by default).
+        Every MP log matched by a rule gives one result, valid or invalid.
+        Results are appended to found_items (a new ResultStore) as they are
+        found, before result_callback is called. Their file names are paths
+        relative to folder_path (see _relative_results()).
+        Stage timings and counters of the run are kept in metrics.
+        Returns: ResultStore of (filename, serial_number, is_invalid, check_time)
         """
-        results = []
-        folder = Path(folder_path)
+        metrics = self.metrics = ScanMetrics()
+        wall = metrics.wall
+        counters = metrics.counters
+        clock = time.perf_counter
+        started = clock()
+        started_cpu = time.process_time()
+        started_thread_cpu = time.thread_time()
+        results = self.found_items = ResultStore()
+        self.serial_index = SerialIndex(results)
+        folder = self.folder = Path(folder_path)
         
         if not folder.exists():
             return results
             
-        files = list(folder.glob("*.*"))
-        self.total_files = len(files)
+        self.total_files = 0
+        self._archive_extra = 0
+        self.discovery_done = False
         self.processed_files = 0
+        self.processed_bytes = 0
+        self.probe_rejected = 0
+        self.bytes_avoided = 0
+        self.scan_started = time.monotonic()
+        self.cancelled = False
+        self._cancel_event.clear()
+        self._run_event.set()
         
-        for file in files:
-            result = self._process_file(file)
-            if result:
-                results.append(result)
-            self.processed_files += 1
-                
-        self.found_items = results
+        # The scan index is only a cache: when it fails, the run goes on without it
+        index = self.index
+        self._index_failed_in_run = False
+        cached = {}
+        if index is not None:
+            index_started = clock()
+            try:
+                index.open(self._rules_fingerprint())
+                if not force_rescan:
+                    cached = index.load(folder)
+            except (sqlite3.Error, OSError) as e:
+                self._index_failed(e, error_callback)
+                index = None
+            wall["index"] += clock() - index_started
+        
+        discovery = FileDiscovery(folder, self.recursive, self.include, self.exclude,
+                                  on_error=error_callback or print, cancel_event=self._cancel_event)
+        discovery.start()
+        
+        new_entries = []
+        io_concurrency = self.io_concurrency_for(folder)
+        if io_concurrency:
+            scan = self._iter_prefetched(discovery, cached, io_concurrency)
+        else:
+            scan = self._iter_file_results(
+                self._plan_files(discovery, cached),
+                lambda: discovery.found + self._archive_extra if discovery.done else None)
+        try:
+            for file, key, hit, found, error, avoided in scan:
+                self.total_files = discovery.found + self._archive_extra
+                self.discovery_done = discovery.done
+                # Checked before recording so that files aborted by the
+                # cancellation never reach the scan index
+                if self._cancel_event.is_set():
+                    break
+                counters["files"] += 1
+                if hit is _MISS:
+                    counters["files_opened"] += 1
+                else:
+                    counters["files_cached"] += 1
+                    counters["bytes_cached"] += key[1]
+                if error:
+                    counters["files_errored"] += 1
+                    if error_callback is not None:
+                        error_callback(error)
+                    else:
+                        print(error)
+                elif hit is _MISS and key is not None and index is not None:
+                    new_entries.append(key + (found,))
+                    if len(new_entries) >= 1000:
+                        index = self._store_entries(index, new_entries, error_callback)
+                        new_entries = []
+                if hit is not _MISS:
+                    found = self._restamped(found)
+                found = self._relative_results(file, found)
+                if found:
+                    self.serial_index.extend(found, self.source_of(file))
+                    counters["files_matched"] += 1
+                    counters["results"] += len(found)
+                self.processed_files += 1
+                if key is not None:
+                    self.processed_bytes += key[1]
+                if avoided is not None:
+                    self.probe_rejected += 1
+                    self.bytes_avoided += avoided
+                    counters["files_rejected"] += 1
+                    counters["bytes_avoided"] += avoided
+                if result_callback is not None or progress_callback is not None:
+                    callbacks_started = clock()
+                    if result_callback is not None:
+                        for result in found:
+                            result_callback(result)
+                    if progress_callback is not None:
+                        progress_callback()
+                    wall["callbacks"] += clock() - callbacks_started
+        finally:
+            # Stops the pool and closes open files when the scan is cut short
+            scan.close()
+            self._zip_reader.close()
+            if index is not None:
+                self._store_entries(index, new_entries, error_callback)
+            # Ends discovery if the scan stopped early
+            discovery.stop()
+        
+        self.total_files = discovery.found + self._archive_extra
+        self.discovery_done = discovery.done
+        self.cancelled = self._cancel_event.is_set()
+        wall["discovery"] = discovery.wall
+        metrics.cpu["discovery"] = discovery.cpu
+        wall["discovery_wait"] = discovery.waited
+        wall["total"] = clock() - started
+        metrics.cpu["scan"] = time.thread_time() - started_thread_cpu
+        metrics.cpu["total"] += time.process_time() - started_cpu
         return results
     
-    def _process_file(self, file_path: Path) -> Optional[Tuple[str, str, bool, str]]:
+    def process_files(self, files: Iterable[Path],
+                      result_callback: Optional[Callable[[tuple], None]] = None,
+                      error_callback: Optional[Callable[[str], None]] = None,
+                      sources: Optional[List[str]] = None) -> List[Tuple[str, str, bool, str]]:
         """
-        Process a single file
-        Returns: (filename, serial_number, is_invalid, check_time) or None
+        Rescan individual files (e.g. files changed since the last scan)
+        Files are read in the calling thread and stored in the scan index;
+        found_items and the folder progress are left untouched. Stops early
+        when cancel() is called. metrics covers this rescan only.
+        sources, if given, receives the source_of() the file of each result,
+        for replace_results(). File names are relative to the folder of the
+        last process_folder(), like its results.
+        Returns: List of (filename, serial_number, is_invalid, check_time, fields, log_time)
         """
+        metrics = self.metrics = ScanMetrics()
+        counters = metrics.counters
+        started = time.perf_counter()
+        started_cpu = time.process_time()
+        started_thread_cpu = time.thread_time()
+        results = []
+        self._cancel_event.clear()
+        self._run_event.set()
+        
+        index = None if self._index_failed_in_run else self.index
+        new_entries = []
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                lines = f.readlines()
-            
-            # Step 1: Check if file has "MP" in Test Program
-            has_mp_program = False
-            for line in lines:
-                if self.test_program_keyword in line:
-                    # Extract test program name
-                    program_name = line.split(":")[-1].strip()
-                    # Check if "MP" is after 2nd underscore
-                    # Example: Hapuka_ADL1_MP_V1.1.csv
-                    parts = program_name.split("_")
-                    if len(parts) >= 3 and parts[2].startswith("MP"):
-                        has_mp_program = True
-                        break
-            
-            # If no MP program, skip this file
-            if not has_mp_program:
-                return None
-            
-            # Step 2: Check for mfg_data line with 0xFFFFFFFF (ONLY Invalid)
-            is_invalid = False
-            
-            for i, line in enumerate(lines):
-                if self.mfg_keyword in line:
-                    # ONLY catch if this line contains 0xFFFFFFFF (invalid)
-                    if self.invalid_mfg in line:
-                        is_invalid = True
-                        break
+            for item, key, _ in self._plan_files(files, {}):
+                found, error, avoided = self._scan_file(item, log_time=_log_time(key))
+                if self._cancel_event.is_set():
+                    break
+                counters["files"] += 1
+                counters["files_opened"] += 1
+                if avoided is not None:
+                    counters["files_rejected"] += 1
+                    counters["bytes_avoided"] += avoided
+                if error:
+                    counters["files_errored"] += 1
+                    if error_callback is not None:
+                        error_callback(error)
+                    else:
+                        print(error)
+                elif key is not None and index is not None:
+                    new_entries.append(key + (found,))
+                found = self._relative_results(item, found)
+                if found:
+                    counters["files_matched"] += 1
+                    counters["results"] += len(found)
+                if sources is not None:
+                    sources.extend([self.source_of(item)] * len(found))
+                for result in found:
+                    results.append(result)
+                    if result_callback is not None:
+                        result_callback(result)
+        finally:
+            self._zip_reader.close()
+            if index is not None:
+                self._store_entries(index, new_entries, error_callback)
+        
+        metrics.wall["total"] = time.perf_counter() - started
+        metrics.cpu["scan"] = time.thread_time() - started_thread_cpu
+        metrics.cpu["total"] += time.process_time() - started_cpu
+        return results
+    
+    def replace_results(self, files: Iterable[Path], results: List[tuple], sources: List[str]) -> List[int]:
+        """
+        Add the results of rescanned files (see process_files()) to
+        found_items in place of the results of their earlier scans, so a
+        rewritten log whose status changed shows its new status
+        sources: the source_of() the file of each result
+        Returns: found_items rows superseded (left out of get_results())
+        """
+        replaced = self.serial_index.supersede(self.source_of(file) for file in files)
+        start = 0
+        while start < len(results):
+            end = start + 1
+            while end < len(results) and sources[end] == sources[start]:
+                end += 1
+            self.serial_index.extend(results[start:end], sources[start])
+            start = end
+        return replaced
+    
+    def source_of(self, file) -> str:
+        """
+        Key of a scanned file (a Path, or an ArchiveMember for its bundle)
+        in the serial index: its path relative to the scanned folder
+        """
+        path = Path(getattr(file, "archive", file))
+        if self.folder is not None:
+            try:
+                return path.relative_to(self.folder).as_posix()
+            except ValueError:
+                pass
+        return path.as_posix()
+    
+    def _store_entries(self, index, entries: list, error_callback: Optional[Callable[[str], None]]):
+        """
+        Store new entries in the scan index
+        Returns: the index, or None when it failed and the run goes on without it
+        """
+        started = time.perf_counter()
+        try:
+            index.store(entries)
+        except (sqlite3.Error, OSError) as e:
+            self._index_failed(e, error_callback)
+            index = None
+        self.metrics.wall["index"] += time.perf_counter() - started
+        return index
+    
+    def _index_failed(self, error: Exception, error_callback: Optional[Callable[[str], None]]):
+        """Report a scan index failure (read-only folder, locked database, full disk...) once per run"""
+        self._index_failed_in_run = True
+        message = f"Scan index unavailable, scanning without it: {error}"
+        if error_callback is not None:
+            error_callback(message)
+        else:
+            print(message)
+    
+    @staticmethod
+    def _restamped(results: list) -> list:
+        """
+        Results reused from the scan index with the check time of this scan,
+        like the files read in it, instead of the scan that stored them
+        """
+        if not results:
+            return results
+        check_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return [tuple(result[:3]) + (check_time,) + tuple(result[4:]) for result in results]
+    
+    def _relative_results(self, file, results: list) -> list:
+        """
+        Results of a scanned file (or ArchiveMember) named by their path
+        relative to the scanned folder, e.g. st1/a.log or st2/logs.zip!a.log,
+        so same-named logs of different subfolders are told apart; the scan
+        and the scan index keep the bare names, whatever folder is scanned
+        """
+        subfolder = self.source_of(file).rpartition("/")[0]
+        if not subfolder or not results:
+            return results
+        return [(f"{subfolder}/{result[0]}",) + tuple(result[1:]) for result in results]
+    
+    def _plan_files(self, files: Iterable[Path], cached: dict) -> Iterator[tuple]:
+        """
+        Stat each file and look it up in the scan index
+        Zip bundles are expanded into one ArchiveMember item per member,
+        read from the central directory without decompressing anything.
+        Yields: (file, key, cached results or _MISS) where key is
+        (path, size, mtime_ns), or None if the file could not be stat'ed
+        """
+        wall = self.metrics.wall
+        clock = time.perf_counter
+        for file in self._gated(files):
+            # Timed up to the yield, which hands over to the consumer
+            started = clock()
+            planned = self._plan_file(file, cached)
+            # A zip bundle counts as its members
+            self._archive_extra += len(planned) - 1
+            wall["plan"] += clock() - started
+            yield from planned
+    
+    def _gated(self, files: Iterable[Path]) -> Iterator[Path]:
+        """files, waiting while the scan is paused and stopping once it is cancelled"""
+        for file in files:
+            self._run_event.wait()
+            if self._cancel_event.is_set():
+                return
+            yield file
+    
+    def _plan_file(self, file: Path, cached: dict) -> List[tuple]:
+        """
+        Stat a file and look it up in the scan index (see _plan_files())
+        Returns: [(item, key, cached results or _MISS)], one per member of a
+        zip bundle
+        """
+        try:
+            stat = file.stat()
+        except OSError:
+            return [(file, None, _MISS)]
+        
+        if archive_kind(file.name) == "zip":
+            try:
+                members = [(name, size) for name, size in list_zip_members(file)
+                           if self._member_selected(name)]
+            except Exception:
+                # Scanned as a whole so the read error gets reported
+                return [(file, None, _MISS)]
+            # Members change together with the bundle's mtime
+            return [self._plan_item(member, (str(member), size, stat.st_mtime_ns), cached)
+                    for member, size in ((ArchiveMember(file, name), size) for name, size in members)]
+        return [self._plan_item(file, (str(file), stat.st_size, stat.st_mtime_ns), cached)]
+    
+    @staticmethod
+    def _plan_item(item, key: tuple, cached: dict) -> tuple:
+        """Returns: (item, key, cached results or _MISS)"""
+        entry = cached.get(key[0])
+        if entry is not None and entry[0] == key[1] and entry[1] == key[2]:
+            return item, key, entry[2]
+        return item, key, _MISS
+    
+    def _member_selected(self, name: str) -> bool:
+        """Whether a bundle member matches the include/exclude patterns"""
+        base_name = name.rsplit("/", 1)[-1]
+        return (_matches(base_name, name, self.include)
+                and not _matches(base_name, name, self.exclude))
+    
+    def _iter_file_results(self, items: Iterable[tuple],
+                           total: Optional[Callable[[], Optional[int]]] = None) -> Iterator[tuple]:
+        """
+        Scan planned (file, key, hit) items and yield them in order
+        Uses the serial path when workers == 1 (or there is a single file),
+        otherwise keeps a bounded window of batches in flight on the pool.
+        total: returns the number of items once discovery is done, else None
+        Yields: (file, key, hit, results, error, bytes avoided by the probe or None)
+        """
+        # Only a second file is waited for; the pool is sized for small
+        # folders when discovery is already done by then
+        items = iter(items)
+        head = list(islice(items, 2)) if self.workers > 1 else []
+        items = chain(head, items)
+        if len(head) < 2:
+            total = len(head)
+        else:
+            total = total() if total is not None else None
+        
+        workers = self.workers if total is None else min(self.workers, total)
+        if workers <= 1:
+            for file, key, hit in items:
+                if hit is _MISS:
+                    yield (file, key, hit) + self._scan_file(file, log_time=_log_time(key))
+                else:
+                    yield file, key, hit, hit, None, None
+            return
+        
+        # Batches start at one file and double up to the chunk size, so the
+        # first files are scanned while discovery goes on; small folders get
+        # smaller batches so every worker has work
+        limit = self.chunk_size if total is None else max(1, min(self.chunk_size, total // (workers * 4)))
+        chunk = 1
+        
+        # Imported here so serial scans and CLI startup skip the pool machinery
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+        
+        # Workers abort the file they are reading when this is set
+        self._pool_cancel_event = multiprocessing.Event()
+        if self._cancel_event.is_set():
+            self._pool_cancel_event.set()
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(self, self._pool_cancel_event)) as pool:
+            pending = deque()
+            in_flight = 0
             
-            # If not invalid (0xFFFFFFFF), skip this file
-            if not is_invalid:
-                return None
+            def submit_next() -> bool:
+                """Queue the next batch; only files that are not cached are sent"""
+                nonlocal in_flight, chunk
+                batch = list(islice(items, chunk))
+                chunk = min(limit, chunk * 2)
+                if not batch:
+                    return False
+                misses = [(file, _log_time(key)) for file, key, hit in batch if hit is _MISS]
+                future = pool.submit(_scan_batch, misses) if misses else None
+                in_flight += future is not None
+                pending.append((batch, future))
+                return True
             
-            # Step 3: Extract serial number
-            serial_number = "N/A"
-            for line in lines:
-                if self.sn_keyword in line:
-                    serial_number = line.split(":")[-1].strip()
-                    break
+            try:
+                while in_flight < workers * 2 and submit_next():
+                    pass
+                
+                while pending:
+                    batch, future = pending.popleft()
+                    scanned = ()
+                    if future is not None:
+                        scanned, batch_metrics = future.result()
+                        self.metrics.add(batch_metrics)
+                        # CPU time of the scan processes counts towards the run's
+                        self.metrics.cpu["total"] += batch_metrics.cpu["workers"]
+                    scanned = iter(scanned)
+                    in_flight -= future is not None
+                    while in_flight < workers * 2 and submit_next():
+                        pass
+                    
+                    for file, key, hit in batch:
+                        if hit is _MISS:
+                            yield (file, key, hit) + next(scanned)
+                        else:
+                            yield file, key, hit, hit, None, None
+            finally:
+                # Drop queued batches so shutdown only waits for running ones
+                for _, future in pending:
+                    if future is not None:
+                        future.cancel()
+                self._pool_cancel_event = None
+    
+    def _iter_prefetched(self, files: Iterable[Path], cached: dict, concurrency: int) -> Iterator[tuple]:
+        """
+        Scan files read ahead by a Prefetcher: up to concurrency files are
+        stat'ed, looked up in the scan index, probed and read at once by
+        _prefetch() on threads, so their network latency overlaps, while
+        this thread matches the files already read, in file order
+        Yields: like _iter_file_results()
+        """
+        prefetcher = Prefetcher(lambda file: self._prefetch(file, cached), concurrency)
+        try:
+            for _, (planned, load_metrics) in prefetcher.map(self._gated(files)):
+                self.metrics.add(load_metrics)
+                self._archive_extra += len(planned) - 1
+                for item, key, hit, loaded in planned:
+                    if hit is _MISS:
+                        yield (item, key, hit) + self._scan_file(item, loaded, _log_time(key))
+                    else:
+                        yield item, key, hit, hit, None, None
+        finally:
+            self.metrics.wall["prefetch_wait"] += prefetcher.waited
+    
+    def _prefetch(self, file: Path, cached: dict) -> Tuple[List[tuple], ScanMetrics]:
+        """
+        Plan a file and read it ahead of matching (runs on a prefetch thread)
+        Files to scan up to PREFETCH_LIMIT bytes are read whole, after the
+        header probe; zip members, larger files and files that fail to open
+        are left to _scan_file(), which also reports the errors.
+        Returns: ([(item, key, cached results or _MISS, _Loaded or None)],
+        metrics of the load, kept apart since the threads run concurrently)
+        """
+        metrics = ScanMetrics()
+        wall = metrics.wall
+        clock = time.perf_counter
+        started = clock()
+        planned = self._plan_file(file, cached)
+        wall["plan"] += clock() - started
+        
+        loads = []
+        for item, key, hit in planned:
+            loaded = None
+            if hit is _MISS and key is not None and isinstance(item, Path) \
+                    and not archive_kind(item.name) and key[1] <= self.PREFETCH_LIMIT:
+                try:
+                    loaded = self._read_ahead(item, key, metrics)
+                except OSError:
+                    pass
+            loads.append((item, key, hit, loaded))
+        # Reading counts as parsing, as in _scan_file()
+        wall["parse"] += wall["probe"] + wall["read"]
+        return loads, metrics
+    
+    def _read_ahead(self, file_path: Path, key: tuple, metrics: ScanMetrics) -> _Loaded:
+        """Read a file whole, or just its header when the probe rejects it"""
+        wall = metrics.wall
+        counters = metrics.counters
+        clock = time.perf_counter
+        log_time = _log_time(key)
+        started = clock()
+        with open(file_path, "rb") as f:
+            head = b""
+            if self.probe_size and self.scan_mode == "text":
+                head = f.read(self.probe_size)
+                wall["probe"] += clock() - started
+                counters["bytes_read"] += len(head)
+                if self._probe_block(head, key[1]) is not None:
+                    # Without the probe the whole file would have been read
+                    return _Loaded(None, max(0, key[1] - len(head)), log_time)
+                started = clock()
+            rest = f.read()
+        wall["read"] += clock() - started
+        # Matched from memory, which counts no bytes again
+        counters["bytes_read"] += len(rest)
+        return _Loaded(head + rest if head else rest, None, log_time)
+    
+    def _process_file(self, file_path: Path) -> Optional[tuple]:
+        """
+        Process a single file
+        Returns: (filename, serial_number, is_invalid, check_time, fields, log_time) or None
+        """
+        results, error, _ = self._scan_file(file_path)
+        if error:
+            print(error)
+        return results[0] if results else None
+    
+    def _scan_file(self, item, loaded: Optional[_Loaded] = None,
+                   log_time: Optional[int] = None) -> Tuple[List[tuple], Optional[str], int]:
+        """
+        Process a file, zip member or streamed bundle, reporting read errors
+        instead of printing them; its time counts as the parse stage
+        Returns: (results, error message or None, bytes the header probe
+        saved if it rejected the file, else None); results found before an
+        error are kept. A result is (filename, serial_number, is_invalid,
+        check_time, fields, log_time): fields holds the other values
+        extracted by the rule, log_time is the log's modification time.
+        loaded is the file as read ahead by _prefetch(), if it was.
+        log_time is the modification time of a plain file from its plan,
+        saving a second stat (another round trip on network shares); the
+        file is stat'ed when it is None.
+        """
+        started = time.perf_counter()
+        try:
+            return self._scan_item(item, loaded, log_time)
+        finally:
+            self.metrics.wall["parse"] += time.perf_counter() - started
+    
+    def _scan_item(self, item, loaded: Optional[_Loaded] = None,
+                   log_time: Optional[int] = None) -> Tuple[List[tuple], Optional[str], int]:
+        """_scan_file() without the timing"""
+        results = []
+        try:
+            # Probed when it was read ahead
+            if loaded is not None and loaded.avoided is not None:
+                return results, None, loaded.avoided
             
-            # Step 4: Get check time (current time)
-            check_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # (name, outcome, log modification time, or None to stat the file)
+            if loaded is not None:
+                matches = [(item.name, self._match_data(loaded.data), loaded.log_time)]
+            elif isinstance(item, ArchiveMember):
+                with self._zip_reader.open(item) as stream:
+                    matches = [(item.name, self._match_stream(stream), self._zip_reader.mtime(item))]
+            elif archive_kind(item.name):
+                # Tar and gzip bundles are read sequentially, member by member
+                matches = ((member_name(item, name), self._match_stream(stream), mtime)
+                           for name, stream, mtime in iter_stream_members(item)
+                           if self._member_selected(name))
+            elif self.scan_mode == "mmap":
+                matches = [(item.name, self._match_file_mmap(item), log_time)]
+            else:
+                outcome, avoided = self._match_file_text(item)
+                if avoided is not None:
+                    return results, None, avoided
+                matches = [(item.name, outcome, log_time)]
             
-            return (file_path.name, serial_number, is_invalid, check_time)
+            for name, outcome, log_time in matches:
+                # Skip files without an MP program or without mfg_data
+                if outcome is None:
+                    continue
+                serial_number, is_invalid, fields = outcome
+                
+                # Step 4: Get check time (current time); the log's own
+                # modification time dates the test itself
+                check_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                if log_time is None:
+                    log_time = int(os.stat(item).st_mtime)
+                
+                results.append((name, serial_number, is_invalid, check_time, fields, log_time))
+            return results, None, None
                     
+        except ScanCancelled:
+            return results, f"Cancelled while reading {item}", None
         except Exception as e:
-            print(f"Error reading file {file_path}: {e}")
+            return results, f"Error reading file {item}: {e}", None
+    
+    def _probe_block(self, head: bytes, size: int) -> Optional[int]:
+        """
+        Evaluate the Test Program rule on the header block of a file of size
+        bytes, already read
+        Returns: the end of the Test Program line if the header proves the
+        file is not an MP log, else None
+        """
+        pos = head.find(self.rules.program_keyword.encode())
+        if pos < 0:
+            return None
+        start, end = self._line_bounds(head, pos)
+        # The line may continue past the probed block
+        if end == len(head) and len(head) < size:
+            return None
+        if not self.rules.rejects_program(head[start:end].decode("utf-8", errors="ignore")):
+            return None
+        return end
+    
+    def _match_file_text(self, file_path: Path) -> Tuple[Optional[tuple], Optional[int]]:
+        """
+        Match a file as decoded text, after evaluating the Test Program rule
+        on its first probe_size bytes only (0 disables the probe); the
+        probed header is matched with the rest of the file, not read again
+        Returns: ((serial number, is_invalid, other fields) of an MP log, or
+        None; bytes saved by the probe if it rejected the file, else None)
+        """
+        wall = self.metrics.wall
+        started = time.perf_counter()
+        with open(file_path, "rb") as f:
+            head = b""
+            if self.probe_size:
+                head = f.read(self.probe_size)
+                self.metrics.counters["bytes_read"] += len(head)
+                size = os.fstat(f.fileno()).st_size
+                rejected_at = self._probe_block(head, size)
+                wall["probe"] += time.perf_counter() - started
+                if rejected_at is not None:
+                    # Without the probe, the READ_CHUNK blocks up to the end
+                    # of the Test Program line would have been read
+                    unprobed = min(size, -(-(rejected_at + 1) // self.READ_CHUNK) * self.READ_CHUNK)
+                    return None, max(0, unprobed - len(head))
+            else:
+                wall["read"] += time.perf_counter() - started
+            return self._match_stream(f, head), None
+    
+    def _match_data(self, data: bytes) -> Optional[tuple]:
+        """
+        Match a whole file already read into memory (and counted in
+        bytes_read when it was read), in the scan mode
+        Returns: (serial number, is_invalid, other fields) of an MP log, or None
+        """
+        if self.scan_mode == "mmap":
+            return self._outcome(self.rules.match(self._iter_blocks(data, counted=False)))
+        return self._match_stream(io.BytesIO(data), counted=False)
+    
+    def _match_stream(self, stream, head: bytes = b"", counted: bool = True) -> Optional[tuple]:
+        """
+        Match an open binary stream (file or archive member) as decoded
+        text with all rules in a single pass
+        head: bytes already read from the stream (by the header probe),
+        matched before the rest
+        Returns: (serial number, is_invalid, other fields) of an MP log, or None
+        """
+        return self._outcome(self.rules.match(self._iter_chunks(stream, head, counted)))
+    
+    def _iter_chunks(self, f, head: bytes = b"", counted: bool = True) -> Iterator[str]:
+        """
+        Yield blocks of whole lines decoded from head and then a binary
+        stream, checking for cancellation between blocks
+        Decodes like a text-mode open() (UTF-8 ignoring errors, universal
+        newlines), but separately from the reads so both can be timed.
+        The bytes read from the stream count in bytes_read when counted.
+        """
+        decoder = io.IncrementalNewlineDecoder(_utf8_decoder(errors="ignore"), translate=True)
+        wall = self.metrics.wall
+        counters = self.metrics.counters
+        clock = time.perf_counter
+        rest = ""
+        # The first read completes the head's block, so blocks end where
+        # they would without it
+        size = self.READ_CHUNK - len(head) % self.READ_CHUNK
+        while True:
+            started = clock()
+            if head:
+                raw, head = head, b""
+            else:
+                raw = f.read(size)
+                size = self.READ_CHUNK
+                if counted:
+                    counters["bytes_read"] += len(raw)
+            read = clock()
+            data = decoder.decode(raw, final=not raw)
+            wall["read"] += read - started
+            wall["decode"] += clock() - read
+            if self._cancel_event is not None and self._cancel_event.is_set():
+                raise ScanCancelled()
             
-        return None
+            data = rest + data
+            if not raw:
+                if data:
+                    yield data
+                return
+            # Keep a partial last line for the next block
+            cut = data.rfind("\n") + 1
+            rest = data[cut:]
+            if cut:
+                yield data[:cut]
+    
+    def _match_file_mmap(self, file_path: Path) -> Optional[tuple]:
+        """
+        Match a file as raw bytes through a read-only memory map
+        The combined rule pattern runs over the mapping as bytes; only lines
+        holding a keyword are decoded. Gives the same answer as text mode.
+        Returns: (serial number, is_invalid, other fields) of an MP log, or None
+        """
+        started = time.perf_counter()
+        with open(file_path, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return None
+            finally:
+                self.metrics.wall["read"] += time.perf_counter() - started
+        
+        with data:
+            return self._outcome(self.rules.match(self._iter_blocks(data)))
+    
+    def _iter_blocks(self, data, counted: bool = True) -> Iterator[Tuple[object, int, int]]:
+        """
+        Yield (data, start, end) windows of whole lines of a memory map (or
+        bytes), checking for cancellation between them
+        The windows are searched in place (see RuleSet.match), so no block
+        is copied out of the map; its pages are read as they are searched,
+        which counts as matching.
+        """
+        counters = self.metrics.counters
+        start = 0
+        size = len(data)
+        while start < size:
+            if self._cancel_event is not None and self._cancel_event.is_set():
+                raise ScanCancelled()
+            end = min(start + self.MMAP_BLOCK, size)
+            if end < size:
+                cut = data.rfind(b"\n", start, end)
+                if cut < 0:
+                    # Line longer than a block: extend to its end
+                    cut = data.find(b"\n", end)
+                end = size if cut < 0 else cut + 1
+            if counted:
+                counters["bytes_read"] += end - start
+            yield data, start, end
+            start = end
+    
+    @staticmethod
+    def _outcome(matched: Optional[tuple]) -> Optional[Tuple[str, bool, dict]]:
+        """
+        Outcome of a (rule name, fields, is_invalid) rule match, or None
+        Returns: (serial number or "N/A", is_invalid, the other fields found)
+        """
+        if matched is None:
+            return None
+        _, fields, is_invalid = matched
+        serial_number = fields.get("serial_number")
+        others = {name: value for name, value in fields.items()
+                  if name != "serial_number" and value is not None}
+        return (serial_number if serial_number is not None else "N/A"), is_invalid, others
+    
+    @staticmethod
+    def _line_bounds(data, pos: int) -> Tuple[int, int]:
+        """Return (start, end) of the line containing byte offset pos"""
+        start = max(data.rfind(b"\n", 0, pos), data.rfind(b"\r", 0, pos)) + 1
+        end = len(data)
+        for newline in (b"\n", b"\r"):
+            found = data.find(newline, pos, end)
+            if found >= 0:
+                end = found
+        return start, end
+    
+    def io_concurrency_for(self, folder: str) -> int:
+        """Files read ahead at once when scanning folder (0: no read-ahead)"""
+        return concurrency_for(folder, self.io_limits, self.io_concurrency)
+    
+    def _rules_fingerprint(self) -> str:
+        """Hash of the matching rules, used to invalidate the scan index"""
+        rules = "\0".join([str(self.RULES_VERSION), self.rules.fingerprint()])
+        return hashlib.sha1(rules.encode("utf-8")).hexdigest()
     
     def get_progress(self) -> Tuple[int, int, float]:
         """
@@ -109,10 +995,69 @@ class DataModel:
         percentage = (self.processed_files / self.total_files) * 100
         return (self.processed_files, self.total_files, percentage)
     
+    def get_throughput(self) -> Tuple[float, float, float]:
+        """
+        Returns: (files_per_sec, mb_per_sec, eta_seconds) of the current scan
+        eta_seconds is -1.0 while it cannot be estimated yet
+        """
+        elapsed = time.monotonic() - self.scan_started
+        if self.processed_files == 0 or elapsed <= 0:
+            return (0.0, 0.0, -1.0)
+        files_per_sec = self.processed_files / elapsed
+        mb_per_sec = self.processed_bytes / elapsed / (1024 * 1024)
+        eta = (self.total_files - self.processed_files) / files_per_sec
+        return (files_per_sec, mb_per_sec, eta)
+    
+    def get_metrics(self) -> dict:
+        """
+        Stage timings and counters of the last process_folder() or
+        process_files() run, as a JSON-compatible dict (see model.metrics)
+        """
+        return self.metrics.as_dict()
+    
+    def get_results(self) -> ResultView:
+        """found_items with retests resolved by retest_policy"""
+        return self.serial_index.view(self.retest_policy)
+    
+    def query_results(self, status: str = "all", text: str = "", sort_column: str = "row",
+                      descending: bool = False, results: Optional[ResultView] = None) -> ResultView:
+        """
+        get_results() (or other rows of found_items) filtered by status and
+        search text and sorted, without rescanning
+        status: "all", "invalid" or "valid"
+        text: substring, or prefix ending with *, of the serial number or file name
+        sort_column: one of model.result_search.SORT_COLUMNS ("row" is scan order)
+        """
+        if results is None:
+            results = self.get_results()
+        return self._get_search().select(results, status, text, sort_column, descending)
+    
+    def prepare_search(self):
+        """Build the sort orders and search text of found_items ahead of the first query"""
+        self._get_search().prepare()
+    
+    def _get_search(self):
+        """model.result_search.ResultSearch of found_items"""
+        from .result_search import ResultSearch
+        search = self._search
+        if search is None or search.store is not self.found_items:
+            search = self._search = ResultSearch(self.found_items)
+        return search
+    
+    def get_analytics(self):
+        """
+        Grouped aggregates (per program, family, day, trim value...) of
+        get_results(), computed with NumPy
+        Returns: model.analytics.ResultAnalytics
+        """
+        from .analytics import ResultAnalytics
+        return ResultAnalytics(self.found_items, self.serial_index.resolve(self.retest_policy))
+    
     def get_statistics(self) -> dict:
-        """Get statistics about processed data"""
-        total = len(self.found_items)
-        invalid = sum(1 for _, _, is_invalid, _ in self.found_items if is_invalid)
+        """Get statistics about processed data (after retest resolution)"""
+        results = self.get_results()
+        total = len(results)
+        invalid = results.count_invalid()
         valid = total - invalid
         
         return {
@@ -0,0 +1,172 @@
+"""
+File Discovery - Streaming os.scandir walk feeding the scanner
+"""
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+import fnmatch
+import os
+import queue
+import threading
+import time
+
+from .archive import archive_kind
+
+
+def _matches(name: str, rel_path: str, patterns: Iterable[str]) -> bool:
+    """Match a pattern against the entry name, or the relative path if it has a '/'"""
+    for pattern in patterns:
+        target = rel_path if "/" in pattern else name
+        if fnmatch.fnmatch(target, pattern):
+            return True
+    return False
+
+
+def iter_files(root: str, recursive: bool = False, include: Iterable[str] = ("*.*",),
+               exclude: Iterable[str] = (),
+               on_error: Optional[Callable[[str], None]] = None) -> Iterator[Path]:
+    """
+    Yield the files under root as they are found
+    include/exclude are glob patterns matched against the file name (or the
+    path relative to root, with '/' separators, when the pattern has a '/').
+    Archives (zip, tar, gzip) are yielded unless excluded, whatever the
+    include patterns, since their members are matched when they are scanned.
+    Excluded directories are not entered. Files reached twice through
+    hardlinks or symlinks, and symlinked directory loops, are yielded once.
+    """
+    include = tuple(include)
+    exclude = tuple(exclude)
+    seen = set()
+    # (directory path, path relative to root)
+    pending = [(os.fspath(root), "")]
+
+    while pending:
+        directory, rel_dir = pending.pop()
+        try:
+            dir_stat = os.stat(directory)
+            if dir_stat.st_ino:
+                dir_key = ("d", dir_stat.st_dev, dir_stat.st_ino)
+                if dir_key in seen:
+                    continue
+                seen.add(dir_key)
+            entries = os.scandir(directory)
+        except OSError as e:
+            if on_error is not None:
+                on_error(f"Cannot list folder {directory}: {e}")
+            continue
+
+        subdirs = []
+        with entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                try:
+                    if entry.is_dir():
+                        if recursive and not _matches(entry.name, rel_path, exclude):
+                            subdirs.append((entry.path, rel_path + "/"))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if not (_matches(entry.name, rel_path, include) or archive_kind(entry.name)):
+                        continue
+                    if _matches(entry.name, rel_path, exclude):
+                        continue
+
+                    # De-duplicate by inode; symlinks are keyed by their target
+                    if entry.is_symlink():
+                        stat = entry.stat()
+                        key = (stat.st_dev, stat.st_ino)
+                    else:
+                        key = (dir_stat.st_dev, entry.inode())
+                except OSError as e:
+                    if on_error is not None:
+                        on_error(f"Cannot read entry {entry.path}: {e}")
+                    continue
+
+                if key[1]:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                yield Path(entry.path)
+
+        # Depth-first, keeping each folder's subfolders in listing order
+        pending.extend(reversed(subdirs))
+
+
+# Marks the end of discovery in the feeder queue
+_DONE = object()
+
+
+class FileDiscovery(threading.Thread):
+    """
+    Runs iter_files() in a background thread so listing a huge share
+    overlaps with parsing; iterate over the object to consume the paths.
+    found grows as discovery proceeds and is final once done is True.
+    wall and cpu are the seconds the walk took, once done; waited is the
+    time the consumer spent blocked waiting for the next path.
+    Iteration ends early once stop() is called or cancel_event is set, even
+    while waiting on a slow listing.
+    """
+
+    # Seconds between cancellation checks while waiting for the next path
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, root: str, recursive: bool = False, include: Iterable[str] = ("*.*",),
+                 exclude: Iterable[str] = (), on_error: Optional[Callable[[str], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        super().__init__(name="FileDiscovery", daemon=True)
+        self.root = root
+        self.recursive = recursive
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.on_error = on_error
+        self.found = 0
+        self.done = False
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.waited = 0.0
+        self._queue = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self._cancel_event = cancel_event
+
+    def stop(self):
+        """Stop discovery early, and iteration with it"""
+        self._stop_event.set()
+
+    def run(self):
+        """Walk the folder and queue every matching file"""
+        started = time.perf_counter()
+        started_cpu = time.thread_time()
+        try:
+            for path in iter_files(self.root, self.recursive, self.include, self.exclude, self.on_error):
+                if self._stopped():
+                    break
+                self._queue.put(path)
+                self.found += 1
+        finally:
+            self.wall = time.perf_counter() - started
+            self.cpu = time.thread_time() - started_cpu
+            self.done = True
+            self._queue.put(_DONE)
+
+    def _stopped(self) -> bool:
+        """Whether stop() was called or the scan cancelled"""
+        return self._stop_event.is_set() or (self._cancel_event is not None and self._cancel_event.is_set())
+
+    def __iter__(self) -> Iterator[Path]:
+        while True:
+            try:
+                path = self._queue.get_nowait()
+            except queue.Empty:
+                started = time.perf_counter()
+                path = None
+                while path is None:
+                    if self._stopped():
+                        self.waited += time.perf_counter() - started
+                        return
+                    try:
+                        path = self._queue.get(timeout=self.POLL_INTERVAL)
+                    except queue.Empty:
+                        pass
+                self.waited += time.perf_counter() - started
+            if path is _DONE:
+                return
+            yield path
@@ -0,0 +1,138 @@
+"""
+Export - Writers for scan results (shared by the GUI and the CLI)
+"""
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
+import csv
+import importlib.util
+import json
+import os
+
+
+CSV_HEADER = ['#', 'File Name', 'Serial Number', 'Status', 'Check Time']
+
+# Rows formatted and written per chunk; progress is reported once per chunk
+EXPORT_CHUNK = 10000
+
+# Write buffer of exported files
+BUFFER_SIZE = 1024 * 1024
+
+
+class ExportCancelled(Exception):
+    """Raised by a progress callback to stop an export"""
+
+
+def _chunks(results: Iterable[tuple], size: int = EXPORT_CHUNK) -> Iterator[List[tuple]]:
+    """Consecutive lists of at most size results"""
+    iterator = iter(results)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(stream: TextIO, results: Iterable[tuple],
+              progress: Optional[Callable[[int], None]] = None):
+    """
+    Write results as CSV to an open text stream
+    results: Iterable of (filename, serial_number, is_invalid, check_time)
+    progress: called with the number of rows written after every chunk
+    """
+    writer = csv.writer(stream)
+    
+    # Write header
+    writer.writerow(CSV_HEADER)
+    
+    # Write data
+    written = 0
+    for chunk in _chunks(results):
+        writer.writerows(
+            [idx, filename, sn, 'Invalid' if is_invalid else 'Valid', check_time]
+            for idx, (filename, sn, is_invalid, check_time) in enumerate(chunk, written + 1)
+        )
+        written += len(chunk)
+        if progress is not None:
+            progress(written)
+
+
+def write_jsonl(stream: TextIO, results: Iterable[tuple],
+                progress: Optional[Callable[[int], None]] = None):
+    """
+    Write results as JSON Lines (one object per result) to an open text stream
+    results: Iterable of (filename, serial_number, is_invalid, check_time)
+    progress: called with the number of rows written after every chunk
+    """
+    # Same output as json.dumps() of the object per row, but only the
+    # strings go through the encoder
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    written = 0
+    for chunk in _chunks(results):
+        stream.write("".join(
+            f'{{"file_name": {encode(filename)}, "serial_number": {encode(sn)}, '
+            f'"status": "{"Invalid" if is_invalid else "Valid"}", "check_time": {encode(check_time)}}}\n'
+            for filename, sn, is_invalid, check_time in chunk
+        ))
+        written += len(chunk)
+        if progress is not None:
+            progress(written)
+
+
+def xlsx_available() -> bool:
+    """Whether openpyxl (optional) is installed for XLSX export"""
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+def write_xlsx(path: str, results: Iterable[tuple],
+               progress: Optional[Callable[[int], None]] = None):
+    """
+    Write results to an Excel workbook (requires openpyxl)
+    The workbook is written in write-only mode, which streams rows to the
+    file instead of keeping a cell object per value in memory.
+    results: Iterable of (filename, serial_number, is_invalid, check_time)
+    progress: called with the number of rows written after every chunk
+    """
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(CSV_HEADER)
+    written = 0
+    for chunk in _chunks(results):
+        for idx, (filename, sn, is_invalid, check_time) in enumerate(chunk, written + 1):
+            sheet.append([idx, filename, sn, 'Invalid' if is_invalid else 'Valid', check_time])
+        written += len(chunk)
+        if progress is not None:
+            progress(written)
+    workbook.save(path)
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+}
+
+
+def export_file(path: str, results: Iterable[tuple], fmt: str = "csv",
+                progress: Optional[Callable[[int], None]] = None):
+    """
+    Export results to a file in one of the formats csv, jsonl or xlsx
+    Rows are read from results as they are written, so a ResultView is
+    exported without copying it. A progress callback raising
+    ExportCancelled stops the export and removes the partial file (a
+    workbook is only saved at the end, so none is left).
+    """
+    if fmt == "xlsx":
+        write_xlsx(path, results, progress)
+        return
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    try:
+        with open(path, "w", newline="", encoding="utf-8", buffering=BUFFER_SIZE) as stream:
+            WRITERS[fmt](stream, results, progress)
+    except ExportCancelled:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,269 @@
+"""
+Result History - SQLite database of the results of every scan run
+"""
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+import sqlite3
+import threading
+import time
+
+from .paths import app_dir
+from .result_store import TIME_FORMAT, ResultView
+
+
+# Status filter values of queries
+STATUSES = ("all", "invalid", "valid")
+
+# Indexes of the results table: name -> columns
+INDEXES = {
+    "results_serial": "serial_number",
+    "results_file": "file_name",
+    "results_status": "is_invalid, check_time",
+    "results_time": "check_time",
+    "results_run": "run_id",
+}
+
+
+class Run(NamedTuple):
+    """One scan run stored in the history"""
+    run_id: int
+    folder: str
+    started: int
+    total: int
+    invalid: int
+    complete: bool
+
+
+class ResultHistory:
+    """
+    Local SQLite database keeping the results of every scan run
+    Results are written with executemany() in one transaction per batch,
+    straight from the ResultStore columns, into a results table indexed by
+    serial number, file name, status and check time, so history queries
+    read only the rows they return.
+    The database runs in WAL mode and every write uses its own connection,
+    so queries from the GUI thread are never blocked by a running insert.
+    Inserting into the indexes row by row costs several times more than
+    the table itself (serial numbers arrive in random order), so a batch
+    of at least half the size of the table drops the indexes and builds
+    them again from sorted data after the insert, in the same transaction.
+    """
+
+    FILE_NAME = "result_history.sqlite3"
+    SCHEMA_VERSION = 1
+    # Seconds a writer waits for another one (e.g. a previous run still
+    # being saved) before failing
+    BUSY_TIMEOUT = 60.0
+    # Smallest batch (and batch to table size ratio) rebuilding the indexes
+    REBUILD_ROWS = 100000
+    REBUILD_RATIO = 0.5
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path) if db_path else self.default_path()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default_path(cls) -> Path:
+        """Database file next to the application (next to the .exe when frozen)"""
+        return app_dir() / cls.FILE_NAME
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new connection, creating the tables and indexes if needed"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=self.BUSY_TIMEOUT,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                folder TEXT NOT NULL,
+                started INTEGER NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                invalid INTEGER NOT NULL DEFAULT 0,
+                complete INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                run_id INTEGER NOT NULL,
+                file_name TEXT NOT NULL,
+                serial_number TEXT NOT NULL,
+                is_invalid INTEGER NOT NULL,
+                check_time INTEGER NOT NULL
+            );
+            PRAGMA user_version = {self.SCHEMA_VERSION};
+        """)
+        self._create_indexes(conn)
+        return conn
+
+    @staticmethod
+    def _create_indexes(conn: sqlite3.Connection):
+        for name, columns in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON results ({columns})")
+
+    def _connect(self) -> sqlite3.Connection:
+        """The shared connection used for queries, opened on first use"""
+        if self._conn is None:
+            self._conn = self._open()
+        return self._conn
+
+    def add_run(self, folder: str, started: Optional[float] = None, complete: bool = True) -> int:
+        """
+        Start a new run with no results yet
+        Returns: run id
+        """
+        conn = self._open()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (folder, started, complete) VALUES (?, ?, ?)",
+                    (folder, int(started if started is not None else time.time()), int(complete))
+                )
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def add_results(self, run_id: int, results: ResultView) -> int:
+        """
+        Append results to a run in one transaction
+        The rows are read from the store while they are inserted, without
+        building an intermediate list.
+        Returns: number of rows inserted
+        """
+        store = results.store
+        rows = ((run_id, store.filename(i), store.serial_number(i), store._flags[i], store.timestamp(i))
+                for i in results.indices)
+        invalid = results.count_invalid()
+        conn = self._open()
+        try:
+            with conn:
+                # Explicit, or the DDL below would run outside the transaction
+                conn.execute("BEGIN")
+                # Row ids only grow, so the largest is about the table size
+                existing = conn.execute("SELECT MAX(rowid) FROM results").fetchone()[0] or 0
+                rebuild = len(results) >= max(self.REBUILD_ROWS, existing * self.REBUILD_RATIO)
+                if rebuild:
+                    for name in INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?)", rows)
+                if rebuild:
+                    self._create_indexes(conn)
+                conn.execute("UPDATE runs SET total = total + ?, invalid = invalid + ? WHERE id = ?",
+                             (len(results), invalid, run_id))
+        finally:
+            conn.close()
+        return len(results)
+
+    def record_run(self, folder: str, results: ResultView, started: Optional[float] = None,
+                   complete: bool = True) -> int:
+        """Store a run and all its results; returns the run id"""
+        run_id = self.add_run(folder, started, complete)
+        self.add_results(run_id, results)
+        return run_id
+
+    @staticmethod
+    def _where(serial_number: Optional[str], file_name: Optional[str], status: str,
+               since: Optional[float], until: Optional[float],
+               run_id: Optional[int]) -> Tuple[str, list]:
+        """WHERE clause and parameters of a query; a trailing * matches a prefix"""
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status: {status}")
+        clauses = []
+        params = []
+        for column, value in (("serial_number", serial_number), ("file_name", file_name)):
+            if not value:
+                continue
+            if value.endswith("*"):
+                # A range instead of LIKE so the index is used
+                prefix = value[:-1]
+                clauses.append(f"{column} >= ? AND {column} < ?")
+                params += [prefix, prefix + "\U0010ffff"]
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if status != "all":
+            clauses.append("is_invalid = ?")
+            params.append(1 if status == "invalid" else 0)
+        if since is not None:
+            clauses.append("check_time >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("check_time < ?")
+            params.append(int(until))
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, serial_number: Optional[str] = None, file_name: Optional[str] = None,
+              status: str = "all", since: Optional[float] = None, until: Optional[float] = None,
+              run_id: Optional[int] = None, limit: Optional[int] = 10000) -> List[Tuple[str, str, bool, str]]:
+        """
+        Stored results matching all given filters, newest check time first
+        serial_number, file_name: exact value, or a prefix ending with *
+        status: "all", "invalid" or "valid"
+        since, until: Unix timestamps bounding the check time [since, until)
+        Returns: (filename, serial_number, is_invalid, check_time) tuples
+        """
+        where, params = self._where(serial_number, file_name, status, since, until, run_id)
+        sql = f"SELECT file_name, serial_number, is_invalid, check_time FROM results{where} " \
+              f"ORDER BY check_time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+
+        times = {}
+        results = []
+        for filename, sn, is_invalid, check_time in rows:
+            text = times.get(check_time)
+            if text is None:
+                text = times[check_time] = time.strftime(TIME_FORMAT, time.localtime(check_time))
+            results.append((filename, sn, is_invalid == 1, text))
+        return results
+
+    def count(self, serial_number: Optional[str] = None, file_name: Optional[str] = None,
+              status: str = "all", since: Optional[float] = None, until: Optional[float] = None,
+              run_id: Optional[int] = None) -> int:
+        """Number of stored results matching the filters of query()"""
+        where, params = self._where(serial_number, file_name, status, since, until, run_id)
+        with self._lock:
+            return self._connect().execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def serial_numbers(self, status: str = "invalid", since: Optional[float] = None,
+                       until: Optional[float] = None) -> List[str]:
+        """Distinct serial numbers with results of a status in a check time range"""
+        where, params = self._where(None, None, status, since, until, None)
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT DISTINCT serial_number FROM results{where} ORDER BY serial_number", params
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def runs(self, limit: Optional[int] = 100) -> List[Run]:
+        """Stored runs, newest first"""
+        sql = "SELECT id, folder, started, total, invalid, complete FROM runs ORDER BY id DESC"
+        params = []
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [Run(run_id, folder, started, total, invalid, complete == 1)
+                for run_id, folder, started, total, invalid, complete in rows]
+
+    def delete_run(self, run_id: int):
+        """Remove a run and its results"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM results WHERE run_id = ?", (run_id,))
+                conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def close(self):
+        """Close the query connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
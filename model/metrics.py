@@ -0,0 +1,151 @@
+"""
+Scan Metrics - Per-stage timings and counters of a scan run
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import json
+
+from .paths import app_dir
+
+
+# Timed stages of a scan, in pipeline order:
+#   discovery       listing the folder (discovery thread)
+#   discovery_wait  scan thread waiting for discovery to find the next file
+#   plan            stat() of each file and its scan index lookup (summed
+#                   over prefetch threads on network shares)
+#   index           loading and storing scan index entries
+#   prefetch_wait   scan thread waiting for the prefetch threads to read the
+#                   next file (network shares, see model.prefetch)
+#   parse           reading and matching files (summed over scan processes
+#                   or prefetch threads); split into probe, read, decode and
+#                   match below
+#   probe           reading headers to reject non-MP logs
+#   read            opening files and reading their bytes
+#   decode          UTF-8 decoding and newline translation
+#   match           the rest of parse: rule matching and result building
+#   callbacks       result and progress callbacks in the scan thread
+#                   (batching results for the GUI)
+#   search          building the sort orders and search text of the
+#                   results after the scan (GUI only)
+#   ui              time the GUI thread spent showing results and progress
+#                   (recorded by the presenter)
+#   total           process_folder() from start to end
+STAGES = ("discovery", "discovery_wait", "plan", "index", "prefetch_wait", "parse", "probe", "read",
+          "decode", "match", "callbacks", "search", "ui", "total")
+
+# CPU time is taken per thread and process (a CPU clock per file would cost
+# more than the stages it measures):
+#   discovery       the discovery thread
+#   scan            the scan thread (including parsing when not in a pool)
+#   workers         the scan processes of a pool
+#   total           the whole run, scan processes included
+CPU_PARTS = ("discovery", "scan", "workers", "total")
+
+COUNTERS = (
+    "files",            # files and archive members planned
+    "files_opened",     # read from disk (fully or just the header)
+    "files_cached",     # outcome reused from the scan index, not opened
+    "files_rejected",   # opened, but rejected by the header probe
+    "files_errored",    # read errors
+    "files_matched",    # giving at least one result
+    "results",
+    "bytes_read",
+    "bytes_avoided",    # fewer bytes read thanks to the header probe, net of the header
+    "bytes_cached",     # size of the files reused from the scan index
+)
+
+
+class ScanMetrics:
+    """
+    Wall seconds per stage, CPU seconds per thread and process, and
+    counters of one scan run
+    The hot paths add to the wall, cpu and counters dicts directly: read
+    and decode times are taken per block, other stages per file, so the
+    overhead stays around a percent. Scan processes fill their own
+    instance per batch, merged with add().
+    """
+
+    # Log of the metrics of every run, one JSON object per line
+    FILE_NAME = "scan_metrics.jsonl"
+
+    def __init__(self):
+        self.wall: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.cpu: Dict[str, float] = dict.fromkeys(CPU_PARTS, 0.0)
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    @classmethod
+    def default_path(cls) -> Path:
+        """Metrics log next to the application (next to the .exe when frozen)"""
+        return app_dir() / cls.FILE_NAME
+
+    def add(self, other: "ScanMetrics"):
+        """Add the timings and counters of another run (e.g. a scan process batch)"""
+        for stage, seconds in other.wall.items():
+            self.wall[stage] += seconds
+        for stage, seconds in other.cpu.items():
+            self.cpu[stage] += seconds
+        for name, value in other.counters.items():
+            self.counters[name] += value
+
+    def as_dict(self) -> dict:
+        """
+        JSON-compatible metrics: {"wall_s": {stage: seconds}, "cpu_s":
+        {part: seconds}, "counters": {...}, "rates": {...}}
+        """
+        wall = dict(self.wall)
+        # Whatever parsing time is not spent reading is matching
+        wall["match"] = max(0.0, wall["parse"] - wall["probe"] - wall["read"] - wall["decode"])
+        counters = dict(self.counters)
+        files = counters["files"]
+        total = wall["total"]
+        return {
+            "wall_s": {stage: round(seconds, 6) for stage, seconds in wall.items()},
+            "cpu_s": {part: round(seconds, 6) for part, seconds in self.cpu.items()},
+            "counters": counters,
+            "rates": {
+                "cache_hit_rate": round(counters["files_cached"] / files, 4) if files else 0.0,
+                "probe_reject_rate": round(counters["files_rejected"] / files, 4) if files else 0.0,
+                "files_per_s": round(files / total, 1) if total else 0.0,
+                "mb_read_per_s": round(counters["bytes_read"] / (1024 * 1024) / total, 2) if total else 0.0,
+            },
+        }
+
+    def summary(self) -> str:
+        """Multi-line text summary of as_dict() for logs"""
+        metrics = self.as_dict()
+        counters = metrics["counters"]
+        rates = metrics["rates"]
+        wall = metrics["wall_s"]
+        cpu = metrics["cpu_s"]
+        total = wall["total"]
+        lines = [
+            f"Scan metrics: {counters['files']:,} files in {total:.2f} s "
+            f"({rates['files_per_s']:,.0f} files/s, {rates['mb_read_per_s']:,.1f} MB/s read)",
+            f"  files: {counters['files_opened']:,} opened, {counters['files_cached']:,} cached "
+            f"({rates['cache_hit_rate']:.0%} hit rate), {counters['files_rejected']:,} rejected by "
+            f"header probe, {counters['files_errored']:,} errors, {counters['files_matched']:,} matched",
+            f"  bytes: {counters['bytes_read'] / (1024 * 1024):,.1f} MB read, "
+            f"{counters['bytes_avoided'] / (1024 * 1024):,.1f} MB skipped by probe, "
+            f"{counters['bytes_cached'] / (1024 * 1024):,.1f} MB cached",
+        ]
+        lines.append("  time: " + ", ".join(f"{stage} {seconds:.2f} s" for stage, seconds in wall.items()
+                                            if seconds and stage != "total"))
+        lines.append("  cpu: " + ", ".join(f"{part} {seconds:.2f} s" for part, seconds in cpu.items()
+                                           if seconds))
+        return "\n".join(lines)
+
+    def _document(self, extra: Optional[dict]) -> dict:
+        """as_dict() with extra top-level keys (e.g. the folder) first"""
+        metrics = dict(extra or {})
+        metrics.update(self.as_dict())
+        return metrics
+
+    def write_json(self, path: str, extra: Optional[dict] = None):
+        """Write as_dict() (plus extra top-level keys) to a JSON file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self._document(extra), f, indent=2)
+
+    def append_json(self, path: str, extra: Optional[dict] = None):
+        """Append as_dict() (plus extra top-level keys) as one line to a JSON Lines log"""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self._document(extra)) + "\n")
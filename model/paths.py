@@ -0,0 +1,12 @@
+"""
+Paths - Location of the files the application keeps next to itself
+"""
+from pathlib import Path
+import sys
+
+
+def app_dir() -> Path:
+    """Folder of the application: next to the .exe when frozen, else the project root"""
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent.parent
@@ -0,0 +1,127 @@
+"""
+Prefetch - Read-ahead of files on network shares, overlapping their latency
+"""
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+import os
+import re
+import sys
+import time
+
+
+# Concurrent reads for folders on network shares when none is configured
+REMOTE_CONCURRENCY = 16
+
+# File system types of network mounts in /proc/mounts (Linux)
+REMOTE_FS_TYPES = ("nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs")
+
+# Marks the end of the items of a Prefetcher
+_END = object()
+
+
+def is_remote(folder: str) -> bool:
+    """
+    Whether a folder is on a network share: a UNC path or a mapped network
+    drive on Windows, an NFS or SMB mount on Linux
+    """
+    path = os.path.abspath(folder)
+    if sys.platform == "win32":
+        if path.startswith("\\\\"):
+            return True
+        import ctypes
+        drive = os.path.splitdrive(path)[0]
+        # DRIVE_REMOTE
+        return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == 4
+    try:
+        with open("/proc/mounts", encoding="utf-8", errors="replace") as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) > 2]
+    except OSError:
+        return False
+    path = os.path.realpath(path)
+    best, fs_type = "", ""
+    for mount_point, kind in mounts:
+        # Spaces and other separators are escaped as \ooo
+        mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), mount_point)
+        inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best):
+            best, fs_type = mount_point, kind
+    return fs_type in REMOTE_FS_TYPES
+
+
+def concurrency_for(folder: str, limits: Dict[str, int], default: Optional[int]) -> int:
+    """
+    Concurrent reads for a folder: the limit of the longest path prefix in
+    limits containing it, else default; a default of None gives
+    REMOTE_CONCURRENCY on network shares and 0 (no read-ahead) elsewhere
+    """
+    path = os.path.normcase(os.path.abspath(folder))
+    best = None
+    for prefix, limit in limits.items():
+        prefix = os.path.normcase(os.path.abspath(prefix))
+        inside = path == prefix or path.startswith(prefix.rstrip(os.sep) + os.sep)
+        if inside and (best is None or len(prefix) > len(best[0])):
+            best = (prefix, limit)
+    if best is not None:
+        return max(0, best[1])
+    if default is not None:
+        return max(0, default)
+    return REMOTE_CONCURRENCY if is_remote(folder) else 0
+
+
+class Prefetcher:
+    """
+    Runs a blocking load (stat, open, read...) of each item on a pool of
+    concurrency threads, up to read_ahead items ahead of the consumer, and
+    hands the loaded items back in their original order
+    Meant for sources where every file operation waits on the network: the
+    latency of one file overlaps with the loads of the next ones while the
+    consumer works on the files already loaded. Items are pulled from the
+    iterable in the consumer's thread, so it can pause or stop the flow.
+    waited is the time the consumer spent blocked on a load still running.
+    """
+
+    def __init__(self, load: Callable, concurrency: int, read_ahead: Optional[int] = None):
+        self.load = load
+        self.concurrency = max(1, concurrency)
+        # Loaded items waiting for the consumer, at least one per thread
+        self.read_ahead = max(self.concurrency, read_ahead or self.concurrency * 2)
+        self.waited = 0.0
+
+    def map(self, items: Iterable) -> Iterator[Tuple[object, object]]:
+        """Yield (item, load(item)) in item order; a load's exception is raised here"""
+        # Imported here so scans of local folders skip the thread pool machinery
+        from concurrent.futures import ThreadPoolExecutor
+
+        items = iter(items)
+        clock = time.perf_counter
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="Prefetch") as pool:
+            pending = deque()
+
+            def submit_next() -> bool:
+                """Start loading the next item"""
+                item = next(items, _END)
+                if item is _END:
+                    return False
+                pending.append((item, pool.submit(self.load, item)))
+                return True
+
+            try:
+                while len(pending) < self.read_ahead and submit_next():
+                    pass
+                while pending:
+                    item, future = pending.popleft()
+                    if not future.done():
+                        started = clock()
+                        loaded = future.result()
+                        self.waited += clock() - started
+                    else:
+                        loaded = future.result()
+                    # Refill before handing over, so reads continue while the
+                    # consumer works on this item
+                    while len(pending) < self.read_ahead and submit_next():
+                        pass
+                    yield item, loaded
+            finally:
+                # Drop queued loads so shutdown only waits for running ones
+                for _, future in pending:
+                    future.cancel()
@@ -0,0 +1,200 @@
+"""
+Result Search - Instant status filter, sorting and text search over a ResultStore
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from .result_store import ResultStore, ResultView
+
+
+# Sortable columns, in the order of the result table ("row" is scan order)
+SORT_COLUMNS = ("row", "filename", "serial_number", "status", "check_time")
+
+# Text columns searched
+TEXT_COLUMNS = ("serial_number", "filename")
+
+# Largest view filtered row by row; larger ones use the vectorized search
+ROW_SCAN_LIMIT = 5000
+
+
+class ResultSearch:
+    """
+    Filtering, sorting and search over the rows of a ResultStore
+    Sort orders are row permutations computed once per column (8 bytes per
+    row) and extended when rows are appended, so re-sorting, reversing and
+    filtering only select from them with NumPy.
+    The serial number and file name orders (case-insensitive) double as
+    prefix indexes: a prefix search is two binary searches. Substring search
+    compares the columns' UTF-8 text as one byte array, without decoding it
+    (a lowercased copy is kept after the first search).
+    Search text ending with * matches a prefix, any other text a substring,
+    of the serial number or the file name, ignoring case.
+    prepare() builds these structures ahead of the first query, e.g. in the
+    scan thread; each one is replaced as a whole, so a query running at the
+    same time at worst builds it twice.
+    """
+
+    def __init__(self, store: ResultStore):
+        self.store = store
+        # column -> (rows covered, permutation of those rows)
+        self._orders: Dict[str, Tuple[int, np.ndarray]] = {}
+        # column -> (lowercased UTF-8 text of the rows searched so far,
+        # occurrences of each byte value in it)
+        self._lowered: Dict[str, Tuple[bytes, np.ndarray]] = {}
+
+    def _text(self, column: str) -> Callable[[int], str]:
+        """Case-folded value of a text column for a row"""
+        value = getattr(self.store, column)
+        return lambda i: value(i).casefold()
+
+    def order(self, column: str) -> np.ndarray:
+        """Rows sorted by a column (ties in row order), covering every current row"""
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {column}")
+        count = len(self.store)
+        if column == "row":
+            return np.arange(count)
+        rows, order = self._orders.get(column, (0, None))
+        if order is not None and rows == count:
+            return order
+
+        if column == "status":
+            # Invalid first
+            flags = np.frombuffer(self.store.flag_column(count), dtype=np.uint8)
+            order = np.argsort(1 - flags.astype(np.int8), kind="stable")
+        elif column == "check_time":
+            order = np.argsort(np.frombuffer(self.store.timestamp_column(count), dtype=np.int64),
+                               kind="stable")
+        elif order is None or count - rows > rows // 4:
+            text = self._text(column)
+            values = [text(i) for i in range(count)]
+            order = np.array(sorted(range(count), key=values.__getitem__), dtype=np.int64)
+        else:
+            # A few appended rows (e.g. a watch rescan): insert them in place
+            text = self._text(column)
+            new_rows = sorted(range(rows, count), key=lambda i: (text(i), i))
+            positions = [bisect_right(order, text(i), key=text) for i in new_rows]
+            order = np.insert(order, positions, new_rows)
+        self._orders[column] = (count, order)
+        return order
+
+    def prepare(self):
+        """Build the text sort orders and the lowercased text for every current row"""
+        count = len(self.store)
+        for column in TEXT_COLUMNS:
+            self.order(column)
+            self._lowered_text(column, count)
+
+    def _prefix_rows(self, column: str, prefix: str) -> np.ndarray:
+        """Rows whose column starts with prefix (case-folded), from the sorted order"""
+        order = self.order(column)
+        text = self._text(column)
+        low = bisect_left(order, prefix, key=text)
+        high = bisect_left(order, prefix + "\U0010ffff", lo=low, key=text)
+        return order[low:high]
+
+    def _columns(self, column: str) -> Tuple[bytearray, array]:
+        """UTF-8 text and end offsets of a text column"""
+        if column == "filename":
+            return self.store._names, self.store._name_ends
+        return self.store._serials, self.store._serial_ends
+
+    def _lowered_text(self, column: str, count: int) -> Tuple[bytes, np.ndarray]:
+        """Lowercased text of a column covering rows [0, count), and its byte histogram"""
+        blob, offsets = self._columns(column)
+        size = offsets[count - 1] if count else 0
+        lowered, histogram = self._lowered.get(column, (b"", np.zeros(256, dtype=np.int64)))
+        if len(lowered) < size:
+            added = blob[len(lowered):size].lower()
+            histogram = histogram + np.bincount(np.frombuffer(added, dtype=np.uint8), minlength=256)
+            lowered = lowered + added
+            self._lowered[column] = (lowered, histogram)
+        return lowered, histogram
+
+    def _substring_rows(self, column: str, needle: bytes, count: int) -> np.ndarray:
+        """Rows [0, count) whose column contains needle (lowercase ASCII compare)"""
+        offsets = self._columns(column)[1]
+        size = offsets[count - 1] if count else 0
+        width = len(needle)
+        if size < width:
+            return np.zeros(0, dtype=np.int64)
+        lowered, histogram = self._lowered_text(column, count)
+        text = np.frombuffer(lowered, dtype=np.uint8)
+
+        # Candidates matching the needle's rarest byte, narrowed one byte at
+        # a time; a match starts first offset bytes before its candidate
+        first = int(np.argmin(histogram[np.frombuffer(needle, dtype=np.uint8)]))
+        positions = np.flatnonzero(text[first:size - width + 1 + first] == needle[first])
+        for offset in range(width):
+            if offset != first:
+                positions = positions[text[positions + offset] == needle[offset]]
+        ends = np.frombuffer(offsets, dtype=np.uint32 if offsets.itemsize == 4 else np.uint64)[:count]
+        rows = np.searchsorted(ends, positions, side="right")
+        # Drop matches running into the next row's text
+        return rows[positions + width <= ends[rows]]
+
+    def match_mask(self, text: str, count: int) -> np.ndarray:
+        """Boolean mask of the rows [0, count) matching search text"""
+        mask = np.zeros(count, dtype=bool)
+        if text.endswith("*"):
+            prefix = text[:-1].casefold()
+            for column in TEXT_COLUMNS:
+                rows = self._prefix_rows(column, prefix)
+                mask[rows[rows < count]] = True
+            return mask
+
+        needle = text.encode("utf-8").lower()
+        for column in TEXT_COLUMNS:
+            mask[self._substring_rows(column, needle, count)] = True
+        return mask
+
+    def matches(self, text: str, i: int) -> bool:
+        """Whether one row matches search text"""
+        store = self.store
+        if text.endswith("*"):
+            prefix = text[:-1].casefold()
+            return (store.serial_number(i).casefold().startswith(prefix)
+                    or store.filename(i).casefold().startswith(prefix))
+        needle = text.encode("utf-8").lower()
+        return (needle in store.serial_number(i).encode("utf-8").lower()
+                or needle in store.filename(i).encode("utf-8").lower())
+
+    def select(self, results: ResultView, status: str = "all", text: str = "",
+               sort_column: str = "row", descending: bool = False) -> ResultView:
+        """
+        Rows of a view with a status ("all", "invalid" or "valid") matching
+        search text, sorted by a column of SORT_COLUMNS
+        The rows of small views (e.g. a batch streamed during a scan) are
+        checked one by one; larger views are filtered with NumPy masks.
+        """
+        if not text and sort_column == "row" and not descending and status == "all":
+            return results
+        if len(results) <= ROW_SCAN_LIMIT and sort_column == "row":
+            if status != "all":
+                results = results.select(status == "invalid")
+            rows = [i for i in results.indices if not text or self.matches(text, i)]
+            if descending:
+                rows.reverse()
+            return ResultView(self.store, array("q", rows))
+
+        count = len(self.store)
+        mask = np.zeros(count, dtype=bool)
+        indices = results.indices
+        if isinstance(indices, range):
+            mask[indices.start:indices.stop:indices.step] = True
+        else:
+            mask[np.frombuffer(indices, dtype=np.int64)] = True
+        if status != "all":
+            flags = np.frombuffer(self.store.flag_column(count), dtype=np.uint8)
+            mask &= flags == (1 if status == "invalid" else 0)
+        if text:
+            mask &= self.match_mask(text, count)
+
+        order = self.order(sort_column)
+        if descending:
+            order = order[::-1]
+        visible = order[mask[order]]
+        return ResultView(self.store, array("q", visible.astype(np.int64).tobytes()))
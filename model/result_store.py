@@ -0,0 +1,302 @@
+"""
+Result Store - Compact columnar storage for scan results
+"""
+from array import array
+from itertools import compress
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+import time
+
+
+# Format of check_time strings in result tuples
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Flips a 0/1 flag column so compress() can select the unset rows
+_INVERT = bytes([1, 0]) + bytes(254)
+
+
+class _FieldColumn:
+    """Interned string column: one 32-bit code per row, code 0 is missing"""
+
+    __slots__ = ("codes", "values", "lookup")
+
+    def __init__(self, rows: int):
+        self.codes = array("I", bytes(4 * rows))
+        self.values = [None]
+        self.lookup = {None: 0}
+
+    def append(self, value: Optional[str]):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+class ResultStore:
+    """
+    Append-only columnar store of (filename, serial_number, is_invalid,
+    check_time[, fields[, log_time]]) results
+    Text columns are UTF-8 blobs with 32-bit end offsets (64-bit past 4 GB
+    of text), is_invalid is one byte per row and check_time is an integer
+    Unix timestamp, so a row costs 25 bytes plus its UTF-8 text instead of
+    a list slot, a tuple and three str objects (about 290 bytes).
+    The optional fields dict of a result (other values extracted by the
+    rule, e.g. program) is kept as interned columns of 4 bytes per row;
+    log_time (the log's modification time, 0 if unknown) is an int64.
+
+    Accessors (row i, 0 <= i < len(store)):
+        store[i]                  -> (filename, serial_number, is_invalid, check_time)
+        store.row(i)              -> every column: (filename, serial_number,
+                                     is_invalid, timestamp, fields, log_time)
+        store.filename(i)         -> str
+        store.serial_number(i)    -> str
+        store.is_invalid(i)       -> bool
+        store.check_time(i)       -> str formatted with TIME_FORMAT
+        store.timestamp(i)        -> int Unix timestamp
+        store.log_time(i)         -> int Unix timestamp, 0 if unknown
+        store.field(name, i)      -> str, or None if the row has no such field
+        store.fields(i)           -> dict of the row's fields
+        iter(store)               -> result tuples in order (store[i])
+        store.view(start, end)    -> ResultView of a row range
+        store.count_invalid(start, end)
+        store.field_names()
+
+    Column snapshots for vectorized analytics (copies, safe to keep while
+    rows are appended):
+        store.flag_column(end)    -> bytes, 1 per invalid row
+        store.timestamp_column(end) -> array of int64 Unix timestamps
+        store.log_time_column(end) -> array of int64 Unix timestamps
+        store.field_column(name, end) -> (array of uint32 codes, values list)
+
+    Rows are only ever appended, so a ResultView or a row count taken
+    earlier stays valid while a scan keeps adding rows. Copy rows between
+    stores with extend(store or view) or row(i): store[i] leaves out the
+    fields and log_time.
+    """
+
+    __slots__ = ("_names", "_name_ends", "_serials", "_serial_ends", "_flags",
+                 "_timestamps", "_log_times", "_epochs", "_times", "_fields")
+
+    def __init__(self, results: Iterable[tuple] = ()):
+        self._names = bytearray()
+        self._name_ends = array("I")
+        self._serials = bytearray()
+        self._serial_ends = array("I")
+        self._flags = bytearray()
+        self._timestamps = array("q")
+        self._log_times = array("q")
+        # Scans produce few distinct check_time strings (one per second),
+        # so each is parsed once and kept for formatting it back
+        self._epochs = {}
+        self._times = {}
+        self._fields = {}
+        self.extend(results)
+
+    def append(self, result: tuple):
+        """Append a (filename, serial_number, is_invalid, check_time[, fields]) result"""
+        filename, serial_number, is_invalid, check_time = result[:4]
+        fields = result[4] if len(result) > 4 else None
+        log_time = result[5] if len(result) > 5 else None
+        if fields or self._fields:
+            self._append_fields(fields or {})
+        self._names += filename.encode("utf-8")
+        self._serials += serial_number.encode("utf-8")
+        try:
+            self._name_ends.append(len(self._names))
+            self._serial_ends.append(len(self._serials))
+        except OverflowError:
+            self._widen_offsets()
+            self._name_ends.append(len(self._names))
+            self._serial_ends.append(len(self._serials))
+        self._timestamps.append(self._timestamp(check_time))
+        self._log_times.append(log_time or 0)
+        # Appended last: the row is complete once its flag exists
+        self._flags.append(1 if is_invalid else 0)
+
+    def extend(self, results: Iterable[tuple]):
+        """Append several results, or every column of the rows of a ResultStore or ResultView"""
+        if isinstance(results, ResultStore):
+            results = results.view()
+        if isinstance(results, ResultView):
+            store = results.store
+            results = (store.row(i) for i in results.indices)
+        for result in results:
+            self.append(result)
+
+    def _append_fields(self, fields: dict):
+        """Append one row to every field column"""
+        for name in fields:
+            if name not in self._fields:
+                # Earlier rows are missing the new field
+                self._fields[name] = _FieldColumn(len(self._flags))
+        for name, column in self._fields.items():
+            column.append(fields.get(name))
+
+    def _widen_offsets(self):
+        """Switch the offset columns to 64-bit once the text passes 4 GB"""
+        rows = len(self._flags)
+        # Drop an offset appended for the row that overflowed
+        self._name_ends = array("Q", self._name_ends[:rows])
+        self._serial_ends = array("Q", self._serial_ends[:rows])
+
+    def _timestamp(self, check_time) -> int:
+        """Unix timestamp of a check_time string (or int)"""
+        if isinstance(check_time, int):
+            return check_time
+        timestamp = self._epochs.get(check_time)
+        if timestamp is None:
+            timestamp = int(time.mktime(time.strptime(check_time, TIME_FORMAT)))
+            self._epochs[check_time] = timestamp
+            self._times.setdefault(timestamp, check_time)
+        return timestamp
+
+    def __len__(self) -> int:
+        return len(self._flags)
+
+    def __getitem__(self, i: int) -> Tuple[str, str, bool, str]:
+        if i < 0:
+            i += len(self._flags)
+        return (self.filename(i), self.serial_number(i), self.is_invalid(i), self.check_time(i))
+
+    def __iter__(self) -> Iterator[Tuple[str, str, bool, str]]:
+        for i in range(len(self._flags)):
+            yield self[i]
+
+    def row(self, i: int) -> Tuple[str, str, bool, int, dict, int]:
+        """Every column of row i, in the form append() takes (check_time as a timestamp)"""
+        if i < 0:
+            i += len(self._flags)
+        return (self.filename(i), self.serial_number(i), self.is_invalid(i), self._timestamps[i],
+                self.fields(i), self._log_times[i])
+
+    def filename(self, i: int) -> str:
+        start = self._name_ends[i - 1] if i else 0
+        return self._names[start:self._name_ends[i]].decode("utf-8")
+
+    def serial_number(self, i: int) -> str:
+        start = self._serial_ends[i - 1] if i else 0
+        return self._serials[start:self._serial_ends[i]].decode("utf-8")
+
+    def is_invalid(self, i: int) -> bool:
+        return self._flags[i] == 1
+
+    def timestamp(self, i: int) -> int:
+        return self._timestamps[i]
+
+    def log_time(self, i: int) -> int:
+        return self._log_times[i]
+
+    def check_time(self, i: int) -> str:
+        timestamp = self._timestamps[i]
+        text = self._times.get(timestamp)
+        if text is None:
+            text = self._times[timestamp] = time.strftime(TIME_FORMAT, time.localtime(timestamp))
+        return text
+
+    def field(self, name: str, i: int) -> Optional[str]:
+        column = self._fields.get(name)
+        return None if column is None else column.values[column.codes[i]]
+
+    def fields(self, i: int) -> dict:
+        fields = {}
+        for name, column in self._fields.items():
+            value = column.values[column.codes[i]]
+            if value is not None:
+                fields[name] = value
+        return fields
+
+    def field_names(self) -> List[str]:
+        """Names of the extracted fields present in any row"""
+        return list(self._fields)
+
+    def flag_column(self, end: Optional[int] = None) -> bytes:
+        """Copy of the is_invalid column (1 byte per row) for rows [0, end)"""
+        return bytes(self._flags[:len(self._flags) if end is None else end])
+
+    def timestamp_column(self, end: Optional[int] = None) -> array:
+        """Copy of the check_time column as Unix timestamps for rows [0, end)"""
+        return self._timestamps[:len(self._flags) if end is None else end]
+
+    def log_time_column(self, end: Optional[int] = None) -> array:
+        """Copy of the log_time column for rows [0, end)"""
+        return self._log_times[:len(self._flags) if end is None else end]
+
+    def field_column(self, name: str, end: Optional[int] = None) -> Tuple[array, List[Optional[str]]]:
+        """
+        Copy of a field column for rows [0, end)
+        Returns: (codes, values) where values[codes[i]] is the field of row i
+        and code 0 (None) means missing
+        """
+        rows = len(self._flags) if end is None else end
+        column = self._fields.get(name)
+        if column is None:
+            return array("I", bytes(4 * rows)), [None]
+        # Codes first: each of them already has its value in the list
+        codes = column.codes[:rows]
+        return codes, list(column.values)
+
+    def count_invalid(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Number of invalid rows in [start, end)"""
+        if start == 0 and end is None:
+            return self._flags.count(1)
+        return self._flags.count(1, start, len(self._flags) if end is None else end)
+
+    def view(self, start: int = 0, end: Optional[int] = None) -> "ResultView":
+        """View of the rows in [start, end) (all current rows by default)"""
+        return ResultView(self, range(start, len(self._flags) if end is None else end))
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the columns"""
+        return (len(self._names) + len(self._serials) + len(self._flags)
+                + len(self._name_ends) * self._name_ends.itemsize
+                + len(self._serial_ends) * self._serial_ends.itemsize
+                + len(self._timestamps) * self._timestamps.itemsize
+                + len(self._log_times) * self._log_times.itemsize
+                + sum(len(column.codes) * column.codes.itemsize for column in self._fields.values()))
+
+
+class ResultView:
+    """
+    Rows of a ResultStore selected by index, without copying them
+    indices is a range or an array of store row numbers; view[row] and
+    iteration give result tuples like a list of results would.
+    ResultStore.extend(view) copies the rows with all their columns.
+    """
+
+    __slots__ = ("store", "indices")
+
+    def __init__(self, store: ResultStore, indices: Sequence[int]):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, row: int) -> Tuple[str, str, bool, str]:
+        return self.store[self.indices[row]]
+
+    def __iter__(self) -> Iterator[Tuple[str, str, bool, str]]:
+        store = self.store
+        for i in self.indices:
+            yield store[i]
+
+    def count_invalid(self) -> int:
+        """Number of invalid rows in the view"""
+        indices = self.indices
+        if isinstance(indices, range) and indices.step == 1:
+            return self.store.count_invalid(indices.start, indices.stop)
+        flags = self.store._flags
+        return sum(flags[i] for i in indices)
+
+    def select(self, is_invalid: bool) -> "ResultView":
+        """View of the rows whose is_invalid flag equals is_invalid"""
+        flags = self.store._flags
+        indices = self.indices
+        if isinstance(indices, range) and indices.step == 1:
+            # Whole range at C speed: compress() over the flag bytes
+            selected = flags[indices.start:indices.stop]
+            if not is_invalid:
+                selected = selected.translate(_INVERT)
+            return ResultView(self.store, array("q", compress(indices, selected)))
+        wanted = 1 if is_invalid else 0
+        return ResultView(self.store, array("q", (i for i in indices if flags[i] == wanted)))
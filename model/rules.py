@@ -0,0 +1,405 @@
+"""
+Rules - Declarative log matching rules compiled into one combined matcher
+"""
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+
+
+# The Test Program line names the program; its value (after the last ':')
+# is what the "program" regex of a rule is matched against
+PROGRAM_KEYWORD = "Test Program        :"
+
+# A rule definition is a JSON-compatible dict:
+#   name         unique rule name
+#   description  optional free text
+#   program      optional regex searched in the program name; files whose
+#                first Test Program line does not match are rejected
+#   require      conditions that must all hold; each one is satisfied by
+#                any line containing "keyword" (and "contains", or matching
+#                "regex", when given)
+#   invalid      conditions (same form as require) that mark a matching log
+#                invalid when they all hold; without them every match is
+#                invalid
+#   extract      fields taken from the first line containing "keyword":
+#                group 1 of "regex" (or the whole match), otherwise the text
+#                after the last ':'; "default" is used if no line has it
+DEFAULT_RULES = [
+    {
+        "name": "mp_mfg_data",
+        "description": "MP test logs with mfg_data; invalid when it is 0xFFFFFFFF",
+        # "MP" must follow the 2nd underscore, e.g. Hapuka_ADL1_MP_V1.1.csv
+        "program": r"^[^_]*_[^_]*_MP",
+        "require": [
+            {"keyword": "mfg_data:"},
+        ],
+        "invalid": [
+            {"keyword": "mfg_data:", "contains": "0xFFFFFFFF"},
+        ],
+        "extract": [
+            {"field": "serial_number", "keyword": "PCBA SN No          :", "default": "N/A"},
+            {"field": "program", "keyword": PROGRAM_KEYWORD},
+            # e.g. ">>> <info> [00001447] current trim value:"
+            {"field": "trim_value", "keyword": "current trim value", "regex": r"\[(\w+)\]"},
+        ],
+    },
+]
+
+# Actions run when a keyword is found
+_PROGRAM, _REQUIRE, _EXTRACT, _INVALID = range(4)
+
+
+def _line_at(data, start: int, end: int) -> str:
+    """Return the decoded line around data[start:end] (str or bytes-like)"""
+    if isinstance(data, str):
+        newline, carriage = "\n", "\r"
+    else:
+        newline, carriage = b"\n", b"\r"
+    # "\r" is only searched between the match and the nearest "\n"
+    before = data.rfind(newline, 0, start)
+    line_start = max(before, data.rfind(carriage, before + 1, start)) + 1
+    line_end = data.find(newline, end)
+    if line_end < 0:
+        line_end = len(data)
+    found = data.find(carriage, end, line_end)
+    if found >= 0:
+        line_end = found
+
+    line = data[line_start:line_end]
+    return line if isinstance(line, str) else line.decode("utf-8", errors="ignore")
+
+
+class Condition:
+    """A required line: keyword plus an optional substring or regex"""
+
+    def __init__(self, definition: dict):
+        self.keyword = _keyword(definition)
+        self.contains = definition.get("contains")
+        self.regex = re.compile(definition["regex"]) if definition.get("regex") else None
+
+    def test(self, line: str) -> bool:
+        """Whether a line containing the keyword satisfies the condition"""
+        if self.contains is not None and self.contains not in line:
+            return False
+        return self.regex is None or self.regex.search(line) is not None
+
+
+class Field:
+    """A value extracted from the first line containing a keyword"""
+
+    def __init__(self, definition: dict):
+        self.keyword = _keyword(definition)
+        self.name = definition.get("field")
+        if not self.name:
+            raise ValueError(f"Extract entry without a field name: {definition}")
+        self.regex = re.compile(definition["regex"]) if definition.get("regex") else None
+        self.default = definition.get("default")
+
+    def value(self, line: str) -> Optional[str]:
+        """Extract the field from a line, or None if the regex does not match"""
+        if self.regex is None:
+            return line.split(":")[-1].strip()
+        match = self.regex.search(line)
+        if match is None:
+            return None
+        return match.group(1) if match.re.groups else match.group(0)
+
+
+class Rule:
+    """A compiled rule definition"""
+
+    def __init__(self, definition: dict):
+        self.name = definition.get("name")
+        if not self.name:
+            raise ValueError(f"Rule without a name: {definition}")
+        self.description = definition.get("description", "")
+        program = definition.get("program")
+        self.program = re.compile(program) if program is not None else None
+        self.require = [Condition(item) for item in definition.get("require", ())]
+        self.invalid = [Condition(item) for item in definition.get("invalid", ())]
+        self.extract = [Field(item) for item in definition.get("extract", ())]
+
+    def accepts_program(self, program_name: str) -> bool:
+        """Whether the rule applies to a test program"""
+        return self.program is None or self.program.search(program_name) is not None
+
+
+def _trie_source(keywords: Iterable[str]) -> str:
+    """
+    Regex matching the longest of the keywords, factored by common prefix
+    e.g. "Check 01:", "Check 02:" -> "Check 0(?:1:|2:)": a position is
+    ruled out after one test per character instead of one per keyword
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def source(node: dict) -> str:
+        branches = [re.escape(char) + source(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            # Greedy, so a longer keyword is preferred to its prefix
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return source(trie)
+
+
+def _keyword(definition: dict) -> str:
+    keyword = definition.get("keyword")
+    if not keyword:
+        raise ValueError(f"Rule entry without a keyword: {definition}")
+    return keyword
+
+
+class RuleSet:
+    """
+    All rules compiled into one keyword matcher evaluated in a single pass
+    Keywords are grouped by their first ANCHOR_LENGTH characters, and each
+    group's anchor is searched once per chunk of the file, in C, with
+    str.find() (memchr speed); a prefix-factored regex of all keywords then
+    tells which keywords start at each hit. Only lines holding a keyword
+    reach Python, so rules sharing keywords or a prefix ("Check 01
+    result:", "Check 02 result:", ...) cost nothing extra, but each
+    distinct anchor adds one search: the cost grows linearly with them.
+    Above FIND_LIMIT anchors the regex itself searches the chunk; its cost
+    stops growing once the keywords start with most possible characters,
+    at many times that of one find(). Both report every keyword at every
+    position.
+    """
+
+    # Keywords sharing this many leading characters are found by one search
+    ANCHOR_LENGTH = 6
+    # Above this many anchors one regex search is faster than a find() each
+    # (measured on the bench_rules corpus)
+    FIND_LIMIT = 192
+
+    def __init__(self, definitions: Iterable[dict] = DEFAULT_RULES,
+                 program_keyword: str = PROGRAM_KEYWORD):
+        self.definitions = [dict(definition) for definition in definitions]
+        self.rules = [Rule(definition) for definition in self.definitions]
+        if not self.rules:
+            raise ValueError("At least one rule is required")
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Rule names must be unique")
+        self.program_keyword = program_keyword
+
+        keywords = []
+        actions = []
+
+        def add(keyword: str, action: tuple):
+            if keyword not in keywords:
+                keywords.append(keyword)
+                actions.append([])
+            actions[keywords.index(keyword)].append(action)
+
+        if any(rule.program is not None for rule in self.rules):
+            add(program_keyword, (_PROGRAM, -1, -1))
+        for r, rule in enumerate(self.rules):
+            for j, condition in enumerate(rule.require):
+                add(condition.keyword, (_REQUIRE, r, j))
+            for j, condition in enumerate(rule.invalid):
+                add(condition.keyword, (_INVALID, r, j))
+            for j, field in enumerate(rule.extract):
+                add(field.keyword, (_EXTRACT, r, j))
+
+        self.keywords = keywords
+        self._actions = {}
+        for keyword, action in zip(keywords, actions):
+            self._actions[keyword] = self._actions[keyword.encode("utf-8")] = tuple(action)
+        # Every keyword starting where a longer one starts is a prefix of it
+        by_length = sorted(keywords, key=len)
+        self._prefixes = {}
+        for keyword in keywords:
+            prefixes = tuple(other for other in by_length if keyword.startswith(other))
+            self._prefixes[keyword] = prefixes
+            self._prefixes[keyword.encode("utf-8")] = tuple(other.encode("utf-8") for other in prefixes)
+        # Each group is searched for its longest common prefix (longer
+        # needles are found faster); no anchor is a prefix of another, so
+        # the keywords at a hit all belong to the anchor found there
+        groups = {}
+        for keyword in by_length:
+            start = keyword[:self.ANCHOR_LENGTH]
+            start = next((other for other in groups if start.startswith(other)), start)
+            groups.setdefault(start, []).append(keyword)
+        self._anchors = []
+        for group in groups.values():
+            anchor = os.path.commonprefix(group)
+            group_actions = tuple(action for keyword in group for action in self._actions[keyword])
+            self._anchors.append((anchor, anchor.encode("utf-8"), group_actions))
+        source = _trie_source(keywords)
+        self._pattern = re.compile(source)
+        self._bytes_pattern = re.compile(source.encode("utf-8"))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        """Load rule definitions from a JSON file (a list of rules)"""
+        with open(path, "r", encoding="utf-8") as f:
+            definitions = json.load(f)
+        if not isinstance(definitions, list):
+            raise ValueError(f"{path}: expected a JSON list of rules")
+        return cls(definitions)
+
+    def fingerprint(self) -> str:
+        """Hash of the rule definitions, used to invalidate cached results"""
+        rules = json.dumps([self.program_keyword, self.definitions], sort_keys=True)
+        return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
+    def rejects_program(self, line: str) -> bool:
+        """Whether a Test Program line rules out every rule"""
+        program_name = line.split(":")[-1].strip()
+        return not any(rule.accepts_program(program_name) for rule in self.rules)
+
+    def _hits(self, chunk, start: int, end: int, wanted: Callable[[tuple], bool]) -> Iterable[Tuple[int, object]]:
+        """
+        Find the keywords in chunk[start:end], without copying it
+        Returns: (offset in chunk, keyword as str or bytes) in chunk order
+        """
+        is_text = isinstance(chunk, str)
+        pattern = self._pattern if is_text else self._bytes_pattern
+        prefixes = self._prefixes
+        hits = []
+        if len(self._anchors) > self.FIND_LIMIT:
+            found = pattern.search(chunk, start, end)
+            while found is not None:
+                # The longest keyword at a position, then its prefixes; the
+                # search resumes one past it to catch overlapping keywords
+                pos = found.start()
+                hits.extend((pos, keyword) for keyword in prefixes[found.group()])
+                found = pattern.search(chunk, pos + 1, end)
+            return hits
+
+        for anchor, encoded, actions in self._anchors:
+            # Anchors whose rule items are all settled are not searched
+            if not any(wanted(action) for action in actions):
+                continue
+            key = anchor if is_text else encoded
+            pos = chunk.find(key, start, end)
+            while pos >= 0:
+                found = pattern.match(chunk, pos, end)
+                if found is not None:
+                    hits.extend((pos, keyword) for keyword in prefixes[found.group()])
+                pos = chunk.find(key, pos + 1, end)
+        hits.sort()
+        return hits
+
+    def match(self, chunks: Iterable) -> Optional[Tuple[str, Dict[str, str], bool]]:
+        """
+        Evaluate every rule in a single pass
+        chunks: str or bytes-like blocks holding whole lines, in file order,
+        or (data, start, end) windows of whole lines of one large buffer
+        such as a memory map, searched in place instead of copied out
+        Returns: (rule name, extracted fields, is_invalid) of the first rule
+        that matches, or None
+        """
+        rules = self.rules
+        count = len(rules)
+        # Per rule: None = undecided, False = rejected, True = all found
+        state = [None] * count
+        gate = [rule.program is None for rule in rules]
+        satisfied = [[False] * len(rule.require) for rule in rules]
+        flagged = [[False] * len(rule.invalid) for rule in rules]
+        values = [[None] * len(rule.extract) for rule in rules]
+        missing = [len(rule.require) + len(rule.invalid) + len(rule.extract) + (not gate[r])
+                   for r, rule in enumerate(rules)]
+        for r in range(count):
+            if not missing[r]:
+                state[r] = True
+        program_seen = False
+
+        def settled() -> bool:
+            """Whether the first matching rule is known (or none can match)"""
+            for decided in state:
+                if decided is None:
+                    return False
+                if decided:
+                    return True
+            return True
+
+        def wanted(action: tuple) -> bool:
+            """Whether a keyword action can still change the outcome"""
+            kind, r, j = action
+            if kind == _PROGRAM:
+                return not program_seen
+            if state[r] is not None:
+                return False
+            if kind == _REQUIRE:
+                return not satisfied[r][j]
+            if kind == _INVALID:
+                return not flagged[r][j]
+            return values[r][j] is None
+
+        # Settled is checked before each chunk is taken, so a stream is not
+        # read further once the outcome is known
+        if settled():
+            chunks = ()
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                chunk, window_start, window_end = chunk
+            else:
+                window_start, window_end = 0, len(chunk)
+            for start, keyword in self._hits(chunk, window_start, window_end, wanted):
+                line = None
+                for kind, r, j in self._actions[keyword]:
+                    if kind == _PROGRAM:
+                        # Only the first Test Program line counts
+                        if program_seen:
+                            continue
+                        program_seen = True
+                        line = line or _line_at(chunk, start, start + len(keyword))
+                        program_name = line.split(":")[-1].strip()
+                        for k, rule in enumerate(rules):
+                            if state[k] is not None or rule.program is None:
+                                continue
+                            if rule.accepts_program(program_name):
+                                gate[k] = True
+                                missing[k] -= 1
+                                if not missing[k]:
+                                    state[k] = True
+                            else:
+                                state[k] = False
+                        continue
+
+                    if state[r] is not None:
+                        continue
+                    line = line or _line_at(chunk, start, start + len(keyword))
+                    if kind == _REQUIRE:
+                        if satisfied[r][j] or not rules[r].require[j].test(line):
+                            continue
+                        satisfied[r][j] = True
+                    elif kind == _INVALID:
+                        if flagged[r][j] or not rules[r].invalid[j].test(line):
+                            continue
+                        flagged[r][j] = True
+                    else:
+                        if values[r][j] is not None:
+                            continue
+                        values[r][j] = rules[r].extract[j].value(line)
+                        if values[r][j] is None:
+                            continue
+                    missing[r] -= 1
+                    if not missing[r]:
+                        state[r] = True
+
+                if line is not None and settled():
+                    break
+            if settled():
+                break
+
+        for r, rule in enumerate(rules):
+            if state[r] is False or not gate[r] or not all(satisfied[r]):
+                continue
+            fields = {}
+            for field, value in zip(rule.extract, values[r]):
+                fields[field.name] = value if value is not None else field.default
+            return rule.name, fields, all(flagged[r])
+        return None
@@ -0,0 +1,212 @@
+"""
+Headless Scanner - Command-line entry point that never imports Qt
+
+Usage:
+    python -m model.scan <folder> [<folder> ...] [--workers N]
+                         [--format csv|jsonl] [--output FILE]
+                         [--io-concurrency N] [--io-limit PATH=N ...]
+                         [--timings] [--metrics FILE]
+
+Exit status: 0 on success, 1 if a folder is missing or files could not be
+read or written, 2 on bad arguments or an output file that cannot be
+created, 130 when interrupted.
+"""
+import time
+
+# Taken before any other import so --timings covers the module imports too
+_STARTED = time.perf_counter()
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .data_model import DataModel
+from .export import WRITERS
+from .metrics import ScanMetrics
+from .result_store import ResultStore
+from .rules import RuleSet
+from .serial_index import POLICIES, SerialIndex
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="python -m model.scan",
+        description="Scan ADL1 MP test logs for invalid mfg_data (0xFFFFFFFF) without the GUI."
+    )
+    parser.add_argument("folders", nargs="+", help="folder(s) containing log files")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of scan processes (default: CPU cores)")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), default="csv",
+                        help="output format (default: csv)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="output file (default: stdout)")
+    parser.add_argument("-s", "--status", choices=("invalid", "valid", "all"), default="invalid",
+                        help="MP logs to output by mfg_data status (default: invalid)")
+    parser.add_argument("--retests", choices=POLICIES, default="all",
+                        help="serial numbers tested several times: keep all tests, the latest, "
+                             "or the latest invalid one if any (default: all)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="also scan subfolders")
+    parser.add_argument("--include", action="append", default=None, metavar="PATTERN",
+                        help="glob pattern of files to scan (repeatable, default: *.*)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                        help="glob pattern of files/folders to skip (repeatable)")
+    parser.add_argument("--rules", default=None, metavar="FILE",
+                        help="JSON file of matching rules (default: built-in invalid mfg_data rule)")
+    parser.add_argument("--mode", choices=DataModel.SCAN_MODES, default="text",
+                        help="file matching mode (default: text)")
+    parser.add_argument("--probe-size", type=int, default=DataModel.PROBE_SIZE, metavar="BYTES",
+                        help="header bytes read to reject non-MP logs before a full read "
+                             f"(0 disables, default: {DataModel.PROBE_SIZE})")
+    parser.add_argument("--index", default=None,
+                        help="scan index database to reuse results of unchanged files")
+    parser.add_argument("--force-rescan", action="store_true",
+                        help="ignore the scan index and read every file")
+    parser.add_argument("--io-concurrency", type=int, default=None, metavar="N",
+                        help="files read ahead at once on threads, for network shares "
+                             "(0 disables; default: 16 on network shares, 0 elsewhere)")
+    parser.add_argument("--io-limit", action="append", default=[], metavar="PATH=N",
+                        help="--io-concurrency for folders under PATH (repeatable, "
+                             "the longest matching PATH wins)")
+    parser.add_argument("--timings", action="store_true",
+                        help="print startup and scan timings, and the scan metrics, to stderr")
+    parser.add_argument("--metrics", default=None, metavar="FILE",
+                        help="write the scan metrics (per-stage times and counters) as JSON")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the headless scanner; returns the process exit status"""
+    args = build_parser().parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        print("error: --workers must be at least 1", file=sys.stderr)
+        return 2
+    if args.probe_size < 0:
+        print("error: --probe-size cannot be negative", file=sys.stderr)
+        return 2
+    if args.io_concurrency is not None and args.io_concurrency < 0:
+        print("error: --io-concurrency cannot be negative", file=sys.stderr)
+        return 2
+    io_limits = {}
+    for limit in args.io_limit:
+        path, _, count = limit.rpartition("=")
+        if not path or not count.isdigit():
+            print(f"error: --io-limit expects PATH=N, got {limit}", file=sys.stderr)
+            return 2
+        io_limits[path] = int(count)
+
+    rules = None
+    if args.rules:
+        try:
+            rules = RuleSet.from_file(args.rules)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"error: cannot load rules from {args.rules}: {e}", file=sys.stderr)
+            return 2
+
+    # Opened before scanning so a bad path fails fast, not after every file
+    output = None
+    if args.output:
+        try:
+            output = open(args.output, "w", newline="", encoding="utf-8")
+        except OSError as e:
+            print(f"error: cannot write output to {args.output}: {e}", file=sys.stderr)
+            return 2
+
+    index = None
+    if args.index:
+        from .scan_index import ScanIndex
+        index = ScanIndex(args.index)
+
+    model = DataModel(workers=args.workers, scan_mode=args.mode, index=index,
+                      recursive=args.recursive, include=tuple(args.include or ("*.*",)),
+                      exclude=tuple(args.exclude), probe_size=args.probe_size, rules=rules,
+                      io_concurrency=args.io_concurrency, io_limits=io_limits)
+    errors = []
+    first_file_at = []
+
+    def on_progress():
+        if not first_file_at:
+            first_file_at.append(time.perf_counter())
+
+    def on_error(message: str):
+        errors.append(message)
+        print(message, file=sys.stderr)
+
+    results = ResultStore()
+    metrics = ScanMetrics()
+    status = 0
+    probe_rejected = 0
+    bytes_avoided = 0
+    scan_started = time.perf_counter()
+    try:
+        for folder in args.folders:
+            if not Path(folder).is_dir():
+                print(f"Folder does not exist: {folder}", file=sys.stderr)
+                status = 1
+                continue
+            # Copies every column: retests are resolved on the log times below
+            results.extend(model.process_folder(folder, force_rescan=args.force_rescan,
+                                                progress_callback=on_progress,
+                                                error_callback=on_error))
+            probe_rejected += model.probe_rejected
+            bytes_avoided += model.bytes_avoided
+            metrics.add(model.metrics)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        if output is not None:
+            output.close()
+        return 130
+    finally:
+        if index is not None:
+            index.close()
+    scan_finished = time.perf_counter()
+
+    # Retests are resolved across all scanned folders
+    rows = SerialIndex(results).view(args.retests)
+    if args.status != "all":
+        rows = rows.select(args.status == "invalid")
+    write = WRITERS[args.format]
+    if output is not None:
+        try:
+            with output:
+                write(output, rows)
+        except OSError as e:
+            print(f"error: cannot write output to {args.output}: {e}", file=sys.stderr)
+            status = 1
+    else:
+        try:
+            write(sys.stdout, rows)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Output piped into e.g. `head`; silence the error on exit flush
+            sys.stdout = open(os.devnull, "w")
+
+    if args.timings:
+        first_file = (first_file_at[0] - _STARTED) if first_file_at else float("nan")
+        print(f"startup to scan start: {(scan_started - _STARTED) * 1000:.1f} ms | "
+              f"startup to first file: {first_file * 1000:.1f} ms | "
+              f"scan: {scan_finished - scan_started:.2f} s | "
+              f"results: {len(results)} | "
+              f"probe rejected: {probe_rejected} files, {bytes_avoided / (1024 * 1024):.1f} MB not read | "
+              f"Qt imported: {'PySide6' in sys.modules}", file=sys.stderr)
+        print(metrics.summary(), file=sys.stderr)
+    if args.metrics:
+        try:
+            metrics.write_json(args.metrics, {"folders": args.folders, "workers": model.workers,
+                                              "scan_mode": model.scan_mode,
+                                              "io_concurrency": [model.io_concurrency_for(folder)
+                                                                 for folder in args.folders]})
+        except OSError as e:
+            print(f"error: cannot write metrics to {args.metrics}: {e}", file=sys.stderr)
+            status = 1
+
+    if errors:
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
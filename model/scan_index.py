@@ -0,0 +1,116 @@
+"""
+Scan Index - Persistent cache of per-file scan outcomes
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+from .paths import app_dir
+
+
+class ScanIndex:
+    """
+    SQLite index of every scanned file's path, size, mtime and results
+    A file whose size and mtime are unchanged since the last scan reuses its
+    stored results instead of being opened again. The whole index is
+    dropped when the rule fingerprint of the model changes.
+    Tar/gzip bundles are stored as one entry holding all of their results;
+    zip members are stored as bundle.zip!member entries.
+    """
+
+    FILE_NAME = "scan_index.sqlite3"
+    # Bump when the files table changes; older tables are dropped
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path) if db_path else self.default_path()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default_path(cls) -> Path:
+        """Index file next to the application (next to the .exe when frozen)"""
+        return app_dir() / cls.FILE_NAME
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the tables"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # The scan runs in a worker thread, so allow cross-thread use;
+            # every access is serialized by self._lock
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                self._conn.executescript(f"""
+                    DROP TABLE IF EXISTS files;
+                    PRAGMA user_version = {self.SCHEMA_VERSION};
+                """)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    results TEXT NOT NULL
+                );
+            """)
+        return self._conn
+
+    def open(self, fingerprint: str):
+        """Open the index, clearing it if it was built with other rules"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row is None or row[0] != fingerprint:
+                with conn:
+                    conn.execute("DELETE FROM files")
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                                 (fingerprint,))
+
+    def load(self, folder: Path) -> Dict[str, Tuple[int, int, List[tuple]]]:
+        """
+        Load the stored entries of every file under a folder
+        Returns: {path: (size, mtime_ns, results)}
+        """
+        prefix = os.path.join(str(folder), "")
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT path, size, mtime_ns, results FROM files WHERE path > ? AND path < ?",
+                (prefix, prefix + "\uffff")
+            ).fetchall()
+
+        entries = {}
+        for path, size, mtime_ns, results in rows:
+            entries[path] = (size, mtime_ns, [tuple(result) for result in json.loads(results)])
+        return entries
+
+    def store(self, entries: List[Tuple[str, int, int, List[tuple]]]):
+        """Store (path, size, mtime_ns, results) entries in one transaction"""
+        if not entries:
+            return
+        rows = [(path, size, mtime_ns, json.dumps(results)) for path, size, mtime_ns, results in entries]
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+
+    def clear(self):
+        """Remove every stored entry"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM files")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
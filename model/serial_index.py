@@ -0,0 +1,204 @@
+"""
+Serial Index - Serial number to result rows, with retest resolution
+"""
+from array import array
+from itertools import compress
+from typing import Iterable, List, Optional, Sequence, Tuple
+import threading
+
+from .archive import MEMBER_SEPARATOR
+from .result_store import ResultStore, ResultView
+
+
+# Serial number reported for logs without one; these rows are never merged
+MISSING_SERIAL = "N/A"
+
+# Retest resolution policies: which rows of a serial number tested several
+# times are kept
+#   all          every test
+#   latest       the test with the newest log_time (later row on a tie)
+#   any_invalid  the latest invalid test if there is one, else the latest
+POLICIES = ("all", "latest", "any_invalid")
+
+
+class SerialIndex:
+    """
+    Hash index from serial number to every result row of that PCBA
+    Rows are chained newest first: the dict maps a serial number to its
+    newest row and previous[row] links to its older test (-1 at the
+    oldest), so adding a row is O(1) and costs 9 bytes plus one dict entry
+    per distinct serial number.
+    The index follows its ResultStore: update() indexes the rows appended
+    since the last call (the model calls it during the scan) and every
+    query calls it first, so rows added later, e.g. by the folder watch,
+    are always included.
+    Rows of a file scanned again (e.g. rewritten while the folder is
+    watched) are superseded by the rows of the new scan: supersede() marks
+    them and every query leaves them out, whatever the policy. Rows are
+    matched to files by their source, given to extend(): the file's path
+    relative to the scanned folder, so that same-named logs of different
+    subfolders are told apart. Rows without one (appended to the store
+    directly) go by their file name.
+    """
+
+    def __init__(self, store: ResultStore):
+        self.store = store
+        self._heads = {}
+        self._previous = array("q")
+        self._superseded = bytearray()
+        # Source of each row, UTF-8; empty when it is the row's file name
+        self._sources = bytearray()
+        self._source_ends = array("Q")
+        # Source to its rows, built by the first supersede()
+        self._files = None
+        self._lock = threading.Lock()
+
+    def update(self):
+        """Index the rows appended to the store since the last update"""
+        with self._lock:
+            self._update()
+
+    def extend(self, results: Iterable[tuple], source: Optional[str] = None):
+        """
+        Append the results found in one file to the store and index them
+        source: path of the file (the bundle of an archive member) relative
+        to the scanned folder, as later given to supersede()
+        """
+        with self._lock:
+            # Rows appended directly are indexed first, without a source
+            self._update()
+            self.store.extend(results)
+            self._update(source)
+
+    def _update(self, source: Optional[str] = None):
+        store = self.store
+        heads = self._heads
+        previous = self._previous
+        files = self._files
+        start = len(previous)
+        for row in range(start, len(store)):
+            serial_number = store.serial_number(row)
+            previous.append(heads.get(serial_number, -1))
+            heads[serial_number] = row
+            if source is not None and source != _source(store.filename(row)):
+                self._sources += source.encode("utf-8")
+            self._source_ends.append(len(self._sources))
+            if files is not None:
+                files.setdefault(self._source_of(row), []).append(row)
+        self._superseded.extend(bytes(len(previous) - start))
+
+    def _source_of(self, row: int) -> str:
+        start = self._source_ends[row - 1] if row else 0
+        end = self._source_ends[row]
+        if start == end:
+            return _source(self.store.filename(row))
+        return self._sources[start:end].decode("utf-8")
+
+    def supersede(self, sources: Iterable[str]) -> List[int]:
+        """
+        Leave out the rows found so far in these files (sources as given to
+        extend(); the rows of a bundle's members go with the bundle),
+        before the rows of their new scan are appended
+        Returns: the rows superseded
+        """
+        with self._lock:
+            self._update()
+            if self._files is None:
+                self._files = {}
+                for row in range(len(self._previous)):
+                    self._files.setdefault(self._source_of(row), []).append(row)
+            rows = []
+            for source in set(sources):
+                for row in self._files.pop(source, ()):
+                    if not self._superseded[row]:
+                        self._superseded[row] = 1
+                        rows.append(row)
+        return sorted(rows)
+
+    def __len__(self) -> int:
+        """Number of distinct serial numbers"""
+        self.update()
+        return len(self._heads)
+
+    def __contains__(self, serial_number: str) -> bool:
+        self.update()
+        return serial_number in self._heads
+
+    def rows(self, serial_number: str) -> List[int]:
+        """Store rows of a serial number, oldest first"""
+        self.update()
+        rows = []
+        row = self._heads.get(serial_number, -1)
+        while row >= 0:
+            if not self._superseded[row]:
+                rows.append(row)
+            row = self._previous[row]
+        rows.reverse()
+        return rows
+
+    def results(self, serial_number: str) -> List[Tuple[str, str, bool, str]]:
+        """Every result of a serial number, oldest first"""
+        return [self.store[row] for row in self.rows(serial_number)]
+
+    def retested(self) -> List[str]:
+        """Serial numbers with more than one test"""
+        self.update()
+        if not any(self._superseded):
+            return [serial_number for serial_number, row in self._heads.items()
+                    if self._previous[row] >= 0 and serial_number != MISSING_SERIAL]
+        return [serial_number for serial_number in self._heads
+                if serial_number != MISSING_SERIAL and len(self.rows(serial_number)) > 1]
+
+    def resolve(self, policy: str = "all") -> Sequence[int]:
+        """
+        Apply a retest policy in one pass over the rows
+        Returns: store rows kept, in store order
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown retest policy: {policy}")
+        self.update()
+        with self._lock:
+            count = len(self._previous)
+            superseded = self._superseded
+            if policy == "all":
+                if not any(superseded):
+                    return range(count)
+                return array("q", (row for row in range(count) if not superseded[row]))
+
+            store = self.store
+            previous = self._previous
+            log_times = store.log_time_column(count)
+            flags = store.flag_column(count)
+            keep = bytearray(count)
+            for serial_number, head in self._heads.items():
+                row = head
+                if serial_number == MISSING_SERIAL:
+                    while row >= 0:
+                        keep[row] = not superseded[row]
+                        row = previous[row]
+                    continue
+
+                # The chain runs newest row first, so on equal log times the
+                # first row seen (the later one) wins
+                best = best_invalid = -1
+                while row >= 0:
+                    if superseded[row]:
+                        row = previous[row]
+                        continue
+                    if best < 0 or log_times[row] > log_times[best]:
+                        best = row
+                    if flags[row] and (best_invalid < 0 or log_times[row] > log_times[best_invalid]):
+                        best_invalid = row
+                    row = previous[row]
+                if best >= 0:
+                    keep[best_invalid if policy == "any_invalid" and best_invalid >= 0 else best] = 1
+        return array("q", compress(range(count), keep))
+
+    def view(self, policy: str = "all") -> ResultView:
+        """The store rows kept by a retest policy"""
+        return ResultView(self.store, self.resolve(policy))
+
+
+def _source(filename: str) -> str:
+    """File a result was found in: the bundle of an archive member, else the file itself"""
+    return filename.split(MEMBER_SEPARATOR, 1)[0]
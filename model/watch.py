@@ -0,0 +1,83 @@
+"""
+Folder Watch - Detect new or modified log files with cheap stat diffs
+"""
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+import os
+import time
+
+from .discovery import iter_files
+
+
+class FolderWatch:
+    """
+    Polling change detector for a scanned folder
+    Each poll() lists the folder and compares every file's (size, mtime)
+    with the previous poll. A changed file is only reported once it has
+    kept the same size and mtime for settle_time seconds, so files that are
+    still being written are picked up when they are complete.
+    Files modified at or after `since` (a time.time() value, normally the
+    start of the initial scan) are reported by the first poll, which covers
+    files written while that scan was running.
+    """
+
+    def __init__(self, root: str, recursive: bool = False, include: Iterable[str] = ("*.*",),
+                 exclude: Iterable[str] = (), since: Optional[float] = None,
+                 settle_time: float = 2.0, on_error: Optional[Callable[[str], None]] = None):
+        self.root = root
+        self.recursive = recursive
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.settle_time = settle_time
+        self.on_error = on_error
+        self._since_ns = int(since * 1e9) if since is not None else None
+        # Last reported (size, mtime_ns) of every file, None until the first poll
+        self._known = None
+        # Changed files waiting to settle: path -> ((size, mtime_ns), unchanged since)
+        self._pending = {}
+
+    def has_pending(self) -> bool:
+        """Whether changed files are waiting to settle"""
+        return bool(self._pending)
+
+    def poll(self) -> List[Path]:
+        """
+        List the folder once
+        Returns: files that are new or modified and have settled
+        """
+        now = time.monotonic()
+        first_poll = self._known is None
+        known = {} if first_poll else self._known
+        current = {}
+        ready = []
+
+        for file in iter_files(self.root, self.recursive, self.include, self.exclude, self.on_error):
+            path = str(file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            current[path] = known.get(path)
+
+            if first_poll:
+                if self._since_ns is None or stat.st_mtime_ns < self._since_ns:
+                    current[path] = signature
+                    continue
+            elif current[path] == signature:
+                self._pending.pop(path, None)
+                continue
+
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                self._pending[path] = (signature, now)
+            elif now - pending[1] >= self.settle_time:
+                del self._pending[path]
+                current[path] = signature
+                ready.append(file)
+
+        # Forget deleted files so a file created again is reported again
+        for path in [path for path in self._pending if path not in current]:
+            del self._pending[path]
+        self._known = current
+        return ready
@@ -1,55 +1,322 @@
 """
 Main Presenter - Coordinates between View and Model, manages threading
 """
-from PySide6.QtCore import QObject, QThread, Signal, Slot
+from PySide6.QtCore import QObject, QThread, Signal, Slot, QFileSystemWatcher
 from PySide6.QtWidgets import QFileDialog, QMessageBox
-import csv
+import queue
+import sqlite3
+import threading
+import time
 from pathlib import Path
 
+from model.export import ExportCancelled, export_file, xlsx_available
+from model.history import ResultHistory
+from model.result_store import ResultStore, ResultView
+from model.watch import FolderWatch
+
 
 class ProcessWorker(QThread):
     """Worker thread for processing files"""
     
+    # Coalesce model progress to at most 20 updates per second
+    PROGRESS_INTERVAL = 0.05
+    
     # Signals
-    progress_updated = Signal(int, int, float)
-    processing_complete = Signal(list)
+    progress_updated = Signal(int, int, float, float, float, float)  # current, total, %, files/s, MB/s, ETA
+    results_batch = Signal(int, int)  # New rows [start, end) of model.found_items
+    processing_complete = Signal(object, object)  # ResultStore, ResultAnalytics.summary()
     error_occurred = Signal(str)
     
-    def __init__(self, model, folder_path: str):
+    def __init__(self, model, folder_path: str, force_rescan: bool = False,
+                 batch_size: int = 500, batch_interval: float = 0.25, log_error=None):
         super().__init__()
         self.model = model
         self.folder_path = folder_path
+        self.force_rescan = force_rescan
+        # Thread-safe callable receiving per-file errors (e.g. the terminal)
+        self.log_error = log_error
+        # A results batch is sent once it holds batch_size results or its
+        # oldest result has waited batch_interval seconds
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._last_progress = 0.0
+        # Rows of model.found_items already sent and waiting in the batch
+        self._sent = 0
+        self._batch = 0
+        self._batch_started = 0.0
         
     def run(self):
         """Run the processing in background thread"""
         try:
-            results = self.model.process_folder(self.folder_path)
+            results = self.model.process_folder(self.folder_path, force_rescan=self.force_rescan,
+                                                progress_callback=self._on_model_progress,
+                                                result_callback=self._on_model_result,
+                                                error_callback=self.log_error)
+            
+            # Emit final batch and progress
+            self._flush_batch()
+            self._emit_progress()
+            
+            # Sort and search the results instantly from the first query
+            started = time.perf_counter()
+            self.model.prepare_search()
+            self.model.metrics.wall["search"] += time.perf_counter() - started
             
-            # Emit final progress
-            current, total, percentage = self.model.get_progress()
-            self.progress_updated.emit(current, total, percentage)
+            # Aggregate here too, not in the GUI thread
+            summary = self.model.get_analytics().summary()
             
             # Emit completion
-            self.processing_complete.emit(results)
+            self.processing_complete.emit(results, summary)
+            
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+            
+    def _on_model_progress(self):
+        """Called by the model after every file; emits at a fixed rate"""
+        now = time.monotonic()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self._emit_progress()
+            if self._batch and now - self._batch_started >= self.batch_interval:
+                self._flush_batch()
             
+    def _on_model_result(self, result: tuple):
+        """Called by the model for each result (already in found_items); collects them into batches"""
+        if not self._batch:
+            self._batch_started = time.monotonic()
+        self._batch += 1
+        if self._batch >= self.batch_size:
+            self._flush_batch()
+            
+    def _flush_batch(self):
+        """Emit the pending results batch"""
+        if self._batch:
+            start = self._sent
+            self._sent += self._batch
+            self._batch = 0
+            self.results_batch.emit(start, self._sent)
+            
+    def _emit_progress(self):
+        """Emit the model's current progress and throughput"""
+        current, total, percentage = self.model.get_progress()
+        files_per_sec, mb_per_sec, eta = self.model.get_throughput()
+        self.progress_updated.emit(current, total, percentage, files_per_sec, mb_per_sec, eta)
+
+
+class WatchWorker(QThread):
+    """Worker thread rescanning files that change after the initial scan"""
+    
+    # Signals
+    # changed files, results found in them, first new row of found_items,
+    # rows superseded, ResultAnalytics.summary() after the rescan
+    files_rescanned = Signal(list, list, int, list, object)
+    error_occurred = Signal(str)
+    
+    def __init__(self, model, watch: FolderWatch, poll_interval: float = 5.0,
+                 min_interval: float = 0.5, log_error=None):
+        super().__init__()
+        self.model = model
+        self.watch = watch
+        # Fallback polling period; wake() polls sooner when the OS reports
+        # a change, but never more often than every min_interval seconds
+        self.poll_interval = poll_interval
+        self.min_interval = min_interval
+        self.log_error = log_error
+        self._wake_event = threading.Event()
+        self._stopped = False
+        
+    def run(self):
+        """Poll the folder until stopped, rescanning settled changes"""
+        last_poll = 0.0
+        try:
+            while not self._stopped:
+                # Wake up in time to release files that are settling
+                timeout = self.poll_interval
+                if self.watch.has_pending():
+                    timeout = min(timeout, self.watch.settle_time)
+                self._wake_event.wait(timeout)
+                self._wake_event.clear()
+                
+                # Coalesce bursts of change notifications into one poll
+                delay = last_poll + self.min_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                if self._stopped:
+                    break
+                
+                last_poll = time.monotonic()
+                files = self.watch.poll()
+                if files and not self._stopped:
+                    sources = []
+                    results = self.model.process_files(files, error_callback=self.log_error,
+                                                       sources=sources)
+                    if not self._stopped:
+                        self._emit_rescan(files, results, sources)
+                        
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+            
+    def _emit_rescan(self, files: list, results: list, sources: list):
+        """
+        Put the rescan results in place of the earlier ones and aggregate
+        them here, off the GUI thread (found_items is only appended to,
+        as during a scan)
+        """
+        start = len(self.model.found_items)
+        replaced = self.model.replace_results(files, results, sources)
+        summary = self.model.get_analytics().summary() if results or replaced else None
+        self.files_rescanned.emit(files, results, start, replaced, summary)
+        
+    @Slot()
+    def wake(self):
+        """Poll soon, e.g. after a file system notification"""
+        self._wake_event.set()
+        
+    def stop(self):
+        """Stop watching; a running rescan is cancelled"""
+        self._stopped = True
+        self.model.cancel()
+        self._wake_event.set()
+
+
+class ExportWorker(QThread):
+    """Worker thread writing results to a file"""
+    
+    # Signals
+    progress_updated = Signal(int, int)  # rows written, total rows
+    export_complete = Signal(str, int)  # file path, rows written
+    export_cancelled = Signal(str)  # file path
+    error_occurred = Signal(str)
+    
+    def __init__(self, file_path: str, results: ResultView, fmt: str):
+        super().__init__()
+        self.file_path = file_path
+        self.results = results
+        self.fmt = fmt
+        self._cancelled = False
+        
+    def run(self):
+        """Export in the background thread, reading rows straight from the view"""
+        try:
+            export_file(self.file_path, self.results, self.fmt, progress=self._on_progress)
+            self.export_complete.emit(self.file_path, len(self.results))
+        except ExportCancelled:
+            self.export_cancelled.emit(self.file_path)
         except Exception as e:
             self.error_occurred.emit(str(e))
+            
+    def _on_progress(self, written: int):
+        """Called by the writer after every chunk"""
+        if self._cancelled:
+            raise ExportCancelled()
+        self.progress_updated.emit(written, len(self.results))
+        
+    def cancel(self):
+        """Stop the export after the current chunk"""
+        self._cancelled = True
+
+
+class HistoryWorker(QThread):
+    """Worker thread saving the results of a run to the history database"""
+    
+    # Signals
+    results_saved = Signal(int, int)  # run id, rows saved
+    error_occurred = Signal(str)
+    
+    def __init__(self, history: ResultHistory, folder_path: str, started: float,
+                 complete: bool = True, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.folder_path = folder_path
+        self.started = started
+        self.complete = complete
+        # Result views to save, in order; None stops the worker
+        self._jobs = queue.Queue()
+        
+    def run(self):
+        """Save submitted results until stopped; the run is created with the first batch"""
+        run_id = None
+        while True:
+            results = self._jobs.get()
+            if results is None:
+                break
+            try:
+                if run_id is None:
+                    run_id = self.history.add_run(self.folder_path, self.started, self.complete)
+                rows = self.history.add_results(run_id, results)
+                self.results_saved.emit(run_id, rows)
+            except (sqlite3.Error, OSError) as e:
+                self.error_occurred.emit(str(e))
+                
+    def submit(self, results: ResultView):
+        """Queue results to save (e.g. those of a watch rescan)"""
+        self._jobs.put(results)
+        
+    def stop(self):
+        """Stop once the queued results are saved"""
+        self._jobs.put(None)
 
 
 class MainPresenter(QObject):
     """Main presenter coordinating view and model"""
     
-    def __init__(self, view, model):
+    # New DSNs logged one by one per watch rescan; the rest only go to the table
+    WATCH_LOG_LIMIT = 20
+    
+    # Rows returned by a history query
+    HISTORY_LIMIT = 10000
+    
+    # Export formats offered in the save dialog (XLSX only with openpyxl)
+    EXPORT_FORMATS = [
+        ("csv", "CSV Files (*.csv)"),
+        ("jsonl", "JSON Lines (*.jsonl)"),
+        ("xlsx", "Excel Workbook (*.xlsx)"),
+    ]
+    
+    def __init__(self, view, model, history: ResultHistory = None, metrics_path: str = None):
         super().__init__()
         self.view = view
         self.model = model
+        # Optional database keeping the results of every run
+        self.history = history
+        # Optional JSON Lines log receiving the scan metrics of every run
+        self.metrics_path = metrics_path
+        self._save_metrics = False
+        # GUI thread time spent on the running scan's progress and results
+        self._ui_time = 0.0
         self.worker = None
-        self.current_results = []
+        self.watch_worker = None
+        self.export_worker = None
+        self.history_worker = None
+        self._save_history = False
+        # Native change notifications (inotify on Linux) wake the watch
+        # worker early; its polling still catches what they miss
+        self.fs_watcher = None
+        self.watch_since = 0.0
+        self.current_results = ResultStore()
+        # Status filter, search text and sort order of the result table,
+        # applied to the results without rescanning
         self.filter_type = "all"
+        self.search_text = ""
+        self.sort_column = "row"
+        self.sort_descending = False
+        # Rows and statistics streamed to the view during the running scan,
+        # and the end of the rows of found_items received so far
+        self._streamed_rows = 0
+        self._streamed_end = 0
+        self._streamed_stats = {"total": 0, "valid": 0, "invalid": 0}
         
         # Connect view signals
         self.view.process_requested.connect(self.on_process_requested)
+        self.view.cancel_requested.connect(self.on_cancel_requested)
+        self.view.pause_requested.connect(self.on_pause_requested)
         self.view.export_requested.connect(self.on_export_requested)
+        self.view.export_cancel_requested.connect(self.on_export_cancel_requested)
+        self.view.retest_policy_changed.connect(self.on_retest_policy_changed)
+        self.view.history_search_requested.connect(self.on_history_search_requested)
+        self.view.status_filter_changed.connect(self.on_status_filter_changed)
+        self.view.search_changed.connect(self.on_search_changed)
+        self.view.sort_changed.connect(self.on_sort_changed)
         
         self.view.log_info("Application started successfully")
         
@@ -66,45 +333,148 @@ class MainPresenter(QObject):
             return
             
         self.filter_type = filter_type
+        self.view.set_status_filter(filter_type)
+        self.model.retest_policy = self.view.retest_policy()
+        self.watch_since = time.time()
+        self._save_history = self.history is not None and self.view.is_history_enabled()
+        self._save_metrics = self.metrics_path is not None and self.view.is_metrics_enabled()
+        self._ui_time = 0.0
+        force_rescan = self.view.is_force_rescan()
+        self.model.recursive = self.view.is_recursive()
         self.view.log_info(f"Starting to process folder: {folder_path}")
         self.view.log_info(f"Filter mode: {filter_type}")
+        if self.model.recursive:
+            self.view.log_info("Including subfolders")
+        if force_rescan:
+            self.view.log_info("Full rescan requested - scan cache will be ignored")
+        io_concurrency = self.model.io_concurrency_for(folder_path)
+        if io_concurrency:
+            self.view.log_info(f"Network share: reading up to {io_concurrency} files ahead")
         self.view.set_processing_state(True)
         self.view.reset_progress()
+        self.view.set_results(ResultStore().view())
+        self.view.clear_summary()
+        self._streamed_rows = 0
+        self._streamed_end = 0
+        self._streamed_stats = {"total": 0, "valid": 0, "invalid": 0}
+        self.view.update_statistics(self._streamed_stats)
         
         # Create and start worker thread
-        self.worker = ProcessWorker(self.model, folder_path)
+        self.worker = ProcessWorker(self.model, folder_path, force_rescan,
+                                    log_error=self.view.log_error)
         self.worker.progress_updated.connect(self.on_progress_updated)
+        self.worker.results_batch.connect(self.on_results_batch)
         self.worker.processing_complete.connect(self.on_processing_complete)
         self.worker.error_occurred.connect(self.on_error_occurred)
         self.worker.finished.connect(self.on_worker_finished)
         self.worker.start()
         
-    @Slot(int, int, float)
-    def on_progress_updated(self, current: int, total: int, percentage: float):
+    @Slot()
+    def on_cancel_requested(self):
+        """Handle cancel request from view"""
+        if self.watch_worker is not None:
+            self.stop_watching()
+            return
+        if self.worker is None:
+            return
+        self.view.log_warning("Cancelling processing...")
+        self.model.cancel()
+        
+    @Slot(bool)
+    def on_pause_requested(self, paused: bool):
+        """Handle pause/resume request from view"""
+        if self.worker is None:
+            return
+        if paused:
+            self.model.pause()
+            self.view.log_info("Processing paused")
+        else:
+            self.model.resume()
+            self.view.log_info("Processing resumed")
+        
+    @Slot(int, int, float, float, float, float)
+    def on_progress_updated(self, current: int, total: int, percentage: float,
+                            files_per_sec: float, mb_per_sec: float, eta: float):
         """Handle progress update"""
-        self.view.update_progress(current, total, percentage)
+        started = time.perf_counter()
+        self.view.update_progress(current, total, percentage, files_per_sec, mb_per_sec, eta)
+        self._ui_time += time.perf_counter() - started
         
-    @Slot(list)
-    def on_processing_complete(self, results: list):
-        """Handle processing completion"""
-        self.current_results = results
+    @Slot(int, int)
+    def on_results_batch(self, start: int, end: int):
+        """Append results found so far while the scan is still running"""
+        started = time.perf_counter()
+        if self._streamed_rows == 0 and end > start:
+            self.view.log_info("First results available - showing them while processing continues")
+            self.view.show_results_view()
+        self._streamed_end = end
+        self._append_streamed(self.model.found_items.view(start, end))
+        self._ui_time += time.perf_counter() - started
         
-        # Apply filter
-        filtered_results = self._apply_filter(results, self.filter_type)
+    def _append_streamed(self, batch: ResultView):
+        """Add results to the running statistics and the (filtered) table"""
+        invalid = batch.count_invalid()
+        self._streamed_stats["total"] += len(batch)
+        self._streamed_stats["invalid"] += invalid
+        self._streamed_stats["valid"] += len(batch) - invalid
+        self.view.update_statistics(self._streamed_stats)
         
-        self.view.log_success(f"Processing complete! Found {len(results)} items")
-        self.view.log_info(f"Displaying {len(filtered_results)} items after filter")
+        filtered_batch = self.model.query_results(self.filter_type, self.search_text, results=batch)
+        self.view.append_results(filtered_batch)
+        self._streamed_rows += len(filtered_batch)
         
-        # Update view
-        self.view.set_results(filtered_results)
+    @Slot(object, object)
+    def on_processing_complete(self, results: ResultStore, summary: dict):
+        """Handle processing completion (summary: aggregates of the results)"""
+        started = time.perf_counter()
+        self.current_results = results
         
-        # Get and display statistics (based on all results, not filtered)
-        stats = self.model.get_statistics()
-        self.view.update_statistics(stats)
+        if self.model.cancelled:
+            current, total, _ = self.model.get_progress()
+            self.view.log_warning(f"Processing cancelled after {current:,} of {total:,} files - "
+                                  f"showing partial results ({len(results)} items)")
+        else:
+            self.view.log_success(f"Processing complete! Found {len(results)} items")
+        if self.model.probe_rejected:
+            self.view.log_info(f"Header probe rejected {self.model.probe_rejected:,} non-MP logs - "
+                               f"{self.model.bytes_avoided / (1024 * 1024):.1f} MB not read")
+        retested = len(self.model.serial_index.retested())
+        if retested:
+            self.view.log_info(f"{retested:,} serial numbers were tested more than once")
+        if self._save_history and results:
+            self._start_history(results.view())
+        
+        # Rows streamed during the scan are already shown unless retests
+        # have to be resolved or the table is sorted
+        self._show_results(reset=self.model.retest_policy != "all" or self._is_sorted(),
+                           summary=summary)
         
         # Switch to results view
         self.view.show_results_view()
         
+        self._ui_time += time.perf_counter() - started
+        self._report_metrics(self.worker.folder_path)
+        
+    def _report_metrics(self, folder_path: str):
+        """Log the metrics of the finished scan and append them to the metrics log"""
+        metrics = self.model.metrics
+        metrics.wall["ui"] = self._ui_time
+        for line in metrics.summary().splitlines():
+            self.view.log_info(line)
+        if not self._save_metrics:
+            return
+        try:
+            metrics.append_json(str(self.metrics_path), {
+                "folder": folder_path,
+                "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "cancelled": self.model.cancelled,
+                "workers": self.model.workers,
+                "scan_mode": self.model.scan_mode,
+                "io_concurrency": self.model.io_concurrency_for(folder_path),
+            })
+        except OSError as e:
+            self.view.log_error(f"Could not save scan metrics: {e}")
+        
     @Slot(str)
     def on_error_occurred(self, error_message: str):
         """Handle error"""
@@ -114,51 +484,275 @@ class MainPresenter(QObject):
     def on_worker_finished(self):
         """Handle worker thread finished"""
         self.view.set_processing_state(False)
+        folder_path = self.worker.folder_path
         self.worker = None
+        if self.view.is_watch_enabled() and not self.model.cancelled:
+            self.start_watching(folder_path)
+        elif self.history_worker is not None:
+            self.history_worker.stop()
         
-    def _apply_filter(self, results: list, filter_type: str) -> list:
-        """Apply filter to results"""
-        if filter_type == "invalid":
-            return [r for r in results if r[2]]  # r[2] is is_invalid
-        elif filter_type == "valid":
-            return [r for r in results if not r[2]]
+    def start_watching(self, folder_path: str):
+        """Keep scanning files that are created or modified in the folder"""
+        watch = FolderWatch(folder_path, self.model.recursive, self.model.include,
+                            self.model.exclude, since=self.watch_since,
+                            on_error=self.view.log_error)
+        self.watch_worker = WatchWorker(self.model, watch, log_error=self.view.log_error)
+        self.watch_worker.files_rescanned.connect(self.on_files_rescanned)
+        self.watch_worker.error_occurred.connect(self.on_error_occurred)
+        self.watch_worker.finished.connect(self.on_watch_finished)
+        
+        self.fs_watcher = QFileSystemWatcher([folder_path], self)
+        self.fs_watcher.directoryChanged.connect(self.watch_worker.wake)
+        
+        self.view.set_watching_state(True)
+        self.view.log_info(f"Watching {folder_path} for new or modified log files")
+        self.watch_worker.start()
+        
+    def stop_watching(self):
+        """Stop the folder watch"""
+        if self.fs_watcher is not None:
+            self.fs_watcher.directoryChanged.disconnect()
+            self.fs_watcher.deleteLater()
+            self.fs_watcher = None
+        if self.watch_worker is not None:
+            self.view.log_info("Stopping folder watch...")
+            self.watch_worker.stop()
+            
+    @Slot(list, list, int, list, object)
+    def on_files_rescanned(self, files: list, results: list, start: int, replaced: list, summary: dict):
+        """Show the results of changed files in place of the results of their earlier scan"""
+        store = self.current_results
+        # Results unchanged by the rescan (file touched, same content) are not news
+        previous = {(store.filename(row), store.serial_number(row), store.is_invalid(row))
+                    for row in replaced}
+        changed = [r for r in results if (r[0], r[1], r[2]) not in previous]
+        self.view.log_info(f"Rescanned {len(files)} new or modified file(s) - "
+                           f"{len(changed)} new or changed item(s)")
+        if not results and not replaced:
+            return
+        
+        for result in [r for r in changed if r[2]][:self.WATCH_LOG_LIMIT]:
+            self.view.log_warning(f"New invalid DSN: {result[1]} ({result[0]})")
+        if self.history_worker is not None and results:
+            self.history_worker.submit(store.view(start))
+        if not replaced and self.model.retest_policy == "all" and not self._is_sorted():
+            self._append_streamed(self.current_results.view(start))
+            self._update_summary(summary)
         else:
-            return results
+            # Replaced rows and retests change rows already shown, and
+            # sorted rows may land anywhere
+            self._show_results(reset=True, summary=summary)
+        
+    @Slot()
+    def on_watch_finished(self):
+        """Handle watch worker thread finished"""
+        self.view.set_watching_state(False)
+        self.watch_worker = None
+        self.view.log_info("Folder watch stopped")
+        if self.history_worker is not None:
+            self.history_worker.stop()
+        
+    @Slot(str)
+    def on_retest_policy_changed(self, policy: str):
+        """Resolve retests again without rescanning"""
+        self.model.retest_policy = policy
+        if self.worker is not None or not self.current_results:
+            # Applied when the running scan completes
+            return
+        self._show_results(reset=True)
+        
+    def _start_history(self, results: ResultView):
+        """Save the results of the finished scan (and of later watch rescans)"""
+        if self.history_worker is not None:
+            # Still saving an earlier run: it stops once done
+            self.history_worker.stop()
+        # Parented to the presenter so it outlives this reference
+        worker = HistoryWorker(self.history, self.worker.folder_path, self.watch_since,
+                               complete=not self.model.cancelled, parent=self)
+        worker.results_saved.connect(self.on_history_saved)
+        worker.error_occurred.connect(self.on_history_error)
+        worker.finished.connect(lambda: self.on_history_finished(worker))
+        worker.submit(results)
+        worker.start()
+        self.history_worker = worker
+        
+    @Slot(int, int)
+    def on_history_saved(self, run_id: int, rows: int):
+        """Handle results saved to the history"""
+        self.view.log_info(f"Saved {rows:,} results to history (run #{run_id})")
+        
+    @Slot(str)
+    def on_history_error(self, error_message: str):
+        """Handle a history database error"""
+        self.view.log_error(f"Saving to history failed: {error_message}")
+        
+    def on_history_finished(self, worker: HistoryWorker):
+        """Handle history worker thread finished"""
+        if self.history_worker is worker:
+            self.history_worker = None
+        worker.deleteLater()
+        
+    @Slot(str, str, str, int)
+    def on_history_search_requested(self, serial_number: str, file_name: str, status: str, days: int):
+        """Query the history database"""
+        if self.history is None:
+            self.view.log_warning("History database is not available")
+            return
+        since = time.time() - days * 86400 if days else None
+        started = time.perf_counter()
+        try:
+            rows = self.history.query(serial_number or None, file_name or None, status, since,
+                                      limit=self.HISTORY_LIMIT)
+            total = len(rows)
+            if total == self.HISTORY_LIMIT:
+                total = self.history.count(serial_number or None, file_name or None, status, since)
+        except sqlite3.Error as e:
+            self.view.log_error(f"History query failed: {str(e)}")
+            return
+        elapsed = time.perf_counter() - started
+        self.view.set_history_results(ResultStore(rows).view(), total, elapsed)
+        
+    @Slot(str)
+    def on_status_filter_changed(self, status: str):
+        """Filter the results by status again without rescanning"""
+        self.filter_type = status
+        self._refresh_table()
+        
+    @Slot(str)
+    def on_search_changed(self, text: str):
+        """Search serial numbers and file names in the results"""
+        self.search_text = text
+        self._refresh_table()
+        
+    @Slot(int, bool)
+    def on_sort_changed(self, column: int, descending: bool):
+        """Sort the results by a table column"""
+        from model.result_search import SORT_COLUMNS
+        self.sort_column = SORT_COLUMNS[column]
+        self.sort_descending = descending
+        if self.worker is None:
+            # Rows streamed during a scan are sorted once it completes
+            self._refresh_table()
+            
+    def _is_sorted(self) -> bool:
+        """Whether the table is in another order than the scan order"""
+        return self.sort_column != "row" or self.sort_descending
+        
+    def _refresh_table(self):
+        """Show the rows selected by the current filter, search and sort"""
+        if self.worker is not None:
+            # Rows received so far, in scan order
+            rows = self.model.query_results(self.filter_type, self.search_text,
+                                            results=self.model.found_items.view(0, self._streamed_end))
+        elif self.current_results:
+            rows = self._visible_results()
+        else:
+            return
+        self.view.set_results(rows)
+        self._streamed_rows = len(rows)
+        
+    def _show_results(self, reset: bool, summary: dict = None):
+        """
+        Show the model's results (after retest resolution) with the current filter
+        summary: their aggregates if already computed in a worker thread
+        """
+        filtered_results = self._visible_results()
+        self.view.log_info(f"Displaying {len(filtered_results)} items after filter")
+        if reset or self._streamed_rows != len(filtered_results):
+            self.view.set_results(filtered_results)
+            self._streamed_rows = len(filtered_results)
+        
+        # Statistics are based on all results, not filtered
+        stats = self.model.get_statistics()
+        self._streamed_stats = dict(stats)
+        self.view.update_statistics(stats)
+        self._update_summary(summary)
+        
+    def _update_summary(self, summary: dict = None):
+        """Show the grouped aggregates above the table, recomputed unless given"""
+        if summary is None:
+            summary = self.model.get_analytics().summary()
+        self.view.update_summary(summary)
+        
+    def _visible_results(self) -> ResultView:
+        """
+        The model's results with the current status filter, search and sort
+        (the rows are selected by index, not copied)
+        """
+        return self.model.query_results(self.filter_type, self.search_text,
+                                        self.sort_column, self.sort_descending)
             
     @Slot()
     def on_export_requested(self):
-        """Handle export request"""
-        if not self.current_results:
+        """Handle export request (the rows shown by the current filter, search and sort)"""
+        if self.export_worker is not None:
+            self.view.log_warning("An export is already running")
+            return
+        if self.worker is not None:
+            self.view.log_warning("Please wait for processing to finish before exporting")
+            return
+        results = self._visible_results()
+        if not results:
             self.view.log_warning("No results to export")
             return
             
+        formats = [(fmt, name) for fmt, name in self.EXPORT_FORMATS
+                   if fmt != "xlsx" or xlsx_available()]
+        
         # Open save file dialog
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self.view,
             "Export Results",
             "results.csv",
-            "CSV Files (*.csv);;All Files (*)"
+            ";;".join(name for _, name in formats) + ";;All Files (*)"
         )
         
         if not file_path:
             return
             
-        try:
-            self._export_to_csv(file_path, self.current_results)
-            self.view.log_success(f"Results exported to: {file_path}")
-        except Exception as e:
-            self.view.log_error(f"Export failed: {str(e)}")
-            
-    def _export_to_csv(self, file_path: str, results: list):
-        """Export results to CSV file"""
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header
-            writer.writerow(['#', 'File Name', 'Serial Number', 'Status', 'Check Time'])
+        # The file extension wins over the selected filter
+        fmt = Path(file_path).suffix.lower().lstrip(".")
+        if fmt not in dict(formats):
+            fmt = next((f for f, name in formats if name == selected_filter), "csv")
+            if not Path(file_path).suffix:
+                file_path += f".{fmt}"
+                
+        self.view.log_info(f"Exporting {len(results):,} results to: {file_path}")
+        self.view.set_export_state(True)
+        self.view.update_export_progress(0, len(results))
+        
+        self.export_worker = ExportWorker(file_path, results, fmt)
+        self.export_worker.progress_updated.connect(self.view.update_export_progress)
+        self.export_worker.export_complete.connect(self.on_export_complete)
+        self.export_worker.export_cancelled.connect(self.on_export_cancelled)
+        self.export_worker.error_occurred.connect(self.on_export_error)
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_worker.start()
+        
+    @Slot()
+    def on_export_cancel_requested(self):
+        """Handle export cancel request from view"""
+        if self.export_worker is not None:
+            self.view.log_warning("Cancelling export...")
+            self.export_worker.cancel()
             
-            # Write data
-            for idx, (filename, sn, is_invalid, check_time) in enumerate(results, 1):
-                status = 'Invalid' if is_invalid else 'Valid'
-                writer.writerow([idx, filename, sn, status, check_time])
-
+    @Slot(str, int)
+    def on_export_complete(self, file_path: str, rows: int):
+        """Handle export completion"""
+        self.view.log_success(f"{rows:,} results exported to: {file_path}")
+        
+    @Slot(str)
+    def on_export_cancelled(self, file_path: str):
+        """Handle a cancelled export"""
+        self.view.log_warning(f"Export to {file_path} cancelled")
+        
+    @Slot(str)
+    def on_export_error(self, error_message: str):
+        """Handle export failure"""
+        self.view.log_error(f"Export failed: {error_message}")
+        
+    @Slot()
+    def on_export_finished(self):
+        """Handle export thread finished"""
+        self.view.set_export_state(False)
+        self.export_worker = None
@@ -0,0 +1,24 @@
+"""
+Shared fixtures of the tests
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+
+def _write_log(path: Path, mfg_data: str, serial: str = "ADL100000001", mtime: int = 1_700_000_000):
+    path.write_text(
+        "Test Program        :HokI_ADL1_MP_V2.0.csv\n"
+        f"PCBA SN No          : {serial}\n"
+        "\t>>> <info> [00001234] current trim value: \n"
+        f"\t>>> mfg_data: {mfg_data}\n",
+        encoding="utf-8",
+    )
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def write_log():
+    """write_log(path, mfg_data, serial=..., mtime=...): write an MP log with that mfg_data and mtime"""
+    return _write_log
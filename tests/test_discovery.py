@@ -0,0 +1,36 @@
+"""
+File discovery: cancelling a scan stops waiting on a slow listing
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model import discovery as discovery_module  # noqa: E402
+from model.discovery import FileDiscovery  # noqa: E402
+
+
+def test_cancel_ends_iteration_while_listing_hangs(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def slow_listing(root, *args):
+        yield Path(root) / "a.log"
+        # A share that takes forever to list its next folder
+        release.wait(10)
+
+    monkeypatch.setattr(discovery_module, "iter_files", slow_listing)
+    cancel = threading.Event()
+    discovery = FileDiscovery(str(tmp_path), cancel_event=cancel)
+    discovery.start()
+    paths = iter(discovery)
+    assert next(paths).name == "a.log"
+
+    threading.Timer(0.2, cancel.set).start()
+    started = time.perf_counter()
+    assert list(paths) == []
+    assert time.perf_counter() - started < 2
+    release.set()
+    discovery.join(5)
+    assert not discovery.is_alive()
@@ -0,0 +1,45 @@
+"""
+Header probe: candidates are read once, rejected logs report the bytes the probe saved
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.data_model import DataModel  # noqa: E402
+
+NOISE = "INFO step ok\n" * 10_000
+
+
+def scan(folder: Path, io_concurrency: int, probe_size: int = 1024) -> DataModel:
+    model = DataModel(workers=1, probe_size=probe_size, io_concurrency=io_concurrency)
+    model.process_folder(str(folder))
+    return model
+
+
+@pytest.mark.parametrize("io_concurrency", [0, 2])
+def test_probed_header_is_not_read_again(tmp_path, io_concurrency):
+    log = tmp_path / "mp.log"
+    # mfg_data at the end, so the whole file has to be read
+    log.write_text("Test Program        :HokI_ADL1_MP_V2.0.csv\nPCBA SN No          : ADL100000001\n"
+                   + NOISE + "\t>>> mfg_data: 0xFFFFFFFF\n", encoding="utf-8")
+    model = scan(tmp_path, io_concurrency)
+    unprobed = scan(tmp_path, io_concurrency, probe_size=0)
+    assert len(model.found_items) == len(unprobed.found_items) == 1
+    assert model.metrics.counters["bytes_read"] == unprobed.metrics.counters["bytes_read"] == log.stat().st_size
+
+
+@pytest.mark.parametrize("io_concurrency", [0, 2])
+def test_rejected_log_reports_net_saving(tmp_path, io_concurrency):
+    log = tmp_path / "ft.log"
+    log.write_text("Test Program        :HokI_ADL1_FT_V2.0.csv\n" + NOISE, encoding="utf-8")
+    size = log.stat().st_size
+    model = scan(tmp_path, io_concurrency)
+    counters = model.metrics.counters
+    assert counters["files_rejected"] == 1
+    assert counters["bytes_read"] == 1024
+    # A streamed scan would have read its first block, a read-ahead the whole file
+    unprobed = min(size, DataModel.READ_CHUNK) if not io_concurrency else size
+    assert counters["bytes_avoided"] == model.bytes_avoided == unprobed - 1024
@@ -0,0 +1,91 @@
+"""
+Result store: columns, offset widening and views
+"""
+import sys
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.result_store import ResultStore, ResultView  # noqa: E402
+
+ROWS = [
+    ("a.log", "SN1", False, 1_700_000_000, {"program": "MP"}, 1_600_000_000),
+    ("b.log", "SN2", True, 1_700_000_001, {}, 0),
+    ("bundle.zip!c.log", "SN3", True, 1_700_000_002, {"program": "FT", "station": "S1"}, 1_600_000_002),
+]
+
+
+class TinyOffsets(array):
+    """Offset column that overflows past 8 bytes of text, like array("I") past 4 GB"""
+
+    def __new__(cls, values=()):
+        return super().__new__(cls, "I", values)
+
+    def append(self, value):
+        if value > 8:
+            raise OverflowError("unsigned int is greater than maximum")
+        super().append(value)
+
+
+def test_rows_keep_every_column():
+    store = ResultStore(ROWS)
+    assert len(store) == 3
+    assert [store.row(i) for i in range(3)] == [
+        ("a.log", "SN1", False, 1_700_000_000, {"program": "MP"}, 1_600_000_000),
+        ("b.log", "SN2", True, 1_700_000_001, {}, 0),
+        ("bundle.zip!c.log", "SN3", True, 1_700_000_002, {"program": "FT", "station": "S1"}, 1_600_000_002),
+    ]
+    assert store.row(-1) == store.row(2)
+    assert store[1][:3] == ("b.log", "SN2", True)
+    assert store.field_names() == ["program", "station"]
+    # Rows appended before a field first appears are missing it
+    assert (store.field("station", 0), store.field("station", 2)) == (None, "S1")
+    codes, values = store.field_column("program")
+    assert [values[code] for code in codes] == ["MP", None, "FT"]
+    assert list(store.log_time_column()) == [1_600_000_000, 0, 1_600_000_002]
+    assert store.flag_column(2) == b"\x00\x01"
+
+
+def test_check_time_strings_round_trip():
+    store = ResultStore()
+    store.append(("a.log", "SN1", False, "2024-05-01 08:30:00"))
+    assert store.check_time(0) == "2024-05-01 08:30:00"
+    assert store.log_time(0) == 0 and store.fields(0) == {}
+
+
+def test_extend_copies_every_column_of_stores_and_views():
+    source = ResultStore(ROWS)
+    copy = ResultStore()
+    copy.extend(source)
+    copy.extend(source.view(1).select(True))
+    assert [copy.row(i) for i in range(len(copy))] == [source.row(i) for i in (0, 1, 2, 1, 2)]
+
+
+def test_offsets_widen_past_32_bits():
+    for column in ("_name_ends", "_serial_ends"):
+        store = ResultStore(ROWS[:2])
+        setattr(store, column, TinyOffsets(getattr(store, column)))
+        store.extend(ROWS[2:] * 2)
+        assert (store._name_ends.typecode, store._serial_ends.typecode) == ("Q", "Q")
+        assert len(store._name_ends) == len(store._serial_ends) == 4
+        assert [store.filename(i) for i in range(4)] == ["a.log", "b.log", "bundle.zip!c.log", "bundle.zip!c.log"]
+        assert [store.serial_number(i) for i in range(4)] == ["SN1", "SN2", "SN3", "SN3"]
+
+
+def test_views_select_and_count():
+    store = ResultStore(ROWS)
+    view = store.view()
+    assert (len(view), view.count_invalid()) == (3, 2)
+    assert [row[0] for row in view.select(False)] == ["a.log"]
+    assert [row[0] for row in view.select(True)] == ["b.log", "bundle.zip!c.log"]
+
+    picked = ResultView(store, array("q", [2, 0]))
+    assert picked.count_invalid() == 1
+    assert [row[0] for row in picked.select(True)] == ["bundle.zip!c.log"]
+    assert picked[1][0] == "a.log"
+
+    # A view taken earlier keeps its rows while more are appended
+    store.append(ROWS[0])
+    assert len(view) == 3 and len(store.view(2)) == 2
+    assert store.count_invalid(1, 3) == 2
@@ -0,0 +1,188 @@
+"""
+Rule matching: str, bytes and memory-map windows agree with the original single-rule scan
+"""
+import mmap
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.rules import RuleSet  # noqa: E402
+
+LOGS = {
+    "valid": (
+        "Test Program        :HokI_ADL1_MP_V2.0.csv\n"
+        "PCBA SN No          : ADL100000001\n"
+        "\t>>> <info> [00001234] current trim value: \n"
+        "\t>>> mfg_data: 0x0A050000\n"
+    ),
+    "invalid_crlf": (
+        "Station: 3\r\n"
+        "Test Program        :Hapuka_ADL1_MP_V1.1.csv\r\n"
+        "PCBA SN No          : ADL100000002\r\n"
+        "\t>>> <info> [00000ABC] current trim value: \r\n"
+        "\t>>> mfg_data: 0xFFFFFFFF\r\n"
+        "done\r\n"
+    ),
+    "invalid_after_valid_without_serial": (
+        "Test Program        :HokI_ADL1_MP_V2.0.csv\n"
+        "\t>>> mfg_data: 0x0A050000\n"
+        "\t>>> mfg_data: 0xFFFFFFFF"
+    ),
+    "ft_program": (
+        "Test Program        :HokI_ADL1_FT_V2.0.csv\n"
+        "PCBA SN No          : ADL100000003\n"
+        "\t>>> mfg_data: 0xFFFFFFFF\n"
+    ),
+    "no_program": "PCBA SN No          : ADL100000004\n\t>>> mfg_data: 0xFFFFFFFF\n",
+}
+
+
+class AlternationRuleSet(RuleSet):
+    """Default rules located with the prefix-factored regex instead of str.find()"""
+
+    FIND_LIMIT = 0
+
+
+def baseline(text: str):
+    """The scan of the first release: (serial number, True) for invalid MP logs, else None"""
+    lines = text.splitlines(keepends=True)
+    has_mp_program = False
+    for line in lines:
+        if "Test Program        :" in line:
+            parts = line.split(":")[-1].strip().split("_")
+            if len(parts) >= 3 and parts[2].startswith("MP"):
+                has_mp_program = True
+                break
+    if not has_mp_program:
+        return None
+    if not any("mfg_data:" in line and "0xFFFFFFFF" in line for line in lines):
+        return None
+    serial_number = "N/A"
+    for line in lines:
+        if "PCBA SN No          :" in line:
+            serial_number = line.split(":")[-1].strip()
+            break
+    return serial_number, True
+
+
+def str_chunks(text: str, tmp_path: Path):
+    lines = text.splitlines(keepends=True)
+    return ["".join(lines[i:i + 2]) for i in range(0, len(lines), 2)]
+
+
+def bytes_chunks(text: str, tmp_path: Path):
+    return [chunk.encode("utf-8") for chunk in str_chunks(text, tmp_path)]
+
+
+def mmap_windows(text: str, tmp_path: Path):
+    path = tmp_path / "log.txt"
+    path.write_bytes(b"header line\n" + text.encode("utf-8") + b"\ntrailer line\n")
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # Windows of two whole lines, leaving out the lines around the log
+    start, stop = len(b"header line\n"), len(b"header line\n") + len(text.encode("utf-8"))
+    windows = []
+    while start < stop:
+        end = data.find(b"\n", start, stop)
+        end = data.find(b"\n", end + 1, stop) if end >= 0 else -1
+        end = stop if end < 0 else end + 1
+        windows.append((data, start, end))
+        start = end
+    return windows
+
+
+@pytest.mark.parametrize("rules", [RuleSet, AlternationRuleSet])
+@pytest.mark.parametrize("chunks", [str_chunks, bytes_chunks, mmap_windows])
+@pytest.mark.parametrize("log", list(LOGS))
+def test_inputs_match_baseline(rules, chunks, log, tmp_path):
+    text = LOGS[log]
+    result = rules().match(chunks(text, tmp_path))
+    assert result == RuleSet().match([text])
+    found = (result[1]["serial_number"], True) if result and result[2] else None
+    assert found == baseline(text)
+
+
+def test_fields_and_line_ends():
+    rules = RuleSet()
+    assert rules.match([LOGS["valid"]]) == (
+        "mp_mfg_data",
+        {"serial_number": "ADL100000001", "program": "HokI_ADL1_MP_V2.0.csv", "trim_value": "00001234"},
+        False,
+    )
+    name, fields, invalid = rules.match([LOGS["invalid_crlf"].encode("utf-8")])
+    assert (fields["serial_number"], fields["program"], fields["trim_value"], invalid) == (
+        "ADL100000002", "Hapuka_ADL1_MP_V1.1.csv", "00000ABC", True)
+    assert rules.match([LOGS["invalid_after_valid_without_serial"]])[1]["serial_number"] == "N/A"
+
+
+def test_only_first_test_program_line_counts():
+    mp = "Test Program        :HokI_ADL1_MP_V2.0.csv\n"
+    ft = "Test Program        :HokI_ADL1_FT_V2.0.csv\n"
+    body = "\t>>> mfg_data: 0xFFFFFFFF\n"
+    for rules in (RuleSet(), AlternationRuleSet()):
+        assert rules.match([ft + mp + body]) is None
+        assert rules.match([mp, ft + body])[2] is True
+
+
+@pytest.mark.parametrize("rules", [RuleSet, AlternationRuleSet])
+def test_invalid_conditions(rules):
+    definitions = [
+        {
+            "name": "both",
+            "program": "_MP",
+            "require": [{"keyword": "mfg_data:"}],
+            "invalid": [
+                {"keyword": "mfg_data:", "contains": "0xFFFFFFFF"},
+                {"keyword": "retry count:", "regex": r"count:\s*[1-9]"},
+            ],
+        },
+        # Without invalid conditions every match is invalid
+        {"name": "any", "require": [{"keyword": "mfg_data:"}]},
+    ]
+    ruleset = rules(definitions)
+    mp = "Test Program        :A_B_MP_V1.csv\n"
+    assert ruleset.match([mp + "mfg_data: 0xFFFFFFFF\nretry count: 2\n"]) == ("both", {}, True)
+    assert ruleset.match([mp + "mfg_data: 0xFFFFFFFF\nretry count: 0\n"]) == ("both", {}, False)
+    assert ruleset.match([mp + "retry count: 2\nmfg_data: 0x0A050000\n"]) == ("both", {}, False)
+    assert ruleset.match(["Test Program        :A_B_FT_V1.csv\nmfg_data: 0x0A050000\n"]) == ("any", {}, True)
+    assert ruleset.match([mp + "no data\n"]) is None
+
+
+def nested_rules(anchors: int) -> list:
+    """A rule on keywords inside and at the start of another, then unused rules up to the anchor count"""
+    rules = [{
+        "name": "nested",
+        "require": [{"keyword": "data:"}],
+        "invalid": [{"keyword": "mfg_data:", "contains": "0xFFFFFFFF"}],
+        "extract": [{"field": "tool", "keyword": "mfg", "regex": r"(\w+)_data"}],
+    }]
+    # "mfg", "data:" and "mfg_data:" share two anchors; each unused rule adds one
+    for i in range(anchors - 2):
+        rules.append({"name": f"unused_{i}", "require": [{"keyword": f"zz{i:02d}_unused:"}]})
+    return rules
+
+
+@pytest.mark.parametrize("chunks", [str_chunks, bytes_chunks, mmap_windows])
+def test_same_hits_below_and_above_find_limit(chunks, tmp_path):
+    text = "header\n\t>>> mfg_data: 0xFFFFFFFF\n"
+    results = []
+    for anchors in (RuleSet.FIND_LIMIT, RuleSet.FIND_LIMIT + 1):
+        ruleset = RuleSet(nested_rules(anchors))
+        assert len(ruleset._anchors) == anchors
+        results.append(ruleset.match(chunks(text, tmp_path)))
+    assert results == [("nested", {"tool": "mfg"}, True)] * 2
+
+
+def test_no_chunk_is_taken_once_settled():
+    taken = []
+
+    def chunks():
+        for chunk in (LOGS["invalid_crlf"], "never read\n"):
+            taken.append(chunk)
+            yield chunk
+
+    assert RuleSet().match(chunks())[2] is True
+    assert taken == [LOGS["invalid_crlf"]]
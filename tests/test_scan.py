@@ -0,0 +1,70 @@
+"""
+Headless scanner: retests are resolved across folders on the logs' own times
+"""
+import csv
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.data_model import DataModel  # noqa: E402
+from model.scan import main  # noqa: E402
+
+
+def run_scan(tmp_path: Path, *args: str) -> list:
+    output = tmp_path / "out.csv"
+    assert main([*args, "-w", "1", "--status", "all", "-o", str(output)]) == 0
+    with open(output, newline="", encoding="utf-8") as stream:
+        return [(row["File Name"], row["Serial Number"], row["Status"]) for row in csv.DictReader(stream)]
+
+
+def test_latest_retest_across_folders_uses_log_time(tmp_path, write_log):
+    (tmp_path / "A").mkdir()
+    (tmp_path / "B").mkdir()
+    # The newer test is in the folder scanned first
+    write_log(tmp_path / "A" / "x.log", "0x0A050000", serial="SN1", mtime=1_700_000_500)
+    write_log(tmp_path / "B" / "y.log", "0xFFFFFFFF", serial="SN1", mtime=1_700_000_100)
+    folders = (str(tmp_path / "A"), str(tmp_path / "B"))
+
+    assert run_scan(tmp_path, *folders, "--retests", "latest") == [("x.log", "SN1", "Valid")]
+    assert run_scan(tmp_path, *folders, "--retests", "any_invalid") == [("y.log", "SN1", "Invalid")]
+    assert len(run_scan(tmp_path, *folders, "--retests", "all")) == 2
+
+
+def test_file_names_are_relative_to_the_scanned_folder(tmp_path, write_log):
+    logs = tmp_path / "logs"
+    for station in ("st1", "st2"):
+        (logs / station).mkdir(parents=True)
+        write_log(logs / station / "a.log", "0xFFFFFFFF", serial=f"SN-{station}")
+    write_log(tmp_path / "member.log", "0xFFFFFFFF", serial="SN-zip")
+    with zipfile.ZipFile(logs / "st2" / "bundle.zip", "w") as bundle:
+        bundle.write(tmp_path / "member.log", "member.log")
+
+    for args in ((), ("--io-concurrency", "2")):
+        rows = run_scan(tmp_path, str(logs), "--recursive", *args)
+        assert sorted(name for name, _, _ in rows) == ["st1/a.log", "st2/a.log", "st2/bundle.zip!member.log"]
+
+
+def test_unwritable_output_fails_before_scanning(tmp_path, capsys, write_log):
+    write_log(tmp_path / "a.log", "0xFFFFFFFF")
+    assert main([str(tmp_path), "-w", "1", "--timings", "-o", str(tmp_path / "missing" / "out.csv")]) == 2
+    err = capsys.readouterr().err
+    assert err.startswith("error: cannot write output to") and len(err.splitlines()) == 1
+
+
+def test_log_time_comes_from_the_planned_stat(tmp_path, monkeypatch, write_log):
+    write_log(tmp_path / "a.log", "0xFFFFFFFF", mtime=1_700_000_500)
+    stats = []
+    stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        stats.append(Path(path).name)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    model = DataModel(workers=1)
+    model.process_folder(str(tmp_path))
+    assert model.found_items.row(0)[5] == 1_700_000_500
+    assert stats.count("a.log") == 1
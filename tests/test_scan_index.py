@@ -0,0 +1,44 @@
+"""
+Scan index: unchanged files reuse their stored outcome, checked at the time of the new scan
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.data_model import DataModel  # noqa: E402
+from model.scan_index import ScanIndex  # noqa: E402
+
+
+def test_cached_results_get_the_check_time_of_the_new_scan(tmp_path, write_log):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    write_log(logs / "a.log", "0xFFFFFFFF")
+    index = ScanIndex(str(tmp_path / "index.sqlite3"))
+    model = DataModel(workers=1, index=index)
+    model.process_folder(str(logs))
+
+    # As if the file had been indexed by a scan long ago
+    path, (size, mtime_ns, results) = next(iter(index.load(logs).items()))
+    index.store([(path, size, mtime_ns, [result[:3] + ("2000-01-01 00:00:00",) + result[4:]
+                                         for result in results])])
+    model.process_folder(str(logs))
+    index.close()
+
+    assert model.metrics.counters["files_cached"] == 1
+    rows = list(model.get_results())
+    assert [row[:3] for row in rows] == [("a.log", "ADL100000001", True)]
+    assert rows[0][3] != "2000-01-01 00:00:00"
+
+
+def test_unusable_index_falls_back_to_a_plain_scan(tmp_path, write_log):
+    write_log(tmp_path / "a.log", "0xFFFFFFFF")
+    errors = []
+    model = DataModel(workers=1, index=ScanIndex(str(tmp_path / "a.log" / "index.sqlite3")))
+    results = model.process_folder(str(tmp_path), error_callback=errors.append)
+
+    assert len(results) == 1
+    assert len(errors) == 1 and errors[0].startswith("Scan index unavailable")
+    # Rescans of the same run scan without it and report nothing more
+    assert len(model.process_files([tmp_path / "a.log"], error_callback=errors.append)) == 1
+    assert len(errors) == 1
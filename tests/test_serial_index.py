@@ -0,0 +1,90 @@
+"""
+Serial index: retest policies, ties, logs without a serial number and superseded rows
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.result_store import ResultStore  # noqa: E402
+from model.serial_index import MISSING_SERIAL, SerialIndex  # noqa: E402
+
+
+def result(filename: str, serial: str, invalid: bool, log_time: int) -> tuple:
+    return (filename, serial, invalid, 1_700_000_000, {}, log_time)
+
+
+def build() -> SerialIndex:
+    # SN1 tested three times: the invalid test is neither first nor last
+    return SerialIndex(ResultStore([
+        result("a1.log", "SN1", False, 100),
+        result("b1.log", "SN2", True, 100),
+        result("a2.log", "SN1", True, 200),
+        result("a3.log", "SN1", False, 300),
+        result("x1.log", MISSING_SERIAL, False, 100),
+        result("x2.log", MISSING_SERIAL, True, 200),
+    ]))
+
+
+@pytest.mark.parametrize("policy, rows", [
+    ("all", [0, 1, 2, 3, 4, 5]),
+    ("latest", [1, 3, 4, 5]),
+    ("any_invalid", [1, 2, 4, 5]),
+])
+def test_policies(policy, rows):
+    index = build()
+    assert list(index.resolve(policy)) == rows
+    assert [row[0] for row in index.view(policy)] == [index.store.filename(row) for row in rows]
+
+
+def test_rows_and_retests():
+    index = build()
+    assert index.rows("SN1") == [0, 2, 3]
+    assert [name for name, _, _, _ in index.results("SN1")] == ["a1.log", "a2.log", "a3.log"]
+    # Logs without a serial number are never merged into one PCBA
+    assert index.retested() == ["SN1"]
+    assert (len(index), "SN2" in index, "SN9" in index) == (3, True, False)
+    with pytest.raises(ValueError):
+        index.resolve("newest")
+
+
+def test_equal_log_times_keep_the_later_row():
+    index = SerialIndex(ResultStore([
+        result("a.log", "SN1", True, 100),
+        result("b.log", "SN1", True, 100),
+        result("c.log", "SN1", False, 100),
+    ]))
+    assert list(index.resolve("latest")) == [2]
+    assert list(index.resolve("any_invalid")) == [1]
+
+
+def test_rows_appended_later_are_indexed():
+    index = build()
+    assert list(index.resolve("latest")) == [1, 3, 4, 5]
+    index.store.append(result("b2.log", "SN2", False, 150))
+    assert index.rows("SN2") == [1, 6]
+    assert list(index.resolve("latest")) == [3, 4, 5, 6]
+
+
+def test_supersede_by_source():
+    store = ResultStore()
+    index = SerialIndex(store)
+    index.extend([result("a.log", "SN1", False, 100)], "st1/a.log")
+    index.extend([result("a.log", "SN2", True, 100)], "st2/a.log")
+    index.extend([result("bundle.zip!c.log", "SN3", False, 100),
+                  result("bundle.zip!d.log", "SN4", False, 100)], "bundle.zip")
+
+    assert index.supersede(["st1/a.log", "bundle.zip"]) == [0, 2, 3]
+    index.extend([result("a.log", "SN1", True, 200)], "st1/a.log")
+    assert list(index.resolve("all")) == [1, 4]
+    assert index.rows("SN1") == [4]
+    assert index.retested() == []
+    # Superseded rows are left out whatever the policy
+    assert list(index.resolve("any_invalid")) == [1, 4]
+
+    # Rows appended after the first supersede() are found by theirs
+    assert index.supersede(["st1/a.log"]) == [4]
+    assert index.supersede(["st1/a.log", "missing.log"]) == []
+    assert list(index.resolve("latest")) == [1]
@@ -0,0 +1,75 @@
+"""
+Rescans of watched files: a rewritten log replaces its earlier result
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.data_model import DataModel  # noqa: E402
+
+
+def scan(tmp_path: Path, policy: str, write_log) -> DataModel:
+    write_log(tmp_path / "a.log", "0x0A050000")
+    write_log(tmp_path / "b.log", "0xFFFFFFFF", serial="ADL100000002")
+    model = DataModel(workers=1, retest_policy=policy)
+    model.process_folder(str(tmp_path))
+    return model
+
+
+def rescan(model: DataModel, *files: Path):
+    sources = []
+    model.replace_results(files, model.process_files(files, sources=sources), sources)
+
+
+def test_rewritten_log_status_change_replaces_row(tmp_path, write_log):
+    for policy in ("all", "latest", "any_invalid"):
+        folder = tmp_path / policy
+        folder.mkdir()
+        model = scan(folder, policy, write_log)
+        assert model.get_statistics()["invalid"] == 1
+
+        write_log(folder / "a.log", "0xFFFFFFFF", mtime=1_700_000_100)
+        rescan(model, folder / "a.log")
+
+        rows = [(name, serial, invalid) for name, serial, invalid, _ in model.get_results()]
+        assert sorted(rows) == [("a.log", "ADL100000001", True), ("b.log", "ADL100000002", True)]
+        stats = model.get_statistics()
+        assert (stats["total"], stats["invalid"]) == (2, 2)
+
+
+def test_rewritten_log_with_new_serial_and_without_result(tmp_path, write_log):
+    model = scan(tmp_path, "all", write_log)
+    write_log(tmp_path / "a.log", "0xFFFFFFFF", serial="ADL100000003")
+    (tmp_path / "b.log").write_text("Test Program        :HokI_ADL1_FT_V2.0.csv\n", encoding="utf-8")
+    rescan(model, tmp_path / "a.log", tmp_path / "b.log")
+
+    assert [(name, serial) for name, serial, _, _ in model.get_results()] == [("a.log", "ADL100000003")]
+    assert model.serial_index.rows("ADL100000001") == []
+    assert model.serial_index.retested() == []
+
+
+def test_unchanged_rescan_keeps_one_row(tmp_path, write_log):
+    model = scan(tmp_path, "all", write_log)
+    rescan(model, tmp_path / "a.log")
+    rescan(model, tmp_path / "a.log")
+
+    assert len(model.get_results()) == 2
+    assert len(model.serial_index.rows("ADL100000001")) == 1
+
+
+def test_same_named_logs_in_two_subfolders(tmp_path, write_log):
+    for folder in ("st1", "st2"):
+        (tmp_path / folder).mkdir()
+    write_log(tmp_path / "st1" / "a.log", "0x0A050000")
+    write_log(tmp_path / "st2" / "a.log", "0xFFFFFFFF", serial="ADL100000002")
+    model = DataModel(workers=1, recursive=True)
+    model.process_folder(str(tmp_path))
+
+    write_log(tmp_path / "st1" / "a.log", "0xFFFFFFFF", mtime=1_700_000_100)
+    rescan(model, tmp_path / "st1" / "a.log")
+    rescan(model, tmp_path / "st1" / "a.log")
+
+    rows = [(name, serial, invalid) for name, serial, invalid, _ in model.get_results()]
+    assert sorted(rows) == [("st1/a.log", "ADL100000001", True), ("st2/a.log", "ADL100000002", True)]
+    assert model.source_of(tmp_path / "st2" / "a.log") == "st2/a.log"
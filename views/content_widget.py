@@ -3,7 +3,7 @@ Content Widget - Main content area with file processing controls
 """
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QLineEdit, QFileDialog, QGroupBox,
-                               QRadioButton, QButtonGroup, QFrame)
+                               QRadioButton, QButtonGroup, QFrame, QCheckBox)
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
 
@@ -13,6 +13,8 @@ class ContentWidget(QWidget):
     
     # Signals
     process_requested = Signal(str, str)  # folder_path, filter_type
+    cancel_requested = Signal()
+    pause_requested = Signal(bool)  # True = pause, False = resume
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -20,75 +22,6 @@ class ContentWidget(QWidget):
         
     def setup_ui(self):
         """Setup the content UI"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f8f9fa;
-            }
-            QLabel {
-                color: #2c3e50;
-            }
-            QGroupBox {
-                background-color: white;
-                border: 2px solid #dee2e6;
-                border-radius: 8px;
-                margin-top: 10px;
-                font-weight: bold;
-                padding: 15px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 15px;
-                padding: 0 5px;
-                color: #2c3e50;
-            }
-            QLineEdit {
-                padding: 10px;
-                border: 2px solid #dee2e6;
-                border-radius: 5px;
-                background-color: white;
-                font-size: 13px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #1abc9c;
-            }
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                padding: 10px 25px;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-            QPushButton#browseBtn {
-                background-color: #95a5a6;
-                padding: 10px 20px;
-            }
-            QPushButton#browseBtn:hover {
-                background-color: #7f8c8d;
-            }
-            QPushButton#processBtn {
-                background-color: #1abc9c;
-                padding: 12px 40px;
-                font-size: 15px;
-            }
-            QPushButton#processBtn:hover {
-                background-color: #16a085;
-            }
-            QRadioButton {
-                color: #2c3e50;
-                spacing: 8px;
-                font-size: 13px;
-            }
-            QRadioButton::indicator {
-                width: 18px;
-                height: 18px;
-            }
-        """)
-        
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
         layout.setSpacing(20)       
@@ -109,6 +42,28 @@ class ContentWidget(QWidget):
         folder_input_layout.addWidget(browse_btn)
         
         folder_layout.addLayout(folder_input_layout)
+        
+        # Discovery option: also scan per-station/per-date subfolders
+        self.recursive_checkbox = QCheckBox("Include subfolders")
+        folder_layout.addWidget(self.recursive_checkbox)
+        
+        # Scan index option: re-read every file instead of reusing cached outcomes
+        self.force_rescan_checkbox = QCheckBox("Force full rescan (ignore scan cache)")
+        folder_layout.addWidget(self.force_rescan_checkbox)
+        
+        # Watch option: keep scanning new/modified logs after the first scan
+        self.watch_checkbox = QCheckBox("Watch folder for new logs after processing")
+        folder_layout.addWidget(self.watch_checkbox)
+        
+        # History option: keep the results in the local history database
+        self.history_checkbox = QCheckBox("Save results to history")
+        self.history_checkbox.setChecked(True)
+        folder_layout.addWidget(self.history_checkbox)
+        
+        # Metrics option: append each run's stage timings and counters to a JSON log
+        self.metrics_checkbox = QCheckBox("Save scan metrics (scan_metrics.jsonl)")
+        folder_layout.addWidget(self.metrics_checkbox)
+        
         folder_group.setLayout(folder_layout)
         layout.addWidget(folder_group)
         
@@ -153,6 +108,22 @@ class ContentWidget(QWidget):
         self.process_btn.setCursor(Qt.PointingHandCursor)
         process_btn_layout.addWidget(self.process_btn)
         
+        # Pause/Resume and Cancel, only shown while processing
+        self.pause_btn = QPushButton("⏸ Pause")
+        self.pause_btn.setObjectName("pauseBtn")
+        self.pause_btn.setCheckable(True)
+        self.pause_btn.toggled.connect(self._on_pause_toggled)
+        self.pause_btn.setCursor(Qt.PointingHandCursor)
+        self.pause_btn.hide()
+        process_btn_layout.addWidget(self.pause_btn)
+        
+        self.cancel_btn = QPushButton("■ Cancel")
+        self.cancel_btn.setObjectName("cancelBtn")
+        self.cancel_btn.clicked.connect(self._on_cancel_clicked)
+        self.cancel_btn.setCursor(Qt.PointingHandCursor)
+        self.cancel_btn.hide()
+        process_btn_layout.addWidget(self.cancel_btn)
+        
         process_btn_layout.addStretch()
         layout.addLayout(process_btn_layout)
         
@@ -190,9 +161,63 @@ class ContentWidget(QWidget):
         """Enable/disable controls during processing"""
         self.process_btn.setEnabled(not is_processing)
         self.folder_input.setEnabled(not is_processing)
+        self.force_rescan_checkbox.setEnabled(not is_processing)
+        self.recursive_checkbox.setEnabled(not is_processing)
+        self.watch_checkbox.setEnabled(not is_processing)
+        self.history_checkbox.setEnabled(not is_processing)
+        self.metrics_checkbox.setEnabled(not is_processing)
+        
+        # Reset the pause toggle without emitting a resume request
+        self.pause_btn.blockSignals(True)
+        self.pause_btn.setChecked(False)
+        self.pause_btn.setText("⏸ Pause")
+        self.pause_btn.blockSignals(False)
+        self.pause_btn.setVisible(is_processing)
+        self.pause_btn.setEnabled(True)
+        self.cancel_btn.setVisible(is_processing)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setText("■ Cancel")
         
         if is_processing:
             self.process_btn.setText("⏳ Processing...")
         else:
             self.process_btn.setText("▶ Start Processing")
-
+            
+    def set_watching_state(self, is_watching: bool):
+        """Show the watch state; Cancel stops watching"""
+        self.set_processing_state(is_watching)
+        self.pause_btn.hide()
+        if is_watching:
+            self.process_btn.setText("👁 Watching...")
+            self.cancel_btn.setText("■ Stop Watching")
+            
+    def _on_pause_toggled(self, paused: bool):
+        """Handle pause/resume button toggle"""
+        self.pause_btn.setText("▶ Resume" if paused else "⏸ Pause")
+        self.pause_requested.emit(paused)
+        
+    def _on_cancel_clicked(self):
+        """Handle cancel button click"""
+        self.cancel_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
+        self.cancel_requested.emit()
+            
+    def is_recursive(self) -> bool:
+        """Whether subfolders should be scanned too"""
+        return self.recursive_checkbox.isChecked()
+            
+    def is_force_rescan(self) -> bool:
+        """Whether the next scan should ignore the scan index"""
+        return self.force_rescan_checkbox.isChecked()
+            
+    def is_watch_enabled(self) -> bool:
+        """Whether the folder should be watched after the scan"""
+        return self.watch_checkbox.isChecked()
+            
+    def is_history_enabled(self) -> bool:
+        """Whether the results should be saved to the history database"""
+        return self.history_checkbox.isChecked()
+            
+    def is_metrics_enabled(self) -> bool:
+        """Whether the scan metrics should be saved to the metrics log"""
+        return self.metrics_checkbox.isChecked()
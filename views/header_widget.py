@@ -11,6 +11,7 @@ class HeaderWidget(QWidget):
     
     # Signals
     toggle_sidebar = Signal()  # Signal to toggle sidebar visibility
+    export_cancel_requested = Signal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,44 +20,6 @@ class HeaderWidget(QWidget):
         
     def setup_ui(self):
         """Setup the header UI"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f0f0f0;
-            }
-            QLabel {
-                color: #2c3e50;
-            }
-            QProgressBar {
-                border: 2px solid #bdc3c7;
-                border-radius: 5px;
-                text-align: center;
-                height: 25px;
-                background-color: #ecf0f1;
-            }
-            QProgressBar::chunk {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                                                  stop:0 #1abc9c, stop:1 #16a085);
-                border-radius: 3px;
-            }
-            QPushButton#toggleBtn {
-                background-color: transparent;
-                border: 2px solid #bdc3c7;
-                border-radius: 5px;
-                padding: 8px 12px;
-                color: #2c3e50;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QPushButton#toggleBtn:hover {
-                background-color: #ecf0f1;
-                border-color: #1abc9c;
-            }
-            QPushButton#toggleBtn:pressed {
-                background-color: #1abc9c;
-                color: white;
-            }
-        """)
-        
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 15, 20, 15)
         
@@ -110,9 +73,14 @@ class HeaderWidget(QWidget):
         percentage_font.setPointSize(16)
         percentage_font.setBold(True)
         self.percentage_label.setFont(percentage_font)
-        self.percentage_label.setStyleSheet("color: #1abc9c;")
+        self.percentage_label.setObjectName("percentageLabel")
         stats_layout.addWidget(self.percentage_label)
         
+        # Throughput and ETA of the running scan
+        self.rate_label = QLabel("")
+        self.rate_label.setObjectName("hintLabel")
+        stats_layout.addWidget(self.rate_label)
+        
         progress_layout.addLayout(stats_layout)
         
         # Progress bar
@@ -123,23 +91,54 @@ class HeaderWidget(QWidget):
         self.progress_bar.setTextVisible(True)
         progress_layout.addWidget(self.progress_bar, 1)
         
+        # Cancel button of a running export
+        self.cancel_export_btn = QPushButton("Cancel Export")
+        self.cancel_export_btn.setObjectName("cancelExportBtn")
+        self.cancel_export_btn.setCursor(Qt.PointingHandCursor)
+        self.cancel_export_btn.clicked.connect(self.export_cancel_requested.emit)
+        self.cancel_export_btn.hide()
+        progress_layout.addWidget(self.cancel_export_btn)
+        
         main_layout.addLayout(progress_layout)
         
         # Separator
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
-        separator.setStyleSheet("background-color: #ecf0f1; max-height: 2px;")
+        separator.setObjectName("headerSeparator")
         main_layout.addWidget(separator)
         
-    def update_progress(self, current: int, total: int, percentage: float):
+    def update_progress(self, current: int, total: int, percentage: float,
+                        files_per_sec: float = 0.0, mb_per_sec: float = 0.0, eta: float = -1.0):
         """Update the progress indicators"""
         self.progress_label.setText(f"{current:,} / {total:,}")
         self.percentage_label.setText(f"{percentage:.1f}%")
         self.progress_bar.setValue(int(percentage))
         
+        if files_per_sec > 0:
+            rate_text = f"{files_per_sec:,.0f} files/s | {mb_per_sec:,.1f} MB/s"
+            if eta >= 0:
+                minutes, seconds = divmod(int(eta), 60)
+                hours, minutes = divmod(minutes, 60)
+                rate_text += f" | ETA {hours}:{minutes:02d}:{seconds:02d}"
+            self.rate_label.setText(rate_text)
+        else:
+            self.rate_label.setText("")
+        
     def reset_progress(self):
         """Reset progress to zero"""
         self.update_progress(0, 0, 0.0)
+        
+    def update_export_progress(self, written: int, total: int):
+        """Show the progress of a running export"""
+        percentage = written * 100.0 / total if total else 100.0
+        self.progress_label.setText(f"Exporting {written:,} / {total:,}")
+        self.percentage_label.setText(f"{percentage:.1f}%")
+        self.progress_bar.setValue(int(percentage))
+        self.rate_label.setText("")
+        
+    def set_export_state(self, is_exporting: bool):
+        """Show the cancel button while an export is running"""
+        self.cancel_export_btn.setVisible(is_exporting)
     
     def _on_toggle_clicked(self):
         """Handle toggle button click"""
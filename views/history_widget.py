@@ -0,0 +1,133 @@
+"""
+History Widget - Search the results of earlier scan runs
+"""
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QAbstractItemView,
+                               QHeaderView, QHBoxLayout, QLabel, QPushButton, QLineEdit,
+                               QComboBox)
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QFont
+
+from .result_table_model import ResultTableModel
+
+
+class HistoryWidget(QWidget):
+    """Query panel over the result history database"""
+    
+    STATUSES = [
+        ("invalid", "Invalid"),
+        ("valid", "Valid"),
+        ("all", "All"),
+    ]
+    # Check time ranges in days (0 = any time)
+    PERIODS = [
+        (0, "Any time"),
+        (1, "Last 24 hours"),
+        (7, "Last 7 days"),
+        (30, "Last 30 days"),
+    ]
+    
+    # Signals
+    search_requested = Signal(str, str, str, int)  # serial number, file name, status, days
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+        
+    def setup_ui(self):
+        """Setup the history UI"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+        
+        # Header section
+        header_layout = QHBoxLayout()
+        
+        title_label = QLabel("History")
+        title_font = QFont()
+        title_font.setPointSize(14)
+        title_font.setBold(True)
+        title_label.setFont(title_font)
+        header_layout.addWidget(title_label)
+        
+        # Rows found by the last query
+        self.info_label = QLabel("")
+        self.info_label.setObjectName("hintLabel")
+        header_layout.addWidget(self.info_label)
+        
+        header_layout.addStretch()
+        layout.addLayout(header_layout)
+        
+        # Query section
+        query_layout = QHBoxLayout()
+        
+        self.serial_input = QLineEdit()
+        self.serial_input.setPlaceholderText("Serial number (end with * for a prefix)")
+        self.serial_input.returnPressed.connect(self._on_search_clicked)
+        query_layout.addWidget(self.serial_input, 1)
+        
+        self.file_input = QLineEdit()
+        self.file_input.setPlaceholderText("File name (end with * for a prefix)")
+        self.file_input.returnPressed.connect(self._on_search_clicked)
+        query_layout.addWidget(self.file_input, 1)
+        
+        self.status_combo = QComboBox()
+        for status, label in self.STATUSES:
+            self.status_combo.addItem(label, status)
+        query_layout.addWidget(self.status_combo)
+        
+        self.period_combo = QComboBox()
+        for days, label in self.PERIODS:
+            self.period_combo.addItem(label, days)
+        query_layout.addWidget(self.period_combo)
+        
+        search_btn = QPushButton("🔍 Search")
+        search_btn.clicked.connect(self._on_search_clicked)
+        query_layout.addWidget(search_btn)
+        
+        layout.addLayout(query_layout)
+        
+        # Table (same columns as the result table)
+        self.table_model = ResultTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Fixed)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        header.setSectionResizeMode(3, QHeaderView.Fixed)
+        header.setSectionResizeMode(4, QHeaderView.Fixed)
+        
+        self.table.setColumnWidth(0, 60)
+        self.table.setColumnWidth(3, 120)
+        self.table.setColumnWidth(4, 160)
+        
+        vertical_header = self.table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(32)
+        
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        
+        layout.addWidget(self.table)
+        
+    def _on_search_clicked(self):
+        """Emit the current query"""
+        self.search_requested.emit(
+            self.serial_input.text().strip(),
+            self.file_input.text().strip(),
+            self.status_combo.currentData(),
+            self.period_combo.currentData(),
+        )
+        
+    def set_results(self, results, total: int, elapsed: float):
+        """
+        Show the results of a query
+        results: ResultView of the rows returned (newest first)
+        total: number of matching rows, which may exceed the rows returned
+        elapsed: query time in seconds
+        """
+        self.table_model.set_results(results)
+        shown = f"{len(results):,} of {total:,}" if total > len(results) else f"{total:,}"
+        self.info_label.setText(f"{shown} results in {elapsed * 1000:.0f} ms")
@@ -9,19 +9,33 @@ from PySide6.QtGui import QIcon
 from .sidebar_widget import SidebarWidget
 from .header_widget import HeaderWidget
 from .content_widget import ContentWidget
-from .result_widget import ResultWidget
 from .terminal_widget import TerminalWidget
 
 
 class MainWindow(QMainWindow):
-    """Main application window"""
+    """
+    Main application window
+    Only the pages visible at startup are built with the window; the result
+    and history pages (and their modules) are built on first use, through
+    the result_widget and history_widget properties.
+    """
     
     # Signals
     process_requested = Signal(str, str)  # folder_path, filter_type
+    cancel_requested = Signal()
+    pause_requested = Signal(bool)  # True = pause, False = resume
     export_requested = Signal()
+    retest_policy_changed = Signal(str)
+    export_cancel_requested = Signal()
+    history_search_requested = Signal(str, str, str, int)  # serial number, file name, status, days
+    status_filter_changed = Signal(str)
+    search_changed = Signal(str)
+    sort_changed = Signal(int, bool)  # column, descending
     
     def __init__(self):
         super().__init__()
+        self._result_widget = None
+        self._history_widget = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -51,6 +65,7 @@ class MainWindow(QMainWindow):
         # Header
         self.header = HeaderWidget()
         self.header.toggle_sidebar.connect(self._toggle_sidebar)
+        self.header.export_cancel_requested.connect(self.export_cancel_requested.emit)
         right_layout.addWidget(self.header)
         
         # Content area with splitter
@@ -62,13 +77,10 @@ class MainWindow(QMainWindow):
         # Dashboard/Processing view
         self.content_widget = ContentWidget()
         self.content_widget.process_requested.connect(self.process_requested.emit)
+        self.content_widget.cancel_requested.connect(self.cancel_requested.emit)
+        self.content_widget.pause_requested.connect(self.pause_requested.emit)
         self.content_stack.addWidget(self.content_widget)
         
-        # Result view
-        self.result_widget = ResultWidget()
-        self.result_widget.export_requested.connect(self.export_requested.emit)
-        self.content_stack.addWidget(self.result_widget)
-        
         self.splitter.addWidget(self.content_stack)
         
         # Terminal
@@ -83,19 +95,29 @@ class MainWindow(QMainWindow):
         
         main_layout.addWidget(right_widget, 1)
         
-        # Apply stylesheet
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #ecf0f1;
-            }
-            QSplitter::handle {
-                background-color: #bdc3c7;
-                height: 2px;
-            }
-            QSplitter::handle:hover {
-                background-color: #95a5a6;
-            }
-        """)
+    @property
+    def result_widget(self):
+        """Result page, built and added to the content stack on first use"""
+        if self._result_widget is None:
+            from .result_widget import ResultWidget
+            self._result_widget = ResultWidget()
+            self._result_widget.export_requested.connect(self.export_requested.emit)
+            self._result_widget.retest_policy_changed.connect(self.retest_policy_changed.emit)
+            self._result_widget.status_filter_changed.connect(self.status_filter_changed.emit)
+            self._result_widget.search_changed.connect(self.search_changed.emit)
+            self._result_widget.sort_changed.connect(self.sort_changed.emit)
+            self.content_stack.addWidget(self._result_widget)
+        return self._result_widget
+        
+    @property
+    def history_widget(self):
+        """History page, built and added to the content stack on first use"""
+        if self._history_widget is None:
+            from .history_widget import HistoryWidget
+            self._history_widget = HistoryWidget()
+            self._history_widget.search_requested.connect(self.history_search_requested.emit)
+            self.content_stack.addWidget(self._history_widget)
+        return self._history_widget
         
     def _on_menu_changed(self, menu_name: str):
         """Handle menu change"""
@@ -105,6 +127,8 @@ class MainWindow(QMainWindow):
             self.content_stack.setCurrentWidget(self.content_widget)
         elif menu_name == "Results":
             self.content_stack.setCurrentWidget(self.result_widget)
+        elif menu_name == "History":
+            self.content_stack.setCurrentWidget(self.history_widget)
         elif menu_name == "Settings":
             self.terminal.log_info("Settings page - Coming soon!")
         elif menu_name == "About":
@@ -113,22 +137,49 @@ class MainWindow(QMainWindow):
             
     # Public methods for presenter to interact with
     
-    def update_progress(self, current: int, total: int, percentage: float):
+    def update_progress(self, current: int, total: int, percentage: float,
+                        files_per_sec: float = 0.0, mb_per_sec: float = 0.0, eta: float = -1.0):
         """Update progress indicators"""
-        self.header.update_progress(current, total, percentage)
+        self.header.update_progress(current, total, percentage, files_per_sec, mb_per_sec, eta)
         
     def reset_progress(self):
         """Reset progress"""
         self.header.reset_progress()
         
-    def set_results(self, results: list):
+    def update_export_progress(self, written: int, total: int):
+        """Update export progress indicators"""
+        self.header.update_export_progress(written, total)
+        
+    def set_export_state(self, is_exporting: bool):
+        """Show or hide the export cancel button"""
+        self.header.set_export_state(is_exporting)
+        
+    def set_results(self, results):
         """Set results in result widget"""
         self.result_widget.set_results(results)
         
+    def append_results(self, results):
+        """Append results to the result widget"""
+        self.result_widget.append_results(results)
+        
     def update_statistics(self, stats: dict):
         """Update statistics"""
         self.result_widget.update_statistics(stats)
         
+    def update_summary(self, summary: dict):
+        """Show grouped aggregates in the result widget"""
+        self.result_widget.update_summary(summary)
+        
+    def clear_summary(self):
+        """Hide the result summary"""
+        self.result_widget.clear_summary()
+        
+    def set_history_results(self, results, total: int, elapsed: float):
+        """Show the results of a history query"""
+        self.history_widget.set_results(results, total, elapsed)
+        
+    # Logging methods are thread-safe: messages are queued by the terminal
+    
     def log_info(self, message: str):
         """Log info message"""
         self.terminal.log_info(message)
@@ -149,6 +200,38 @@ class MainWindow(QMainWindow):
         """Set processing state"""
         self.content_widget.set_processing_state(is_processing)
         
+    def set_watching_state(self, is_watching: bool):
+        """Set folder watch state"""
+        self.content_widget.set_watching_state(is_watching)
+        
+    def is_recursive(self) -> bool:
+        """Whether the user asked to include subfolders"""
+        return self.content_widget.is_recursive()
+        
+    def is_force_rescan(self) -> bool:
+        """Whether the user asked for a full rescan"""
+        return self.content_widget.is_force_rescan()
+        
+    def set_status_filter(self, status: str):
+        """Select the status filter of the result table"""
+        self.result_widget.set_status_filter(status)
+        
+    def is_history_enabled(self) -> bool:
+        """Whether the user asked to save the results to the history"""
+        return self.content_widget.is_history_enabled()
+        
+    def is_metrics_enabled(self) -> bool:
+        """Whether the user asked to save the scan metrics"""
+        return self.content_widget.is_metrics_enabled()
+        
+    def retest_policy(self) -> str:
+        """Get the selected retest policy"""
+        return self.result_widget.retest_policy()
+        
+    def is_watch_enabled(self) -> bool:
+        """Whether the user asked to watch the folder after the scan"""
+        return self.content_widget.is_watch_enabled()
+        
     def show_results_view(self):
         """Switch to results view"""
         self.content_stack.setCurrentWidget(self.result_widget)
@@ -0,0 +1,111 @@
+"""
+Result Table Model - Virtualized Qt model over a result store view
+"""
+from array import array
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
+
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    Read-only table model backed directly by a result store
+    Cells are read from the store's columns lazily in data(), so only
+    visible rows cost anything; the table itself only keeps row numbers.
+    results: ResultView (rows of a model.result_store.ResultStore)
+    """
+
+    HEADERS = ["#", "File Name", "Serial Number", "Status", "Check Time"]
+    CENTERED_COLUMNS = (0, 3, 4)
+    STATUS_COLUMN = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._store = None
+        # Store row shown on each table row: a range while the rows are
+        # contiguous, else an array. set_results() adopts the view's indices;
+        # they are only copied on the first append so the view is never modified
+        self._rows = range(0)
+        self._owns_rows = True
+        self._invalid_color = QColor("#e74c3c")
+        self._valid_color = QColor("#27ae60")
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(row + 1)
+            i = self._rows[row]
+            if column == 1:
+                return self._store.filename(i)
+            if column == 2:
+                return self._store.serial_number(i)
+            if column == 3:
+                return "❌ Invalid" if self._store.is_invalid(i) else "✅ Valid"
+            return self._store.check_time(i)
+
+        if role == Qt.ForegroundRole and column == self.STATUS_COLUMN:
+            return self._invalid_color if self._store.is_invalid(self._rows[row]) else self._valid_color
+
+        if role == Qt.TextAlignmentRole and column in self.CENTERED_COLUMNS:
+            return Qt.AlignCenter
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_results(self, results):
+        """Replace all rows (O(1): the view is referenced, not copied)"""
+        self.beginResetModel()
+        self._store = results.store
+        self._rows = results.indices
+        self._owns_rows = False
+        self.endResetModel()
+
+    def append_results(self, results):
+        """Append rows at the end of the table"""
+        if not len(results):
+            return
+        rows = self._rows
+        added = results.indices
+        if not rows:
+            # An empty table follows whichever store the rows come from
+            self._store = results.store
+        elif results.store is not self._store:
+            raise ValueError("Appended rows must come from the displayed result store")
+
+        start = len(rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(added) - 1)
+        if isinstance(rows, range) and isinstance(added, range) and rows.stop == added.start \
+                and rows.step == added.step == 1:
+            self._rows = range(rows.start, added.stop)
+        elif not rows:
+            self._rows = added
+            self._owns_rows = False
+        else:
+            if not self._owns_rows:
+                self._rows = array("q", rows)
+                self._owns_rows = True
+            self._rows.extend(added)
+        self.endInsertRows()
+
+    def clear(self):
+        """Remove all rows"""
+        self.beginResetModel()
+        self._store = None
+        self._rows = range(0)
+        self._owns_rows = True
+        self.endResetModel()
@@ -1,17 +1,42 @@
 """
 Result Widget - Display processed results in a table
 """
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, 
-                               QHeaderView, QHBoxLayout, QLabel, QPushButton, QFileDialog)
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QAbstractItemView,
+                               QHeaderView, QHBoxLayout, QLabel, QPushButton, QFileDialog,
+                               QTextBrowser, QComboBox, QLineEdit)
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QFont
+import html
+
+from .result_table_model import ResultTableModel
 
 
 class ResultWidget(QWidget):
     """Widget to display processing results"""
     
+    # Groups listed per summary section
+    SUMMARY_ROWS = 5
+    # Retest policies offered for serial numbers tested several times
+    RETEST_POLICIES = [
+        ("all", "Show all tests"),
+        ("latest", "Latest test wins"),
+        ("any_invalid", "Any invalid wins"),
+    ]
+    # Status filters applied to the table without rescanning
+    STATUS_FILTERS = [
+        ("invalid", "Invalid"),
+        ("valid", "Valid"),
+        ("all", "All"),
+    ]
+    # Typing pause before the search is applied
+    SEARCH_DELAY_MS = 150
+    
     # Signals
     export_requested = Signal()
+    retest_policy_changed = Signal(str)
+    status_filter_changed = Signal(str)
+    search_changed = Signal(str)
+    sort_changed = Signal(int, bool)  # column, descending
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,46 +44,6 @@ class ResultWidget(QWidget):
         
     def setup_ui(self):
         """Setup the result UI"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f8f9fa;
-            }
-            QLabel {
-                color: #2c3e50;
-            }
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #dee2e6;
-                border-radius: 5px;
-                gridline-color: #dee2e6;
-            }
-            QTableWidget::item {
-                padding: 8px;
-            }
-            QTableWidget::item:selected {
-                background-color: #1abc9c;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #34495e;
-                color: white;
-                padding: 10px;
-                border: none;
-                font-weight: bold;
-            }
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                padding: 8px 20px;
-                border-radius: 5px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-        """)
-        
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
         layout.setSpacing(10)
@@ -75,11 +60,46 @@ class ResultWidget(QWidget):
         
         # Statistics labels
         self.stats_label = QLabel("Total: 0 | Valid: 0 | Invalid: 0")
-        self.stats_label.setStyleSheet("color: #7f8c8d; font-size: 12px;")
+        self.stats_label.setObjectName("hintLabel")
         header_layout.addWidget(self.stats_label)
         
         header_layout.addStretch()
         
+        # Search on serial number and file name, applied after a short pause
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search SN or file name (prefix*)")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setMinimumWidth(240)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(
+            lambda: self.search_changed.emit(self.search_input.text().strip())
+        )
+        self.search_input.textChanged.connect(self._search_timer.start)
+        header_layout.addWidget(self.search_input)
+        
+        # Status filter
+        self.status_combo = QComboBox()
+        for status, label in self.STATUS_FILTERS:
+            self.status_combo.addItem(label, status)
+        self.status_combo.currentIndexChanged.connect(
+            lambda: self.status_filter_changed.emit(self.status_filter())
+        )
+        header_layout.addWidget(self.status_combo)
+        
+        # Retest resolution, applied without rescanning
+        retest_label = QLabel("Retests:")
+        retest_label.setObjectName("hintLabel")
+        header_layout.addWidget(retest_label)
+        self.retest_combo = QComboBox()
+        for policy, label in self.RETEST_POLICIES:
+            self.retest_combo.addItem(label, policy)
+        self.retest_combo.currentIndexChanged.connect(
+            lambda: self.retest_policy_changed.emit(self.retest_policy())
+        )
+        header_layout.addWidget(self.retest_combo)
+        
         # Export button
         export_btn = QPushButton("📥 Export")
         export_btn.clicked.connect(self.export_requested.emit)
@@ -87,10 +107,17 @@ class ResultWidget(QWidget):
         
         layout.addLayout(header_layout)
         
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["#", "File Name", "Serial Number", "Status", "Check Time"])
+        # Summary panel (invalid rates per program, family, day...), shown
+        # once a scan has finished
+        self.summary_panel = QTextBrowser()
+        self.summary_panel.setMaximumHeight(170)
+        self.summary_panel.hide()
+        layout.addWidget(self.summary_panel)
+        
+        # Table (virtualized: rows are served lazily by the model)
+        self.table_model = ResultTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         
         # Configure table
         header = self.table.horizontalHeader()
@@ -104,52 +131,53 @@ class ResultWidget(QWidget):
         self.table.setColumnWidth(3, 120)
         self.table.setColumnWidth(4, 160)
         
+        # Clicking a column header sorts by it (again to reverse); the
+        # presenter sorts, the "#" column restores the scan order
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(0, Qt.AscendingOrder)
+        header.sortIndicatorChanged.connect(
+            lambda column, order: self.sort_changed.emit(column, order == Qt.DescendingOrder)
+        )
+        
+        # Fixed row heights keep scrolling O(1) for any number of rows
+        vertical_header = self.table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(32)
+        
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
         layout.addWidget(self.table)
         
-    def set_results(self, results: list):
+    def set_results(self, results):
         """
         Set the results to display
-        results: List of (filename, serial_number, is_invalid, check_time)
+        results: ResultView of (filename, serial_number, is_invalid, check_time)
         """
-        self.table.setRowCount(0)
-        
-        for idx, (filename, sn, is_invalid, check_time) in enumerate(results, 1):
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Index
-            index_item = QTableWidgetItem(str(idx))
-            index_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 0, index_item)
-            
-            # Filename
-            filename_item = QTableWidgetItem(filename)
-            self.table.setItem(row, 1, filename_item)
-            
-            # Serial Number
-            sn_item = QTableWidgetItem(sn)
-            self.table.setItem(row, 2, sn_item)
-            
-            # Status
-            status = "❌ Invalid" if is_invalid else "✅ Valid"
-            status_item = QTableWidgetItem(status)
-            status_item.setTextAlignment(Qt.AlignCenter)
-            
-            if is_invalid:
-                status_item.setForeground(QColor("#e74c3c"))
-            else:
-                status_item.setForeground(QColor("#27ae60"))
-                
-            self.table.setItem(row, 3, status_item)
-            
-            # Check Time
-            time_item = QTableWidgetItem(check_time)
-            time_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 4, time_item)
+        self.table_model.set_results(results)
+        
+    def append_results(self, results):
+        """
+        Append results below the rows already displayed
+        results: ResultView of (filename, serial_number, is_invalid, check_time)
+        """
+        self.table_model.append_results(results)
+        
+    def retest_policy(self) -> str:
+        """Selected retest policy ("all", "latest" or "any_invalid")"""
+        return self.retest_combo.currentData()
+        
+    def status_filter(self) -> str:
+        """Selected status filter ("invalid", "valid" or "all")"""
+        return self.status_combo.currentData()
+        
+    def set_status_filter(self, status: str):
+        """Select a status filter without emitting status_filter_changed"""
+        self.status_combo.blockSignals(True)
+        self.status_combo.setCurrentIndex(self.status_combo.findData(status))
+        self.status_combo.blockSignals(False)
         
     def update_statistics(self, stats: dict):
         """Update statistics display"""
@@ -157,8 +185,53 @@ class ResultWidget(QWidget):
             f"Total: {stats['total']} | Valid: {stats['valid']} | Invalid: {stats['invalid']}"
         )
         
+    def update_summary(self, summary: dict):
+        """
+        Show grouped aggregates in the summary panel
+        summary: ResultAnalytics.summary() of the results
+        """
+        sections = [("Program", summary["by_program"]), ("Family", summary["by_family"])]
+        sections += [(name.replace("_", " ").title(), stats) for name, stats in summary["fields"].items()]
+        sections.append(("Day", summary["by_day"]))
+        
+        cells = []
+        for title, stats in sections:
+            rows = "".join(
+                f"<tr><td>{html.escape(stat.key)}</td><td align='right'>{stat.total:,}</td>"
+                f"<td align='right'>{stat.invalid:,}</td>"
+                f"<td align='right'>{stat.invalid_rate:.1%}</td></tr>"
+                for stat in stats[:self.SUMMARY_ROWS]
+            )
+            more = f"<tr><td colspan='4'>+ {len(stats) - self.SUMMARY_ROWS} more</td></tr>" \
+                if len(stats) > self.SUMMARY_ROWS else ""
+            cells.append(
+                f"<td valign='top'><table cellspacing='0' cellpadding='2'>"
+                f"<tr><th align='left'>{title}</th><th>Total</th><th>Invalid</th><th>Rate</th></tr>"
+                f"{rows}{more}</table></td>"
+            )
+        
+        trim = summary["trim"]
+        if trim["count"]:
+            cells.append(
+                f"<td valign='top'><b>Trim value</b><br>"
+                f"{trim['count']:,} logs<br>"
+                f"min {trim['min']:g} / median {trim['median']:g} / max {trim['max']:g}<br>"
+                f"p5 {trim['p5']:g} / p95 {trim['p95']:g}</td>"
+            )
+        
+        self.summary_panel.setHtml(
+            f"<table cellspacing='12'><tr>{''.join(cells)}</tr></table>"
+        )
+        self.summary_panel.show()
+        
+    def clear_summary(self):
+        """Hide the summary panel"""
+        self.summary_panel.clear()
+        self.summary_panel.hide()
+        
     def clear_results(self):
         """Clear all results"""
-        self.table.setRowCount(0)
+        self.table_model.clear()
         self.stats_label.setText("Total: 0 | Valid: 0 | Invalid: 0")
+        self.clear_summary()
 
@@ -0,0 +1,318 @@
+"""
+Style - The application stylesheet, applied once at startup
+"""
+
+# Rules are scoped by widget class name (e.g. SidebarWidget QPushButton) so
+# each widget keeps the look it had with its own stylesheet; single labels
+# and buttons are styled by object name.
+APP_STYLESHEET = """
+    /* Main window */
+    QMainWindow {
+        background-color: #ecf0f1;
+    }
+    MainWindow QSplitter::handle {
+        background-color: #bdc3c7;
+        height: 2px;
+    }
+    MainWindow QSplitter::handle:hover {
+        background-color: #95a5a6;
+    }
+
+    /* Sidebar */
+    SidebarWidget, SidebarWidget QWidget {
+        background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                                   stop:0 #1e3c72, stop:1 #2a5298);
+        color: #2e2b2b;
+    }
+    SidebarWidget QPushButton {
+        background-color: transparent;
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 12px 15px;
+        text-align: left;
+        font-size: 13px;
+        margin: 4px 10px;
+    }
+    SidebarWidget QPushButton:hover {
+        background-color: rgba(255, 255, 255, 0.15);
+        border-left: 3px solid #1abc9c;
+    }
+    SidebarWidget QPushButton:pressed {
+        background-color: rgba(26, 188, 156, 0.3);
+    }
+    SidebarWidget QPushButton[active="true"] {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                                   stop:0 #1abc9c, stop:1 #16a085);
+        border-left: 4px solid #0e7c68;
+        color: #ffffff;
+        font-weight: bold;
+    }
+    SidebarWidget QPushButton[active="false"] {
+        color: #2e2b2b;
+        font-weight: normal;
+    }
+    #sidebarLogo, #sidebarLogo QWidget {
+        background: gradient(x1:0, y1:0, x2:1, y2:1,
+                           stop:0 #1e3c72, stop:1 #2a5298);
+    }
+    #sidebarLogo QLabel {
+        background: transparent;
+    }
+    QLabel#sidebarTitle {
+        color: #27548A;
+    }
+    QFrame#sidebarSeparator {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                                   stop:0 transparent,
+                                   stop:0.5 rgba(255, 255, 255, 0.3),
+                                   stop:1 transparent);
+    }
+    QLabel#menuLabel {
+        color: #000000;
+        font-size: 18px;
+        font-weight: bold;
+        padding: 5px 20px;
+        letter-spacing: 1px;
+        background: transparent;
+    }
+    QFrame#footerSeparator {
+        background-color: rgba(255, 255, 255, 0.1);
+    }
+    QWidget#sidebarFooter {
+        background: transparent;
+    }
+    #sidebarFooter QLabel {
+        color: #000000;
+        font-size: 15px;
+        background: transparent;
+    }
+
+    /* Header */
+    HeaderWidget, HeaderWidget QWidget {
+        background-color: #f0f0f0;
+    }
+    HeaderWidget QLabel {
+        color: #2c3e50;
+    }
+    HeaderWidget QProgressBar {
+        border: 2px solid #bdc3c7;
+        border-radius: 5px;
+        text-align: center;
+        height: 25px;
+        background-color: #ecf0f1;
+    }
+    HeaderWidget QProgressBar::chunk {
+        background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                                          stop:0 #1abc9c, stop:1 #16a085);
+        border-radius: 3px;
+    }
+    QPushButton#toggleBtn {
+        background-color: transparent;
+        border: 2px solid #bdc3c7;
+        border-radius: 5px;
+        padding: 8px 12px;
+        color: #2c3e50;
+        font-size: 16px;
+        font-weight: bold;
+    }
+    QPushButton#toggleBtn:hover {
+        background-color: #ecf0f1;
+        border-color: #1abc9c;
+    }
+    QPushButton#toggleBtn:pressed {
+        background-color: #1abc9c;
+        color: white;
+    }
+    QPushButton#cancelExportBtn {
+        background-color: #e74c3c;
+        color: white;
+        border: none;
+        padding: 6px 14px;
+        border-radius: 5px;
+        font-size: 12px;
+    }
+    QPushButton#cancelExportBtn:hover {
+        background-color: #c0392b;
+    }
+    QLabel#percentageLabel {
+        color: #1abc9c;
+    }
+    QFrame#headerSeparator {
+        background-color: #ecf0f1;
+        max-height: 2px;
+    }
+
+    /* Content (processing controls) */
+    ContentWidget, ContentWidget QWidget {
+        background-color: #f8f9fa;
+    }
+    ContentWidget QLabel {
+        color: #2c3e50;
+    }
+    ContentWidget QGroupBox {
+        background-color: white;
+        border: 2px solid #dee2e6;
+        border-radius: 8px;
+        margin-top: 10px;
+        font-weight: bold;
+        padding: 15px;
+    }
+    ContentWidget QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 15px;
+        padding: 0 5px;
+        color: #2c3e50;
+    }
+    ContentWidget QLineEdit {
+        padding: 10px;
+        border: 2px solid #dee2e6;
+        border-radius: 5px;
+        background-color: white;
+        font-size: 13px;
+    }
+    ContentWidget QLineEdit:focus {
+        border: 2px solid #1abc9c;
+    }
+    ContentWidget QPushButton {
+        background-color: #3498db;
+        color: white;
+        border: none;
+        padding: 10px 25px;
+        border-radius: 5px;
+        font-size: 14px;
+        font-weight: bold;
+    }
+    ContentWidget QPushButton:hover {
+        background-color: #2980b9;
+    }
+    QPushButton#browseBtn {
+        background-color: #95a5a6;
+        padding: 10px 20px;
+    }
+    QPushButton#browseBtn:hover {
+        background-color: #7f8c8d;
+    }
+    QPushButton#processBtn {
+        background-color: #1abc9c;
+        padding: 12px 40px;
+        font-size: 15px;
+    }
+    QPushButton#processBtn:hover {
+        background-color: #16a085;
+    }
+    QPushButton#pauseBtn {
+        background-color: #f39c12;
+        padding: 12px 25px;
+    }
+    QPushButton#pauseBtn:hover {
+        background-color: #e67e22;
+    }
+    QPushButton#cancelBtn {
+        background-color: #e74c3c;
+        padding: 12px 25px;
+    }
+    QPushButton#cancelBtn:hover {
+        background-color: #c0392b;
+    }
+    ContentWidget QRadioButton {
+        color: #2c3e50;
+        spacing: 8px;
+        font-size: 13px;
+    }
+    ContentWidget QRadioButton::indicator {
+        width: 18px;
+        height: 18px;
+    }
+    ContentWidget QCheckBox {
+        color: #2c3e50;
+        spacing: 8px;
+        font-size: 13px;
+    }
+
+    /* Result and history tables */
+    ResultWidget, ResultWidget QWidget, HistoryWidget, HistoryWidget QWidget {
+        background-color: #f8f9fa;
+    }
+    ResultWidget QLabel, HistoryWidget QLabel {
+        color: #2c3e50;
+    }
+    ResultWidget QTableView, HistoryWidget QTableView {
+        background-color: white;
+        border: 1px solid #dee2e6;
+        border-radius: 5px;
+        gridline-color: #dee2e6;
+    }
+    ResultWidget QTableView::item, HistoryWidget QTableView::item {
+        padding: 8px;
+    }
+    ResultWidget QTableView::item:selected, HistoryWidget QTableView::item:selected {
+        background-color: #1abc9c;
+        color: white;
+    }
+    ResultWidget QHeaderView::section, HistoryWidget QHeaderView::section {
+        background-color: #34495e;
+        color: white;
+        padding: 10px;
+        border: none;
+        font-weight: bold;
+    }
+    ResultWidget QPushButton, HistoryWidget QPushButton {
+        background-color: #3498db;
+        color: white;
+        border: none;
+        padding: 8px 20px;
+        border-radius: 5px;
+        font-size: 13px;
+    }
+    ResultWidget QPushButton:hover, HistoryWidget QPushButton:hover {
+        background-color: #2980b9;
+    }
+    ResultWidget QComboBox, ResultWidget QLineEdit, HistoryWidget QLineEdit, HistoryWidget QComboBox {
+        padding: 6px 10px;
+        border: 1px solid #dee2e6;
+        border-radius: 5px;
+        background-color: white;
+        font-size: 12px;
+    }
+    ResultWidget QTextBrowser {
+        background-color: white;
+        border: 1px solid #dee2e6;
+        border-radius: 5px;
+        font-size: 12px;
+    }
+
+    /* Terminal */
+    TerminalWidget, TerminalWidget QWidget {
+        background-color: #f8f9fa;
+    }
+    TerminalWidget QLabel {
+        color: #2c3e50;
+    }
+    TerminalWidget QPlainTextEdit {
+        background-color: #1e1e1e;
+        color: #d4d4d4;
+        border: 1px solid #3c3c3c;
+        border-radius: 5px;
+        font-family: 'Consolas', 'Courier New', monospace;
+        font-size: 12px;
+        padding: 10px;
+    }
+    TerminalWidget QPushButton {
+        background-color: #e74c3c;
+        color: white;
+        border: none;
+        padding: 6px 15px;
+        border-radius: 4px;
+        font-size: 12px;
+    }
+    TerminalWidget QPushButton:hover {
+        background-color: #c0392b;
+    }
+
+    /* Secondary text next to titles (rates, statistics, query info) */
+    QLabel#hintLabel {
+        color: #7f8c8d;
+        font-size: 12px;
+    }
+"""
@@ -1,50 +1,59 @@
 """
 Terminal Widget - Display log messages and output
 """
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QLabel, QHBoxLayout, QPushButton
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QTextCursor, QColor
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPlainTextEdit, QLabel, QHBoxLayout,
+                               QPushButton, QComboBox, QPlainTextDocumentLayout)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont, QTextCursor, QColor, QTextCharFormat, QTextDocument
+from collections import deque
 import sys
 from PySide6.QtWidgets import QApplication
 
 class TerminalWidget(QWidget):
-    """Terminal-like widget for displaying logs"""
+    """
+    Terminal-like widget for displaying logs
+    The log_* methods only queue the message, so they can be called from any
+    thread; queued messages are rendered in batches by a timer. At most
+    max_lines lines are kept (oldest lines are dropped).
+    Each level filter has its own document holding only the lines of its
+    levels, so changing the filter swaps documents and re-renders nothing.
+    """
     
-    def __init__(self, parent=None):
+    LEVEL_COLORS = {
+        "INFO": "#4a90e2",
+        "SUCCESS": "#27ae60",
+        "WARNING": "#f39c12",
+        "ERROR": "#e74c3c",
+    }
+    # Level filter choices: (label, visible levels)
+    LEVEL_FILTERS = [
+        ("All", ("INFO", "SUCCESS", "WARNING", "ERROR")),
+        ("Warnings & Errors", ("WARNING", "ERROR")),
+        ("Errors", ("ERROR",)),
+    ]
+    FLUSH_INTERVAL_MS = 100
+    
+    def __init__(self, parent=None, max_lines: int = 5000):
         super().__init__(parent)
+        self.max_lines = max_lines
+        # Messages waiting for the next flush (deque appends are thread-safe)
+        self._pending = deque()
+        # One document per LEVEL_FILTERS entry (created in setup_ui)
+        self._documents = []
+        self._formats = {}
+        for level, color in self.LEVEL_COLORS.items():
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            self._formats[level] = text_format
         self.setup_ui()
         
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+        
     def setup_ui(self):
         """Setup the terminal UI"""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f8f9fa;
-            }
-            QLabel {
-                color: #2c3e50;
-            }
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 1px solid #3c3c3c;
-                border-radius: 5px;
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 12px;
-                padding: 10px;
-            }
-            QPushButton {
-                background-color: #e74c3c;
-                color: white;
-                border: none;
-                padding: 6px 15px;
-                border-radius: 4px;
-                font-size: 12px;
-            }
-            QPushButton:hover {
-                background-color: #c0392b;
-            }
-        """)
-        
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 15, 15, 15)
         layout.setSpacing(10)
@@ -61,6 +70,13 @@ class TerminalWidget(QWidget):
         
         header_layout.addStretch()
         
+        # Level filter
+        self.level_filter = QComboBox()
+        for label, _ in self.LEVEL_FILTERS:
+            self.level_filter.addItem(label)
+        self.level_filter.currentIndexChanged.connect(self._on_level_filter_changed)
+        header_layout.addWidget(self.level_filter)
+        
         # Clear button
         clear_btn = QPushButton("Clear")
         clear_btn.clicked.connect(self.clear_terminal)
@@ -68,10 +84,17 @@ class TerminalWidget(QWidget):
         
         layout.addLayout(header_layout)
         
-        # Terminal text area
-        self.terminal_text = QTextEdit()
+        # Terminal text area (the block limit drops the oldest lines)
+        self.terminal_text = QPlainTextEdit()
         self.terminal_text.setReadOnly(True)
         self.terminal_text.setMinimumHeight(200)
+        for _ in self.LEVEL_FILTERS:
+            document = QTextDocument(self)
+            document.setDocumentLayout(QPlainTextDocumentLayout(document))
+            document.setDefaultFont(self.terminal_text.font())
+            document.setMaximumBlockCount(self.max_lines)
+            self._documents.append(document)
+        self.terminal_text.setDocument(self._documents[0])
         layout.addWidget(self.terminal_text)
         
         # Initial message
@@ -79,29 +102,71 @@ class TerminalWidget(QWidget):
         
     def log_info(self, message: str):
         """Log an info message"""
-        self._append_message(f"[INFO] {message}", "#4a90e2")
+        self._append_message("INFO", message)
 
     def log_success(self, message: str):
         """Log a success message"""
-        self._append_message(f"[SUCCESS] {message}", "#27ae60")
+        self._append_message("SUCCESS", message)
         
     def log_error(self, message: str):
         """Log an error message"""
-        self._append_message(f"[ERROR] {message}", "#e74c3c")
+        self._append_message("ERROR", message)
         
     def log_warning(self, message: str):
         """Log a warning message"""
-        self._append_message(f"[WARNING] {message}", "#f39c12")
+        self._append_message("WARNING", message)
+        
+    def _append_message(self, level: str, message: str):
+        """Queue a message for the next flush (safe from any thread)"""
+        self._pending.append((level, f"[{level}] {message}"))
+        
+    def flush(self):
+        """Render all queued messages in one batch"""
+        if not self._pending:
+            return
+        entries = []
+        while self._pending:
+            entries.append(self._pending.popleft())
+        for document, (_, levels) in zip(self._documents, self.LEVEL_FILTERS):
+            self._render(document, [entry for entry in entries if entry[0] in levels])
+        
+    def _render(self, document: QTextDocument, entries: list):
+        """Append entries to a document as one edit block"""
+        # Only the newest max_lines entries can stay visible
+        entries = entries[-self.max_lines:]
+        if not entries:
+            return
+        
+        first_line = document.isEmpty()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for level, text in entries:
+            if not first_line:
+                cursor.insertBlock()
+            first_line = False
+            cursor.insertText(text, self._formats[level])
+        cursor.endEditBlock()
+        
+        if document is self.terminal_text.document():
+            scroll_bar = self.terminal_text.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
         
-    def _append_message(self, message: str, color: str):
-        """Append a colored message to the terminal"""
-        self.terminal_text.setTextColor(QColor(color))
-        self.terminal_text.append(message)
-        self.terminal_text.moveCursor(QTextCursor.End)
+    def _on_level_filter_changed(self, index: int):
+        """Show only the selected levels by switching to their document"""
+        self.flush()
+        document = self._documents[index]
+        # Font changes (e.g. from the stylesheet) only reach the shown document
+        document.setDefaultFont(self.terminal_text.font())
+        self.terminal_text.setDocument(document)
+        scroll_bar = self.terminal_text.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
         
     def clear_terminal(self):
         """Clear the terminal"""
-        self.terminal_text.clear()
+        self._pending.clear()
+        for document in self._documents:
+            document.clear()
         self.log_info("Terminal cleared.")
 
 if __name__ == "__main__":